@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Benchmark: float CostPool vs integer-fen FixedCostPool.
+
+Replays a synthetic long-only fill stream (fractional lots, partial closes)
+on top of a core holding that is never sold, prints throughput, and reports
+drift: the pool should end holding exactly the core quantity, and the cost
+released by sells plus the cost left in the pool should equal exactly what
+was bought (sums taken with math.fsum).
+
+    python benchmarks/bench_fixed_point.py --fills 1000000
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.cost_pool import CostPool, FixedCostPool  # noqa: E402
+
+
+CORE = ('BUY', 1000.0, 1234567.89)
+
+
+def make_fills(n: int, seed: int):
+    """(side, qty, amount) tuples after CORE; each buy is sold in 1-3 lots."""
+    rng = random.Random(seed)
+    fills = [CORE]
+    while len(fills) < n:
+        qty = round(rng.uniform(0.1, 50), 4)
+        fills.append(('BUY', qty, round(qty * rng.uniform(1, 900) * 7.1, 2)))
+        lots = rng.randint(1, 3)
+        for i in range(lots):
+            lot = qty if i == lots - 1 else round(qty / lots, 4)
+            qty = round(qty - lot, 4)
+            fills.append(('SELL', lot, 0))
+    return fills
+
+
+def replay(pool, fills):
+    buy, sell = pool.buy, pool.sell
+    released = []
+    for side, qty, amount in fills:
+        if side == 'BUY':
+            buy(qty, amount)
+        else:
+            released.append(sell(qty))
+    return released
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--fills', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    fills = make_fills(args.fills, args.seed)
+    core_qty = CORE[1]
+    bought = math.fsum(amount for side, _, amount in fills if side == 'BUY')
+
+    for label, cls in (('float', CostPool), ('fixed (fen)', FixedCostPool)):
+        best = float('inf')
+        for _ in range(args.repeat):
+            pool = cls('BENCH', record_history=False)
+            t0 = time.perf_counter()
+            released = replay(pool, fills)
+            best = min(best, time.perf_counter() - t0)
+        print(f"{label:<12} {best * 1000:9.1f} ms   {len(fills) / best:12,.0f} fills/s   "
+              f"qty drift {pool.quantity - core_qty:+.3e}   "
+              f"cost drift {math.fsum(released + [pool.total_cost]) - bought:+.3e} CNY")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Benchmark: sequential batch_fetch vs concurrent batch_fetch_many.
+
+A stub provider sleeps for --latency seconds per series request plus
+--per-year seconds for each year the range spans (response size), like a
+remote API.  Backfilling --currencies currencies over --years years one
+currency at a time costs the sum of every request; batch_fetch_many splits
+each currency into year segments and downloads them concurrently, so it
+should take about as long as one segment plus the single DB write.
+
+    python benchmarks/bench_rate_fetch.py --currencies 3 --years 10
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.database import DatabaseManager  # noqa: E402
+from src.exchange_rate import ExchangeRateManager, RateProvider, RateSource  # noqa: E402
+
+CURRENCIES = ('USD', 'HKD', 'EUR', 'GBP', 'SGD', 'JPY')
+
+
+class SlowProvider(RateProvider):
+    def __init__(self, latency: float, per_year: float):
+        self.latency = latency
+        self.per_year = per_year
+
+    @property
+    def source(self) -> RateSource:
+        return RateSource.FRANKFURTER
+
+    def fetch(self, date, from_ccy, to_ccy):
+        time.sleep(self.latency)
+        return 1.0
+
+    def fetch_series(self, start, end, from_ccy, to_ccy):
+        first, last = date.fromisoformat(start), date.fromisoformat(end)
+        time.sleep(self.latency + self.per_year * ((last - first).days + 1) / 365)
+        days = (last - first).days + 1
+        return {(first + timedelta(d)).isoformat(): 1.0 for d in range(days)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--currencies', type=int, default=3, choices=range(1, len(CURRENCIES) + 1))
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--per-year', type=float, default=0.1)
+    parser.add_argument('--workers', type=int, default=16)
+    args = parser.parse_args()
+
+    first = date(2025 - args.years, 1, 1)
+    days = [(first + timedelta(d)).isoformat()
+            for d in range((date(2024, 12, 31) - first).days + 1)]
+    wanted = {ccy: days for ccy in CURRENCIES[:args.currencies]}
+    provider = SlowProvider(args.latency, args.per_year)
+
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        exchange = ExchangeRateManager(DatabaseManager(Path(tmp) / 'seq.db'), provider)
+        t0 = time.perf_counter()
+        for ccy, dates in wanted.items():
+            exchange.batch_fetch(dates, ccy)
+        sequential = time.perf_counter() - t0
+
+        exchange = ExchangeRateManager(DatabaseManager(Path(tmp) / 'conc.db'), provider)
+        t0 = time.perf_counter()
+        exchange.batch_fetch_many(wanted, workers=args.workers)
+        concurrent = time.perf_counter() - t0
+
+    segment = args.latency + args.per_year
+    print(f"{args.currencies} currencies × {args.years} years, {len(days):,} days each")
+    print(f"sequential batch_fetch   {sequential:7.2f} s")
+    print(f"batch_fetch_many         {concurrent:7.2f} s   "
+          f"(one segment ≈ {segment:.2f} s, {sequential / concurrent:.1f}× faster)")
+
+
+if __name__ == '__main__':
+    main()
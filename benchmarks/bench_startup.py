@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Benchmark: CLI startup cost, measured with `python -X importtime`.
+
+Runs each command in a fresh interpreter against a scratch database
+(TAX_CALCULATOR_DB), sums the import time spent after interpreter startup
+(everything after `site`), and lists which heavy dependencies got loaded.
+Offline commands must not load the broker SDK, requests or numpy.  Exits
+non-zero if any command exceeds the budget, so it can guard CI:
+
+    python benchmarks/bench_startup.py --budget-ms 50
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY = ('longport', 'requests', 'numpy')
+
+# (argv, heavy modules the command is allowed to load)
+COMMANDS = [
+    (['--help'], ()),
+    (['status'], ()),
+    (['status', '--year', '2024'], ()),
+    (['db', '--table', 'rates'], ()),
+    (['reparse-dividends'], ()),
+    (['rates', 'gaps'], ()),
+    (['calculate', '--help'], ()),
+    (['sync', '--help'], ()),
+]
+
+
+def parse_importtime(stderr: str):
+    """Return (total import µs after `site`, set of top-level packages imported)."""
+    total = 0
+    modules = set()
+    after_site = False
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not after_site:
+            after_site = name.strip() == 'site'
+            continue
+        modules.add(name.strip().split('.')[0])
+        if not name[1:].startswith(' '):  # top-level import
+            total += int(cumulative)
+    return total, modules
+
+
+def run(argv, env):
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime', 'cli.py', *argv],
+                          cwd=ROOT, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - t0
+    if proc.returncode != 0:
+        raise SystemExit(f"cli.py {' '.join(argv)} failed:\n{proc.stdout}{proc.stderr}")
+    imports, modules = parse_importtime(proc.stderr)
+    return wall, imports, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--budget-ms', type=float, default=50.0,
+                        help='Max import time per command (median), in ms')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, TAX_CALCULATOR_DB=str(Path(tmp) / 'bench.db'))
+        for argv, allowed in COMMANDS:
+            runs = [run(argv, env) for _ in range(args.repeat)]
+            wall = statistics.median(r[0] for r in runs) * 1000
+            imports = statistics.median(r[1] for r in runs) / 1000
+            heavy = sorted(m for m in HEAVY if m in runs[-1][2] and m not in allowed)
+            label = ' '.join(argv)
+            print(f"{label:<26} imports {imports:7.1f} ms   wall {wall:7.1f} ms"
+                  + (f"   loads {', '.join(heavy)}" if heavy else ''))
+            if imports > args.budget_ms:
+                failures.append(f"{label}: {imports:.1f} ms > {args.budget_ms:.0f} ms budget")
+            if heavy:
+                failures.append(f"{label}: loads {', '.join(heavy)}")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""Benchmark suite: the hot paths over small, medium and huge synthetic portfolios.
+
+Each size is a seeded src.synthetic portfolio, so every run times the same
+data.  For each benchmark it reports the best of --repeat wall times, the
+throughput in items/sec (orders for import and calculate, dividends,
+rate dates, cash flow entries and report rows for the others) and the peak
+traced allocation of one extra run under tracemalloc.
+
+    python benchmarks/bench_suite.py --sizes small medium --output before.json
+    python benchmarks/bench_suite.py --sizes small medium --compare before.json
+
+Results are written as JSON, tagged with the git commit.  --compare prints
+the change against an earlier file and exits non-zero if any benchmark got
+slower by more than --threshold (benchmarks under --min-ms are not
+flagged).
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from itertools import count
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.calculator import TaxCalculator  # noqa: E402
+from src.cashflow_parser import parse_dividends  # noqa: E402
+from src.database import DatabaseManager  # noqa: E402
+from src.dividend import DividendCalculator  # noqa: E402
+from src.exchange_rate import NO_RATE, ExchangeRateManager, RateProvider, RateSource  # noqa: E402
+from src.settlement import SettlementCalculator  # noqa: E402
+from src.synthetic import SyntheticPortfolio, generate_portfolio, write_portfolio  # noqa: E402
+
+SIZES = {
+    'small': dict(symbols=10, orders=1_000),
+    'medium': dict(symbols=100, orders=100_000),
+    'huge': dict(symbols=500, orders=1_000_000),
+}
+
+
+class StubProvider(RateProvider):
+    """Serves the portfolio's own rate series from memory (no network)."""
+
+    def __init__(self, rates):
+        self.rates = {(d, f, t): r for d, f, t, r, _ in rates}
+
+    @property
+    def source(self) -> RateSource:
+        return RateSource.FRANKFURTER
+
+    def fetch(self, date, from_ccy, to_ccy):
+        return self.rates.get((date, from_ccy, to_ccy), NO_RATE)
+
+    def fetch_series(self, start, end, from_ccy, to_ccy):
+        return {d: r for (d, f, t), r in self.rates.items()
+                if f == from_ccy and t == to_ccy and start <= d <= end}
+
+
+class Context:
+    """One size's portfolio, written once to a database the benchmarks read."""
+
+    def __init__(self, portfolio: SyntheticPortfolio, workdir: Path):
+        self.portfolio = portfolio
+        self.workdir = workdir
+        self.db = DatabaseManager(workdir / 'portfolio.db')
+        write_portfolio(self.db, portfolio)
+        self.years = sorted({int(o['executed_at'][:4]) for o in portfolio.orders})
+        self._fresh = count()
+
+    def fresh_db(self) -> DatabaseManager:
+        return DatabaseManager(self.workdir / f"scratch-{next(self._fresh)}.db")
+
+    def calculator(self) -> Tuple[TaxCalculator, ExchangeRateManager]:
+        exchange = ExchangeRateManager(self.db, StubProvider(self.portfolio.rates))
+        calc = TaxCalculator(self.db, SettlementCalculator(exchange), checkpoints=False)
+        return calc, exchange
+
+
+# Each benchmark takes a Context and returns (run, items processed per run).
+
+def bench_import(ctx: Context):
+    def run():
+        db = ctx.fresh_db()
+        write_portfolio(db, ctx.portfolio)
+        db.close()
+    return run, len(ctx.portfolio.orders)
+
+
+def bench_calculate(ctx: Context):
+    def run():
+        calc, _ = ctx.calculator()
+        calc.calculate(ctx.years[-1])
+    return run, len(ctx.portfolio.orders)
+
+
+def bench_dividend(ctx: Context):
+    def run():
+        _, exchange = ctx.calculator()
+        calc = DividendCalculator(ctx.db, exchange)
+        for year in ctx.years:
+            calc.calculate(year)
+    return run, ctx.portfolio.stats['dividends']
+
+
+def bench_batch_fetch(ctx: Context):
+    dates = {}
+    for o in ctx.portfolio.orders:
+        dates.setdefault(o['currency'], set()).add(o['executed_at'][:10])
+    provider = StubProvider(ctx.portfolio.rates)
+
+    def run():
+        exchange = ExchangeRateManager(ctx.fresh_db(), provider)
+        for currency, days in sorted(dates.items()):
+            exchange.batch_fetch(sorted(days), currency)
+    return run, sum(len(d) for d in dates.values())
+
+
+def bench_parse_dividends(ctx: Context):
+    def run():
+        parse_dividends(ctx.portfolio.cashflow)
+    return run, len(ctx.portfolio.cashflow)
+
+
+def bench_export_csv(ctx: Context):
+    calc, exchange = ctx.calculator()
+    year = ctx.years[-1]
+    results = calc.calculate(year)
+    dividends = DividendCalculator(ctx.db, exchange).calculate(year)
+    out = ctx.workdir / 'export'
+
+    def run():
+        calc.export_csv(results, out, dividends)
+    return run, len(results['details']) + len(dividends['details'])
+
+
+BENCHMARKS: Dict[str, Callable] = {
+    'import': bench_import,
+    'calculate': bench_calculate,
+    'dividend': bench_dividend,
+    'batch_fetch': bench_batch_fetch,
+    'parse_dividends': bench_parse_dividends,
+    'export_csv': bench_export_csv,
+}
+
+
+def measure(run: Callable, repeat: int, memory: bool) -> Tuple[float, Optional[float]]:
+    """Best wall time of *repeat* runs, and peak traced MiB of one more."""
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - t0)
+    peak = None
+    if memory:
+        tracemalloc.start()
+        run()
+        peak = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return best, peak
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: Dict, baseline_path: Path, threshold: float,
+            min_seconds: float) -> bool:
+    """Print per-benchmark change vs a baseline file; True if any regressed.
+
+    Benchmarks faster than *min_seconds* in both runs are reported but never
+    flagged: at that scale the change is mostly timer noise.
+    """
+    baseline = json.loads(baseline_path.read_text())
+    print(f"\nvs {baseline_path} (commit {baseline['meta'].get('commit')})")
+    regressed = False
+    for size, benches in results.items():
+        for name, new in benches.items():
+            old = baseline['results'].get(size, {}).get(name)
+            if not old:
+                continue
+            change = new['seconds'] / old['seconds'] - 1
+            slow = change > threshold and max(new['seconds'], old['seconds']) >= min_seconds
+            regressed |= slow
+            print(f"  {size:<7} {name:<16} {change:+7.1%}" + ('   REGRESSION' if slow else ''))
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', nargs='+', choices=SIZES, default=['small', 'medium'])
+    parser.add_argument('--only', nargs='+', choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc run')
+    parser.add_argument('--output', type=Path, help='Write results to this JSON file')
+    parser.add_argument('--compare', type=Path, help='Baseline JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='Slowdown that counts as a regression (default 0.10 = 10%%)')
+    parser.add_argument('--min-ms', type=float, default=50.0,
+                        help='Never flag benchmarks faster than this (timer noise)')
+    args = parser.parse_args()
+
+    results: Dict[str, Dict] = {}
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            t0 = time.perf_counter()
+            portfolio = generate_portfolio(seed=args.seed, **SIZES[size])
+            ctx = Context(portfolio, Path(tmp))
+            print(f"[{size}] {portfolio.stats['orders']:,} orders, "
+                  f"{portfolio.stats['symbols']} symbols, "
+                  f"{portfolio.stats['cashflow']:,} cash flow entries "
+                  f"(setup {time.perf_counter() - t0:.1f} s)")
+            results[size] = {}
+            for name in args.only:
+                with contextlib.redirect_stdout(io.StringIO()):  # library progress output
+                    run, items = BENCHMARKS[name](ctx)
+                    seconds, peak = measure(run, args.repeat, not args.no_memory)
+                results[size][name] = {
+                    'seconds': seconds, 'items': items,
+                    'per_sec': items / seconds if seconds else None, 'peak_mib': peak,
+                }
+                print(f"  {name:<16} {seconds * 1000:10.1f} ms  {items / seconds:14,.0f} /s"
+                      + (f"  peak {peak:8.1f} MiB" if peak is not None else ''))
+            ctx.db.close()
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + '\n')
+        print(f"\nwrote {args.output}")
+    if args.compare and compare(results, args.compare, args.threshold, args.min_ms / 1000):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Benchmark: strftime() year filter (table scan) vs half-open range (index seek).
+
+Builds a synthetic orders table, captures the SQL the year-filtered
+DatabaseManager methods actually run, and times each one as written
+(range) and with its year range rewritten as the old strftime() filter,
+printing both query plans.
+
+    python benchmarks/bench_year_queries.py --rows 1000000
+"""
+
+import argparse
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.database import DatabaseManager, year_range  # noqa: E402
+
+YEARS = range(2015, 2026)
+YEAR = 2024
+
+# (label, call) for each DatabaseManager method that filters orders by year
+METHODS = [
+    ('symbols with sells', lambda db: db.get_symbols_with_sells(YEAR)),
+    ('orders missing fees', lambda db: db.get_orders_missing_fees(YEAR)),
+]
+
+
+def populate(db: DatabaseManager, rows: int, symbols: int, seed: int):
+    rng = random.Random(seed)
+    names = [f"SYM{i:05d}.US" for i in range(symbols)]
+
+    def gen():
+        for i in range(rows):
+            y = rng.choice(YEARS)
+            ts = (f"{y}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+                  f"T{rng.randint(9, 16):02d}:{rng.randint(0, 59):02d}:00")
+            yield (str(i), rng.choice(names), rng.choice(('BUY', 'SELL')),
+                   rng.randint(1, 500), round(rng.uniform(1, 500), 2),
+                   'USD', ts, '{}')
+
+    with db.transaction() as conn:
+        conn.executemany('''
+            INSERT INTO orders
+            (order_id, symbol, side, quantity, price, currency, executed_at, fees_json)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', gen())
+    db.conn.execute('ANALYZE')
+
+
+def traced(db: DatabaseManager, call: Callable[[DatabaseManager], object]) -> List[str]:
+    """The SELECT statements *call* runs, with their parameters expanded."""
+    statements = []
+    db.conn.set_trace_callback(statements.append)
+    try:
+        call(db)
+    finally:
+        db.conn.set_trace_callback(None)
+    return [sql for sql in statements if sql.lstrip().upper().startswith('SELECT')]
+
+
+def as_strftime(sql: str) -> str:
+    """*sql* with its year range written as the strftime() filter it replaced."""
+    start, end = year_range(YEAR)
+    bounds = f"executed_at >= '{start}' AND executed_at < '{end}'"
+    if bounds not in sql:
+        raise ValueError(f"no {YEAR} range filter in: {' '.join(sql.split())}")
+    return sql.replace(bounds, f"strftime('%Y', executed_at) = '{YEAR}'")
+
+
+def timed(conn: sqlite3.Connection, sql: str, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        conn.execute(sql).fetchall()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def plan(conn: sqlite3.Connection, sql: str) -> str:
+    rows = conn.execute(f'EXPLAIN QUERY PLAN {sql}').fetchall()
+    return '; '.join(r['detail'] for r in rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--symbols', type=int, default=2_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with DatabaseManager(Path(tmp) / 'bench.db') as db:
+            t0 = time.perf_counter()
+            populate(db, args.rows, args.symbols, args.seed)
+            print(f"Populated {args.rows:,} orders in {time.perf_counter() - t0:.1f}s\n")
+
+            conn = db.conn
+            for label, call in METHODS:
+                for seek_sql in traced(db, call):
+                    scan_sql = as_strftime(seek_sql)
+                    scan = timed(conn, scan_sql, args.repeat)
+                    seek = timed(conn, seek_sql, args.repeat)
+                    print(f"{label}")
+                    print(f"  strftime  {scan * 1000:9.2f} ms   {plan(conn, scan_sql)}")
+                    print(f"  range     {seek * 1000:9.2f} ms   {plan(conn, seek_sql)}")
+                    print(f"  speedup   {scan / seek:9.1f}x\n")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Fill a SQLite database with a seeded synthetic portfolio.
+
+The same arguments always produce the same data.  Point the CLI at the
+result to exercise it at scale without API credentials:
+
+    python benchmarks/make_portfolio.py /tmp/synth.db --symbols 200 --orders 500000
+    TAX_CALCULATOR_DB=/tmp/synth.db python cli.py calculate --years 2020-2024
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.database import DatabaseManager  # noqa: E402
+from src.synthetic import generate_portfolio, write_portfolio  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('db', type=Path, help='Database file (created; must not exist)')
+    parser.add_argument('--symbols', type=int, default=20)
+    parser.add_argument('--orders', type=int, default=10_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--first-year', type=int, default=2020)
+    parser.add_argument('--last-year', type=int, default=2024)
+    parser.add_argument('--options', type=float, default=0.3, help='Share of option symbols')
+    parser.add_argument('--shorts', type=float, default=0.15,
+                        help='Chance a trade from flat opens a short')
+    parser.add_argument('--missing-fees', type=float, default=0.0,
+                        help='Share of orders left without fee data')
+    args = parser.parse_args()
+
+    if args.db.exists():
+        parser.error(f"{args.db} already exists")
+
+    t0 = time.perf_counter()
+    portfolio = generate_portfolio(
+        symbols=args.symbols, orders=args.orders, seed=args.seed,
+        first_year=args.first_year, last_year=args.last_year,
+        option_ratio=args.options, short_ratio=args.shorts,
+        missing_fee_ratio=args.missing_fees)
+    t1 = time.perf_counter()
+    db = DatabaseManager(args.db)
+    write_portfolio(db, portfolio)
+    db.close()
+    t2 = time.perf_counter()
+
+    print(', '.join(f"{k} {v:,}" for k, v in portfolio.stats.items()))
+    print(f"generated in {t1 - t0:.1f} s, written in {t2 - t1:.1f} s → {args.db}")
+
+
+if __name__ == '__main__':
+    main()
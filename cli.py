@@ -2,22 +2,15 @@
 """CLI interface for the Investment Tax Calculator."""
 
 import sys
-import sqlite3
-import time
 import click
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Dict, Set
 
 from src.config import Config
-from src.database import DatabaseManager
-from src.exchange_rate import ExchangeRateManager
-from src.longbridge_client import LongBridgeClient
-from src.settlement import SettlementCalculator
-from src.calculator import TaxCalculator
-from src.dividend import DividendCalculator
-from src.cashflow_parser import parse_dividends, summarize_by_symbol
 
-# Initialize directories
-Config.init_dirs()
+# Everything else under src/ is imported inside the commands that use it:
+# the broker SDK, requests and numpy are slow to load, and offline commands
+# such as status or db should not pay for them on every invocation.
 
 
 @click.group()
@@ -26,6 +19,50 @@ def cli():
     pass
 
 
+def _client():
+    """Build an API client paced by the configured request quota."""
+    from src.longbridge_client import LongBridgeClient
+
+    return LongBridgeClient(
+        Config.LONGBRIDGE_APP_KEY,
+        Config.LONGBRIDGE_APP_SECRET,
+        Config.LONGBRIDGE_ACCESS_TOKEN,
+        requests_per_second=Config.LONGBRIDGE_REQUESTS_PER_SECOND,
+        workers=Config.LONGBRIDGE_FETCH_WORKERS,
+    )
+
+
+def _exchange(db):
+    """Build a rate manager: local snapshot first (if configured), then the API."""
+    from src.exchange_rate import (
+        ExchangeRateManager, FrankfurterProvider, LocalRateProvider, ProviderChain,
+    )
+
+    providers = []
+    if Config.EXCHANGE_RATE_SNAPSHOT:
+        providers.append(LocalRateProvider(Config.EXCHANGE_RATE_SNAPSHOT))
+    if not Config.EXCHANGE_RATE_OFFLINE:
+        providers.append(FrankfurterProvider())
+    if not providers:
+        click.echo("❌ EXCHANGE_RATE_OFFLINE needs EXCHANGE_RATE_SNAPSHOT to be set")
+        sys.exit(1)
+    return ExchangeRateManager(db, ProviderChain(providers),
+                               miss_ttl=timedelta(days=Config.RATE_MISS_TTL_DAYS))
+
+
+def _report_rate_stats(exchange):
+    """Print request counts and latency for rate providers that were called."""
+    for source, stats in exchange.provider_stats().items():
+        if not (stats.requests or stats.short_circuited):
+            continue
+        line = (f"   {source}: {stats.requests} request(s), {stats.errors} error(s), "
+                f"{stats.retries} retried, avg {stats.mean_latency * 1000:.0f} ms, "
+                f"max {stats.max_latency * 1000:.0f} ms")
+        if stats.short_circuited:
+            line += f", {stats.short_circuited} skipped (circuit open)"
+        click.echo(line)
+
+
 @cli.command()
 @click.option('--year', type=int, default=Config.DEFAULT_TAX_YEAR, help='Tax year to import')
 @click.option('--since', type=str, default=None,
@@ -37,6 +74,8 @@ def import_data(year, since, clear):
     First-time usage: python cli.py import-data --year 2025 --since 2020-01-01
     Incremental:      python cli.py import-data --year 2025
     """
+    from src.database import DatabaseManager
+
     try:
         Config.validate()
     except ValueError as e:
@@ -45,7 +84,7 @@ def import_data(year, since, clear):
         sys.exit(1)
 
     db = DatabaseManager(Config.DATABASE_PATH)
-    exchange = ExchangeRateManager(db)
+    exchange = _exchange(db)
 
     if clear:
         click.echo(f"🗑️  Clearing existing data for {year}...")
@@ -61,11 +100,7 @@ def import_data(year, since, clear):
 
     click.echo(f"🔄 Importing data from {start.strftime('%Y-%m-%d')} to {end.strftime('%Y-%m-%d')}...")
 
-    client = LongBridgeClient(
-        Config.LONGBRIDGE_APP_KEY,
-        Config.LONGBRIDGE_APP_SECRET,
-        Config.LONGBRIDGE_ACCESS_TOKEN
-    )
+    client = _client()
 
     if not client.test_connection():
         sys.exit(1)
@@ -79,40 +114,67 @@ def import_data(year, since, clear):
     db.save_orders(orders)
     click.echo(f"✅ Imported {len(orders)} orders")
 
-    # Fetch exchange rates for all order dates
-    dates = list(set(
-        datetime.fromisoformat(o['executed_at']).strftime('%Y-%m-%d')
-        for o in orders
-    ))
-    currencies = list(set(o['currency'] for o in orders if o['currency'] != 'CNY'))
-
-    for currency in currencies:
-        exchange.batch_fetch(dates, currency, 'CNY')
+    # Fetch exchange rates for all order dates, every currency at once
+    rate_dates: Dict[str, Set[str]] = {}
+    for o in orders:
+        if o['currency'] != 'CNY':
+            rate_dates.setdefault(o['currency'], set()).add(
+                datetime.fromisoformat(o['executed_at']).strftime('%Y-%m-%d'))
+    exchange.batch_fetch_many(rate_dates, 'CNY')
+    _report_rate_stats(exchange)
 
     click.echo(f"✅ Import completed!")
 
 
+def _parse_years(ctx, param, value):
+    """Parse a --years value such as '2019-2025' or '2024' into (first, last)."""
+    if value is None:
+        return None
+    try:
+        first, _, last = value.partition('-')
+        first, last = int(first), int(last or first)
+    except ValueError:
+        raise click.BadParameter("expected YEAR or FIRST-LAST, e.g. 2019-2025")
+    if first > last:
+        raise click.BadParameter(f"{first} is after {last}")
+    return first, last
+
+
 @cli.command()
 @click.option('--year', type=int, default=Config.DEFAULT_TAX_YEAR, help='Tax year')
+@click.option('--years', type=str, default=None, callback=_parse_years,
+              help='Year range, e.g. 2019-2025. Replays history once for all years.')
+@click.option('--workers', type=click.IntRange(min=1), default=1,
+              help='Replay symbols in N worker processes')
+@click.option('--fixed-point', is_flag=True,
+              help='Keep amounts in integer fen (exact totals, no float drift)')
 @click.option('--export/--no-export', default=True, help='Export to CSV')
-def calculate(year, export):
+def calculate(year, years, workers, fixed_point, export):
     """Calculate capital gains tax."""
+    from src.calculator import TaxCalculator
+    from src.database import DatabaseManager
+    from src.dividend import DividendCalculator
+    from src.settlement import SettlementCalculator
+
+    first, last = years or (year, year)
+    tax_years = range(first, last + 1)
     db = DatabaseManager(Config.DATABASE_PATH)
 
     # Warn if commission fees haven't been fetched yet
-    missing = db.get_orders_missing_fees(year)
+    missing = [o for y in tax_years for o in db.get_orders_missing_fees(y)]
     if missing:
         symbols = sorted(set(o['symbol'] for o in missing))
         click.echo(
             f"⚠️  {len(missing)} order(s) are missing commission fee data "
             f"({', '.join(symbols)})"
         )
-        click.echo(f"   Run: python cli.py update-fees --year {year}")
+        hint = f"--year {first}" if first == last else ""
+        click.echo(f"   Run: python cli.py update-fees {hint}".rstrip())
         if not click.confirm("   Continue calculation without full fee data?"):
             return
 
     # Warn if any exchange rates used hardcoded fallback
-    fallback_count = db.get_fallback_rate_count(year)
+    fallback_count = sum(db.get_fallback_rate_count(y) for y in tax_years)
     if fallback_count:
         click.echo(
             f"⚠️  {fallback_count} exchange rate(s) are using hardcoded fallback values"
@@ -121,16 +183,20 @@ def calculate(year, export):
         if not click.confirm("   Continue with fallback rates?"):
             return
 
-    exchange = ExchangeRateManager(db)
+    exchange = _exchange(db)
     settlement = SettlementCalculator(exchange)
-    calc = TaxCalculator(db, settlement, Config.CAPITAL_GAINS_TAX_RATE)
+    calc = TaxCalculator(db, settlement, Config.CAPITAL_GAINS_TAX_RATE,
+                         workers=workers, fixed_point=fixed_point)
+
+    all_results = calc.calculate_range(first, last)
+    div_calc = DividendCalculator(db, exchange, fixed_point=fixed_point)
 
-    results = calc.calculate(year)
+    for y in tax_years:
+        _report_year(calc, y, all_results[y], div_calc.calculate(y), export)
 
-    # Calculate dividend tax
-    div_calc = DividendCalculator(db, exchange)
-    div_results = div_calc.calculate(year)
 
+def _report_year(calc, year, results, div_results, export):
+    """Print one year's tax summary and optionally export it to CSV."""
     if not results['details'] and not div_results['details']:
         click.echo(f"⚠️  No taxable transactions or dividends for {year}")
         return
@@ -182,12 +248,20 @@ def calculate(year, export):
 
 @cli.command()
 @click.option('--year', type=int, default=None, help='Only update fees for orders in this year')
-def update_fees(year):
+@click.option('--workers', type=click.IntRange(min=1), default=Config.LONGBRIDGE_FETCH_WORKERS,
+              help='Concurrent order-detail requests (paced by the API rate limit)')
+@click.option('--batch-size', type=click.IntRange(min=1), default=50,
+              help='Orders per committed batch')
+def update_fees(year, workers, batch_size):
     """Fetch and store commission fees for orders via order detail API.
 
     This is a separate step from import-data. Run it after importing orders.
-    Only fetches fees for orders that don't have fee data yet.
+    Only fetches fees for orders that don't have fee data yet, so an
+    interrupted run resumes after the last committed batch.
     """
+    from src.database import DatabaseManager
+    from src.fee_backfill import backfill_fees
+
     try:
         Config.validate()
     except ValueError as e:
@@ -203,23 +277,19 @@ def update_fees(year):
 
     click.echo(f"🔄 Fetching fees for {len(missing)} orders...")
 
-    client = LongBridgeClient(
-        Config.LONGBRIDGE_APP_KEY,
-        Config.LONGBRIDGE_APP_SECRET,
-        Config.LONGBRIDGE_ACCESS_TOKEN
-    )
+    client = _client()
 
-    updated = 0
-    for i, order in enumerate(missing):
-        if i > 0 and i % 10 == 0:
-            click.echo(f"  Progress: {i}/{len(missing)}")
+    def report(p):
+        eta = f"{int(p.eta) // 60}m{int(p.eta) % 60:02d}s" if p.eta is not None else "?"
+        click.echo(f"  Progress: {p.done}/{p.total}  "
+                   f"{p.rate:.1f} orders/s  ETA {eta}")
 
-        fees = client.fetch_order_detail(order['order_id'])
-        if fees:
-            db.update_order_fees(order['order_id'], fees)
-            updated += 1
-
-        time.sleep(0.3)  # rate limit
+    try:
+        updated = backfill_fees(client, db, missing, workers=workers,
+                                batch_size=batch_size, on_progress=report)
+    except KeyboardInterrupt:
+        click.echo("\n⏸️  Interrupted — committed batches are kept; rerun to resume.")
+        sys.exit(130)
 
     click.echo(f"✅ Updated fees for {updated}/{len(missing)} orders")
 
@@ -239,6 +309,10 @@ def import_dividends(year, since):
     First-time:  python cli.py import-dividends --year 2025 --since 2020-01-01
     Incremental: python cli.py import-dividends --year 2025
     """
+    from src.cashflow_parser import DividendStream, summarize_by_symbol
+    from src.database import DatabaseManager
+    from src.sync import store_dividends
+
     try:
         Config.validate()
     except ValueError as e:
@@ -246,7 +320,7 @@ def import_dividends(year, since):
         sys.exit(1)
 
     db = DatabaseManager(Config.DATABASE_PATH)
-    exchange = ExchangeRateManager(db)
+    exchange = _exchange(db)
 
     if since:
         start = datetime.strptime(since, '%Y-%m-%d')
@@ -254,90 +328,181 @@ def import_dividends(year, since):
         start = datetime(year, 1, 1)
     end = datetime(year, 12, 31, 23, 59, 59)
 
-    client = LongBridgeClient(
-        Config.LONGBRIDGE_APP_KEY,
-        Config.LONGBRIDGE_APP_SECRET,
-        Config.LONGBRIDGE_ACCESS_TOKEN
-    )
+    client = _client()
 
     if not client.test_connection():
         sys.exit(1)
 
-    entries = client.fetch_cashflow(start, end)
-
-    dividends, unmatched = parse_dividends(entries)
-
-    if not dividends:
+    # Dividends are parsed and saved window by window while later windows
+    # download; only small per-symbol / per-date tallies are kept here.
+    stream = DividendStream()
+    count, total_wh = 0, 0.0
+    by_symbol: Dict[str, float] = {}
+    rate_dates: Dict[str, Set[str]] = {}
+    for saved in store_dividends(db, client.iter_cashflow(start, end), stream):
+        count += len(saved)
+        total_wh += sum(d['withholding'] for d in saved)
+        for sym, total in summarize_by_symbol(saved).items():
+            by_symbol[sym] = by_symbol.get(sym, 0.0) + total
+        for d in saved:
+            if d['currency'] != 'CNY':
+                rate_dates.setdefault(d['currency'], set()).add(
+                    datetime.fromisoformat(d['received_at']).strftime('%Y-%m-%d'))
+
+    if not count:
         click.echo("⚠️  No dividend entries found in cash flow data")
-        if entries:
-            flow_names = sorted(set(e['transaction_flow_name'] for e in entries))
-            click.echo(f"   All flow names found: {', '.join(flow_names)}")
+        if stream.flow_names:
+            click.echo(f"   All flow names found: {', '.join(sorted(stream.flow_names))}")
         return
 
-    db.save_dividends(dividends)
-    click.echo(f"✅ Imported {len(dividends)} dividend records")
+    click.echo(f"✅ Imported {count} dividend records")
 
-    total_wh = sum(d['withholding'] for d in dividends)
     if total_wh > 0:
         click.echo(f"   Withholding tax matched: {total_wh:.2f}")
-    if unmatched:
-        click.echo(f"   ⚠️  {len(unmatched)} withholding entries could not be matched")
+    if stream.unmatched:
+        click.echo(f"   ⚠️  {len(stream.unmatched)} withholding entries could not be matched")
 
-    for sym, total in sorted(summarize_by_symbol(dividends).items()):
+    for sym, total in sorted(by_symbol.items()):
         click.echo(f"   {sym}: {total:.2f} (net)")
 
     # Fetch exchange rates for dividend dates
-    dates = list(set(
-        datetime.fromisoformat(d['received_at']).strftime('%Y-%m-%d')
-        for d in dividends
-    ))
-    currencies = list(set(d['currency'] for d in dividends if d['currency'] != 'CNY'))
-    for currency in currencies:
-        exchange.batch_fetch(dates, currency, 'CNY')
+    exchange.batch_fetch_many(rate_dates, 'CNY')
+    _report_rate_stats(exchange)
 
     click.echo("✅ Dividend import completed!")
 
 
+@cli.command('reparse-dividends')
+def reparse_dividends_cmd():
+    """Rebuild dividend records from the local raw cash flow archive.
+
+    Use after changing how dividends or withholdings are recognized.
+    Makes no API calls.  Only dividends parsed from archived entries are
+    rebuilt; ones imported before the archive existed are left as they are.
+    """
+    from src.database import DatabaseManager
+    from src.sync import reparse_dividends
+
+    db = DatabaseManager(Config.DATABASE_PATH)
+    span = db.get_cashflow_raw_span()
+    if span is None:
+        click.echo("⚠️  The cash flow archive is empty; dividends left unchanged")
+        return
+    count, stream = reparse_dividends(db)
+
+    click.echo(f"✅ Rebuilt {count} dividend records from cash flow archived "
+               f"between {span[0][:10]} and {span[1][:10]}")
+    if stream.unmatched:
+        click.echo(f"   ⚠️  {len(stream.unmatched)} withholding entries could not be matched")
+
+
+@cli.command()
+@click.option('--since', type=str, default=None,
+              help='Start date (YYYY-MM-DD). Required on the first sync; '
+                   'afterwards overrides the saved position.')
+@click.option('--orders/--no-orders', default=True, help='Sync orders')
+@click.option('--dividends/--no-dividends', default=True, help='Sync dividend cash flow')
+def sync(since, orders, dividends):
+    """Fetch only orders and cash flow newer than the last sync.
+
+    Each endpoint remembers how far it has fetched for this account and
+    resumes from there (with a few days of overlap for late fills).
+
+    First time:  python cli.py sync --since 2020-01-01
+    Daily:       python cli.py sync
+    """
+    from src.database import DatabaseManager
+    from src.sync import sync_cashflow, sync_orders
+
+    try:
+        Config.validate()
+    except ValueError as e:
+        click.echo(f"❌ {e}")
+        sys.exit(1)
+
+    db = DatabaseManager(Config.DATABASE_PATH)
+    exchange = _exchange(db)
+    start = datetime.strptime(since, '%Y-%m-%d') if since else None
+    end = datetime.now().replace(microsecond=0)
+
+    client = _client()
+
+    if not client.test_connection():
+        sys.exit(1)
+
+    new_rows = []
+    try:
+        if orders:
+            fetched = sync_orders(client, db, end, start)
+            click.echo(f"✅ Synced {len(fetched)} orders")
+            new_rows += [(o['executed_at'], o['currency']) for o in fetched]
+        if dividends:
+            divs, unmatched = sync_cashflow(client, db, end, start)
+            click.echo(f"✅ Synced {len(divs)} dividend records")
+            if unmatched:
+                click.echo(f"   ⚠️  {len(unmatched)} withholding entries could not be matched")
+            new_rows += [(d['received_at'], d['currency']) for d in divs]
+    except ValueError as e:
+        click.echo(f"❌ {e}")
+        click.echo("   Run: python cli.py sync --since YYYY-MM-DD")
+        sys.exit(1)
+    except Exception as e:
+        click.echo(f"❌ Sync stopped, position not advanced: {e}")
+        sys.exit(1)
+
+    by_currency = {}
+    for ts, ccy in new_rows:
+        if ccy != 'CNY':
+            by_currency.setdefault(ccy, set()).add(
+                datetime.fromisoformat(ts).strftime('%Y-%m-%d'))
+    exchange.batch_fetch_many(by_currency, 'CNY')
+    _report_rate_stats(exchange)
+
+    click.echo("✅ Sync completed!")
+
+
 @cli.command()
 @click.option('--year', type=int, help='Filter by year')
 def status(year):
     """Show database status."""
+    from src.database import DatabaseManager, year_range
+
     db = DatabaseManager(Config.DATABASE_PATH)
 
     click.echo("📊 DATABASE STATUS")
     click.echo("=" * 40)
 
-    with sqlite3.connect(db.db_path) as conn:
-        if year:
-            cursor = conn.execute('''
-                SELECT COUNT(*) as total,
-                       SUM(CASE WHEN side='BUY' THEN 1 ELSE 0 END) as buys,
-                       SUM(CASE WHEN side='SELL' THEN 1 ELSE 0 END) as sells
-                FROM orders WHERE strftime('%Y', executed_at) = ?
-            ''', (str(year),))
-            row = cursor.fetchone()
-
-            symbols = conn.execute('''
-                SELECT DISTINCT symbol FROM orders
-                WHERE strftime('%Y', executed_at) = ? ORDER BY symbol
-            ''', (str(year),)).fetchall()
-
-            click.echo(f"Year: {year}")
-            click.echo(f"Orders: {row[0]} (Buy: {row[1]}, Sell: {row[2]})")
-            click.echo(f"Symbols: {', '.join(r[0] for r in symbols)}")
-        else:
-            cursor = conn.execute("SELECT COUNT(*) FROM orders")
-            total = cursor.fetchone()[0]
+    conn = db.conn
+    if year:
+        cursor = conn.execute('''
+            SELECT COUNT(*) as total,
+                   SUM(CASE WHEN side='BUY' THEN 1 ELSE 0 END) as buys,
+                   SUM(CASE WHEN side='SELL' THEN 1 ELSE 0 END) as sells
+            FROM orders WHERE executed_at >= ? AND executed_at < ?
+        ''', year_range(year))
+        row = cursor.fetchone()
+
+        symbols = conn.execute('''
+            SELECT DISTINCT symbol FROM orders
+            WHERE executed_at >= ? AND executed_at < ? ORDER BY symbol
+        ''', year_range(year)).fetchall()
+
+        click.echo(f"Year: {year}")
+        click.echo(f"Orders: {row[0]} (Buy: {row[1]}, Sell: {row[2]})")
+        click.echo(f"Symbols: {', '.join(r[0] for r in symbols)}")
+    else:
+        cursor = conn.execute("SELECT COUNT(*) FROM orders")
+        total = cursor.fetchone()[0]
 
-            cursor = conn.execute("""
-                SELECT strftime('%Y', executed_at) as year, COUNT(*)
-                FROM orders GROUP BY year ORDER BY year
-            """)
+        cursor = conn.execute("""
+            SELECT strftime('%Y', executed_at) as year, COUNT(*)
+            FROM orders GROUP BY year ORDER BY year
+        """)
 
-            click.echo(f"Total orders: {total}")
-            click.echo("\nBy year:")
-            for y, count in cursor.fetchall():
-                click.echo(f"  {y}: {count} orders")
+        click.echo(f"Total orders: {total}")
+        click.echo("\nBy year:")
+        for y, count in cursor.fetchall():
+            click.echo(f"  {y}: {count} orders")
 
 
 @cli.command()
@@ -346,67 +511,151 @@ def status(year):
 @click.option('--year', type=int)
 def db(table, limit, year):
     """View database contents."""
+    from src.database import DatabaseManager, year_range
+
     db_mgr = DatabaseManager(Config.DATABASE_PATH)
 
-    with sqlite3.connect(db_mgr.db_path) as conn:
-        conn.row_factory = sqlite3.Row
+    conn = db_mgr.conn
 
-        if table == 'orders':
-            click.echo("\n📋 ORDERS")
+    if table == 'orders':
+        click.echo("\n📋 ORDERS")
+        click.echo("-" * 90)
+
+        if year:
+            query = """
+                SELECT order_id, symbol, side, quantity, price, currency,
+                       substr(executed_at, 1, 10) as date
+                FROM orders
+                WHERE executed_at >= ? AND executed_at < ?
+                ORDER BY executed_at DESC
+                LIMIT ?
+            """
+            rows = conn.execute(query, (*year_range(year), limit)).fetchall()
+        else:
+            query = """
+                SELECT order_id, symbol, side, quantity, price, currency,
+                       substr(executed_at, 1, 10) as date
+                FROM orders
+                ORDER BY executed_at DESC
+                LIMIT ?
+            """
+            rows = conn.execute(query, (limit,)).fetchall()
+
+        if rows:
+            click.echo(f"{'Order ID':<22} {'Symbol':<12} {'Side':<6} {'Qty':<10} {'Price':<12} {'Curr':<6} {'Date'}")
             click.echo("-" * 90)
+            for r in rows:
+                click.echo(
+                    f"{r['order_id']:<22} {r['symbol']:<12} {r['side']:<6} "
+                    f"{r['quantity']:<10.2f} {r['price']:<12.4f} {r['currency']:<6} {r['date']}"
+                )
+        else:
+            click.echo("No orders found.")
+
+    elif table == 'rates':
+        click.echo("\n💱 EXCHANGE RATES")
+        click.echo("-" * 50)
+
+        rows = conn.execute("""
+            SELECT date, from_currency, to_currency, rate
+            FROM exchange_rates ORDER BY date DESC LIMIT ?
+        """, (limit,)).fetchall()
+
+        if rows:
+            click.echo(f"{'Date':<12} {'From':<6} {'To':<6} {'Rate'}")
+            click.echo("-" * 40)
+            for r in rows:
+                click.echo(f"{r['date']:<12} {r['from_currency']:<6} {r['to_currency']:<6} {r['rate']:.4f}")
+        else:
+            click.echo("No exchange rates found.")
+
+
+@cli.command('export-rates')
+@click.argument('path', type=click.Path(dir_okay=False, writable=True))
+def export_rates(path):
+    """Write cached exchange rates to a CSV snapshot for offline runs.
+
+    Fallback rates are left out. Use it with:
+    EXCHANGE_RATE_SNAPSHOT=PATH python cli.py calculate ...
+    """
+    import csv
+    from src.database import DatabaseManager
+
+    db = DatabaseManager(Config.DATABASE_PATH)
+    count = 0
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['date', 'from_currency', 'to_currency', 'rate'])
+        for row in db.iter_exchange_rates():
+            writer.writerow(row)
+            count += 1
+    click.echo(f"✅ Exported {count} rates to {path}")
+
+
+@cli.group()
+def rates():
+    """Inspect the exchange rate cache."""
+    pass
+
+
+@rates.command()
+@click.option('--year', type=int, default=None, help='Only dates in this year')
+@click.option('--retry', is_flag=True,
+              help='Forget misses and fallback rates so the next import asks again')
+def gaps(year, retry):
+    """List date ranges that still need a real exchange rate.
+
+    "missing" dates had no rate from any provider when last tried and are
+    skipped until RATE_MISS_TTL_DAYS have passed; "fallback" dates use a
+    hardcoded rate.
+    """
+    from datetime import date
+    from src.database import DatabaseManager
 
-            if year:
-                query = """
-                    SELECT order_id, symbol, side, quantity, price, currency,
-                           substr(executed_at, 1, 10) as date
-                    FROM orders
-                    WHERE strftime('%Y', executed_at) = ?
-                    ORDER BY executed_at DESC
-                    LIMIT ?
-                """
-                rows = conn.execute(query, (str(year), limit)).fetchall()
-            else:
-                query = """
-                    SELECT order_id, symbol, side, quantity, price, currency,
-                           substr(executed_at, 1, 10) as date
-                    FROM orders
-                    ORDER BY executed_at DESC
-                    LIMIT ?
-                """
-                rows = conn.execute(query, (limit,)).fetchall()
-
-            if rows:
-                click.echo(f"{'Order ID':<22} {'Symbol':<12} {'Side':<6} {'Qty':<10} {'Price':<12} {'Curr':<6} {'Date'}")
-                click.echo("-" * 90)
-                for r in rows:
-                    click.echo(
-                        f"{r['order_id']:<22} {r['symbol']:<12} {r['side']:<6} "
-                        f"{r['quantity']:<10.2f} {r['price']:<12.4f} {r['currency']:<6} {r['date']}"
-                    )
-            else:
-                click.echo("No orders found.")
-
-        elif table == 'rates':
-            click.echo("\n💱 EXCHANGE RATES")
-            click.echo("-" * 50)
-
-            rows = conn.execute("""
-                SELECT date, from_currency, to_currency, rate
-                FROM exchange_rates ORDER BY date DESC LIMIT ?
-            """, (limit,)).fetchall()
-
-            if rows:
-                click.echo(f"{'Date':<12} {'From':<6} {'To':<6} {'Rate'}")
-                click.echo("-" * 40)
-                for r in rows:
-                    click.echo(f"{r['date']:<12} {r['from_currency']:<6} {r['to_currency']:<6} {r['rate']:.4f}")
-            else:
-                click.echo("No exchange rates found.")
+    db = DatabaseManager(Config.DATABASE_PATH)
+    rows = db.get_rate_gaps(year)
+    if not rows:
+        click.echo("✅ No exchange rate gaps")
+        return
+
+    click.echo(f"{'Pair':<10} {'From':<12} {'To':<12} {'Days':>5}  {'Kind':<9} Last tried")
+    click.echo("-" * 80)
+    ranges = []
+    for row in rows:
+        day = date.fromisoformat(row['date'])
+        pair = f"{row['from_currency']}/{row['to_currency']}"
+        last = ranges[-1] if ranges else None
+        if (last and last['pair'] == pair and last['kind'] == row['kind']
+                and (day - last['end']).days == 1):
+            last['end'] = day
+            last['days'] += 1
+        else:
+            last = {'pair': pair, 'kind': row['kind'], 'start': day, 'end': day,
+                    'days': 1, 'tried_at': None, 'attempts': 0}
+            ranges.append(last)
+        if row['tried_at']:
+            last['tried_at'] = max(last['tried_at'] or '', row['tried_at'])
+            last['attempts'] = max(last['attempts'], row['attempts'])
+    for r in ranges:
+        tried = f"{r['tried_at']} ({r['attempts']}×)" if r['tried_at'] else '-'
+        click.echo(f"{r['pair']:<10} {r['start'].isoformat():<12} {r['end'].isoformat():<12} "
+                   f"{r['days']:>5}  {r['kind']:<9} {tried}")
+    click.echo(f"\n{len(rows)} date(s) in {len(ranges)} range(s)")
+
+    if retry:
+        with db.transaction():
+            misses = db.clear_rate_misses(year)
+            fallbacks = db.clear_fallback_rates(year)
+        click.echo(f"Forgot {misses} miss(es) and {fallbacks} fallback rate(s); "
+                   f"the next import or calculate will fetch them again")
+    else:
+        click.echo("   Retry now: python cli.py rates gaps --retry, then import-data")
 
 
 @cli.command()
 def setup():
     """Setup guide for first-time users."""
+    Config.init_dirs()
     click.echo("🚀 INVESTMENT TAX CALCULATOR SETUP")
     click.echo("=" * 50)
 
@@ -422,6 +671,10 @@ def setup():
     click.echo("\n3. Import data (first time, pull full history):")
     click.echo("   python cli.py import-data --year 2025 --since 2020-01-01")
 
+    click.echo("   Later refreshes only fetch what is new:")
+    click.echo("   python cli.py sync --since 2020-01-01   (first time)")
+    click.echo("   python cli.py sync")
+
     click.echo("\n4. Calculate tax:")
     click.echo("   python cli.py calculate --year 2025")
 
@@ -2,106 +2,352 @@
 
 This module does NOT perform any exchange rate, fee, or cost calculations itself.
 It delegates to SettlementCalculator and CostPool, then assembles the tax report.
+
+Year-end cost pool checkpoints:
+  After replaying a symbol, the pool state at each year boundary is saved
+  with a SHA-256 over the orders that produced it and the rate each one
+  settled at.  The next run restores the latest checkpoint before the
+  target year, verifies the hash against the current orders and rates, and
+  replays only what follows.  Any change to an earlier order (added,
+  removed, re-priced, fees updated) or to a rate it used changes the hash,
+  so the symbol's checkpoints are dropped and rebuilt from a full replay.
+  Fixed-point runs salt the hash, so they never restore a float pool (or
+  the reverse); switching modes rebuilds the checkpoints once.
+
+Parallel replay (workers > 1):
+  Symbols are independent, so their replays can run in a process pool.  The
+  parent does all DB work — loading orders, restoring checkpoints, resolving
+  every rate the orders need — and ships each worker an order slice plus a
+  frozen {(date, currency): rate} map.  Results are merged in symbol order,
+  so output is identical to the serial path.
+
+Fixed-point mode (fixed_point=True):
+  Orders are settled to whole fen and replayed through FixedCostPool, and
+  gains, losses and tax are summed in integer fen, so totals are exact
+  however long the history is.  Results keep the same shape and types.
 """
 
-from typing import Dict
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+from operator import itemgetter
+from typing import Dict, List, Tuple
 from datetime import datetime
 from pathlib import Path
-from .database import DatabaseManager
+from .database import DatabaseManager, year_range
 from .settlement import SettlementCalculator
-from .cost_pool import CostPool
+from .cost_pool import CostPool, FixedCostPool
+from .money import FEN, from_fen, to_fen
 
 
 class TaxCalculator:
     """Orchestrates capital gains tax calculation."""
 
     def __init__(self, db: DatabaseManager, settlement: SettlementCalculator,
-                 tax_rate: float = 0.20):
+                 tax_rate: float = 0.20, checkpoints: bool = True,
+                 workers: int = 1, fixed_point: bool = False):
         self.db = db
         self.settlement = settlement
         self.tax_rate = tax_rate
+        self.checkpoints = checkpoints
+        self.workers = workers
+        self.fixed_point = fixed_point
 
     def calculate(self, year: int) -> Dict:
         """Calculate capital gains tax for a specific year."""
-        print(f"Calculating capital gains tax for {year}...")
-
-        symbols = self.db.get_symbols_with_sells(year)
-        if not symbols:
-            return self._empty_result(year)
-
-        results = self._empty_result(year)
-
-        for symbol in symbols:
-            symbol_result = self._process_symbol(symbol, year)
-            results['details'].extend(symbol_result['transactions'])
-            results['summary'][symbol] = symbol_result['summary']
-            results['total_gains'] += symbol_result['summary']['gains']
-            results['total_losses'] += symbol_result['summary']['losses']
-
-        results['net_gains'] = max(0, results['total_gains'] - results['total_losses'])
-        results['total_tax'] = results['net_gains'] * self.tax_rate
+        return self.calculate_range(year, year)[year]
 
-        print(f"Net gains: ¥{results['net_gains']:,.2f}, Tax: ¥{results['total_tax']:,.2f}")
-        return results
+    def calculate_range(self, first_year: int, last_year: int) -> Dict[int, Dict]:
+        """Calculate capital gains tax for every year in [first_year, last_year].
 
-    def _process_symbol(self, symbol: str, year: int) -> Dict:
-        """Process a single symbol: replay history through cost pool, collect year's sells."""
-        orders = self.db.get_orders_until(symbol, year)
-        pool = CostPool(symbol)
+        Each symbol's history is replayed once across the whole range, with
+        realized events split into per-year buckets, instead of once per
+        year.  Returns {year: result}, each shaped exactly like `calculate`.
+        """
+        years = range(first_year, last_year + 1)
+        label = str(first_year) if first_year == last_year else f"{first_year}–{last_year}"
+        print(f"Calculating capital gains tax for {label}...")
+
+        sell_years: Dict[str, List[int]] = {}
+        for y in years:
+            for symbol in self.db.get_symbols_with_sells(y):
+                sell_years.setdefault(symbol, []).append(y)
+
+        all_results = {y: self._empty_result(y) for y in years}
+        self._checkpoint_rows: List[Tuple] = []
+        self._stale_symbols: List[str] = []
+
+        jobs = (self._prepare(symbol, orders, sell_years[symbol][0], sell_years[symbol][-1])
+                for symbol, orders in self._orders_by_symbol(sell_years))
+        if self.workers > 1 and len(sell_years) > 1:
+            processed = self._process_parallel(list(jobs))
+        else:
+            processed = (self._finish(job, self._replay(job['replay'], self.settlement))
+                         for job in jobs)
+
+        for symbol, per_year in processed:
+            for y in sell_years[symbol]:
+                symbol_result = per_year[y]
+                results = all_results[y]
+                results['details'].extend(symbol_result['transactions'])
+                results['summary'][symbol] = symbol_result['summary']
+                results['total_gains'] += symbol_result['summary']['gains']
+                results['total_losses'] += symbol_result['summary']['losses']
+
+        if self.checkpoints:
+            self.db.save_pool_checkpoints(self._checkpoint_rows, self._stale_symbols)
+
+        for y, results in all_results.items():
+            if self.fixed_point:
+                self._total_fixed(results)
+            else:
+                results['net_gains'] = max(0, results['total_gains'] - results['total_losses'])
+                results['total_tax'] = results['net_gains'] * self.tax_rate
+            if results['summary']:
+                print(f"{y} net gains: ¥{results['net_gains']:,.2f}, "
+                      f"Tax: ¥{results['total_tax']:,.2f}")
+
+        return all_results
+
+    def _total_fixed(self, results: Dict):
+        """Re-derive a year's totals in integer fen from per-symbol sums."""
+        gains = sum(to_fen(s['gains']) for s in results['summary'].values())
+        losses = sum(to_fen(s['losses']) for s in results['summary'].values())
+        net = max(0, gains - losses)
+        results['total_gains'] = from_fen(gains)
+        results['total_losses'] = from_fen(losses)
+        results['net_gains'] = from_fen(net)
+        results['total_tax'] = from_fen(round(net * self.tax_rate))
+
+    def _orders_by_symbol(self, sell_years: Dict[str, List[int]]):
+        """Yield (symbol, orders) for each active symbol, in symbol order.
+
+        All symbols share one streaming cursor; only the current symbol's
+        orders are held in memory.  Orders after a symbol's last active year
+        are dropped.
+        """
+        if not sell_years:
+            return
+        last_year = max(years[-1] for years in sell_years.values())
+        stream = self.db.iter_orders_until(last_year, symbols=sell_years)
+        for symbol, group in groupby(stream, key=itemgetter('symbol')):
+            _, end = year_range(sell_years[symbol][-1])
+            yield symbol, [o for o in group if o['executed_at'] < end]
+
+    def _process_parallel(self, jobs: List[Dict]) -> List[Tuple[str, Dict[int, Dict]]]:
+        """Replay many symbols in a process pool; results in input order."""
+        payloads = [(job['replay'], self._preload_rates(job['replay']['orders']))
+                    for job in jobs]
+        chunksize = max(1, len(payloads) // (self.workers * 4))
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            replays = list(pool.map(_replay_with_rates, payloads, chunksize=chunksize))
+        return [self._finish(job, replay) for job, replay in zip(jobs, replays)]
+
+    def _preload_rates(self, orders: List[Dict]) -> Dict[Tuple[str, str], float]:
+        """Resolve every rate the orders need, in the parent process."""
+        rates: Dict[Tuple[str, str], float] = {}
+        for order in orders:
+            key = (SettlementCalculator._parse_date(order['executed_at']), order['currency'])
+            if key not in rates:
+                rates[key] = self.settlement.get_rate_for_order(order)
+        return rates
+
+    def _prepare(self, symbol: str, orders: List[Dict],
+                 first_year: int, last_year: int) -> Dict:
+        """Restore the pool for a symbol's orders — everything that needs the DB."""
+        pool, start, digest, restored_year = self._restore_pool(symbol, first_year, orders)
+        return {
+            'orders': orders,
+            'start': start,
+            'digest': digest,
+            'replay': {
+                'symbol': symbol,
+                'orders': orders[start:],
+                'quantity': pool.quantity,
+                'total_cost': pool.total_cost,
+                'restored_year': restored_year,
+                'first_year': first_year,
+                'last_year': last_year,
+                'fixed_point': self.fixed_point,
+            },
+        }
 
-        transactions = []
-        total_gains = 0
-        total_losses = 0
+    @classmethod
+    def _replay(cls, job: Dict, settlement: SettlementCalculator) -> Dict:
+        """Run the orders of a prepared job through the cost pool.
 
-        for order in orders:
-            in_year = self._in_year(order, year)
+        Touches neither the DB nor the checkpoint hash, so it can run in a
+        worker process given a settlement backed by preloaded rates.
+        Returns realized-event buckets per year, the pool state at the end
+        of each year in range, and the year boundaries crossed (with the
+        number of orders replayed before each) for checkpointing.
+        """
+        first_year, last_year = job['first_year'], job['last_year']
+        fixed = job['fixed_point']
+        pool_cls = FixedCostPool if fixed else CostPool
+        pool = pool_cls.restore(job['symbol'], job['quantity'], job['total_cost'],
+                                record_history=False)
+        prev_year = job['restored_year']
+
+        buckets = {
+            y: {'transactions': [], 'gains': 0, 'losses': 0}
+            for y in range(first_year, last_year + 1)
+        }
+        year_end: Dict[int, Tuple[float, float]] = {}
+        boundaries: List[Tuple[int, int, float, float]] = []
+        pending = first_year    # next year whose closing state is unrecorded
+
+        if fixed:
+            amounts, rates = settlement.settle_batch_fen(job['orders'])
+            amounts = amounts / FEN     # exact: every fen count < 2**53
+        else:
+            amounts, rates = settlement.settle_batch(job['orders'])
+        amounts, rates = amounts.tolist(), rates.tolist()
+
+        for n, order in enumerate(job['orders']):
+            order_year = int(order['executed_at'][:4])
+            if prev_year is not None and order_year > prev_year:
+                # Pool now holds the state at the end of order_year - 1.
+                if order_year - 1 != job['restored_year']:
+                    boundaries.append((order_year - 1, n, pool.quantity, pool.total_cost))
+                while pending < order_year and pending <= last_year:
+                    year_end[pending] = (pool.quantity, pool.total_cost)
+                    pending += 1
+            prev_year = order_year
+
+            bucket = buckets.get(order_year)
 
             if order['side'] == 'BUY':
-                settled_cost = self.settlement.settle_buy(order)
+                settled_cost = amounts[n]
                 cost_basis = pool.buy(order['quantity'], settled_cost)
 
                 # cost_basis > 0 means closing a short position (buy-to-close)
-                if cost_basis > 0 and in_year:
+                if cost_basis > 0 and bucket is not None:
                     # For short close: proceeds were locked in at open, cost is what we pay now
                     proceeds_cny = cost_basis   # the proceeds received when opening short
                     cost_cny = settled_cost      # what we pay to close
-                    gain_loss = proceeds_cny - cost_cny
-                    rate = self.settlement.get_rate_for_order(order)
-                    tx = self._build_tx(order, rate, proceeds_cny, cost_cny, gain_loss)
-                    transactions.append(tx)
-                    if gain_loss > 0:
-                        total_gains += gain_loss
-                    else:
-                        total_losses += abs(gain_loss)
+                    gain_loss = cls._gain(proceeds_cny, cost_cny, fixed)
+                    tx = cls._build_tx(order, rates[n], proceeds_cny, cost_cny, gain_loss)
+                    cls._add_realized(bucket, tx)
 
             elif order['side'] == 'SELL':
                 # Need settled_amount for potential sell-to-open
-                proceeds_cny, rate = self.settlement.settle_sell_with_rate(order)
+                proceeds_cny, rate = amounts[n], rates[n]
                 cost_basis = pool.sell(order['quantity'], settled_amount=proceeds_cny)
 
                 # cost_basis > 0 means closing a long position
-                if cost_basis > 0 and in_year:
-                    gain_loss = proceeds_cny - cost_basis
-                    tx = self._build_tx(order, rate, proceeds_cny, cost_basis, gain_loss)
-                    transactions.append(tx)
-                    if gain_loss > 0:
-                        total_gains += gain_loss
-                    else:
-                        total_losses += abs(gain_loss)
+                if cost_basis > 0 and bucket is not None:
+                    gain_loss = cls._gain(proceeds_cny, cost_basis, fixed)
+                    tx = cls._build_tx(order, rate, proceeds_cny, cost_basis, gain_loss)
+                    cls._add_realized(bucket, tx)
 
                 # cost_basis == 0 means sell-to-open (short), no taxable event yet
 
+        while pending <= last_year:
+            year_end[pending] = (pool.quantity, pool.total_cost)
+            pending += 1
+
+        if fixed:
+            for bucket in buckets.values():
+                fen = [to_fen(tx['gain_loss']) for tx in bucket['transactions']]
+                bucket['gains'] = from_fen(sum(f for f in fen if f > 0))
+                bucket['losses'] = from_fen(-sum(f for f in fen if f <= 0))
+
         return {
-            'transactions': transactions,
-            'summary': {
-                'symbol': symbol,
-                'gains': total_gains,
-                'losses': total_losses,
-                'remaining_qty': pool.quantity,
-                'remaining_cost': pool.total_cost,
+            'buckets': buckets,
+            'year_end': year_end,
+            'boundaries': boundaries,
+            'final': (pool.quantity, pool.total_cost),
+        }
+
+    def _finish(self, job: Dict, replay: Dict) -> Tuple[str, Dict[int, Dict]]:
+        """Queue checkpoints for a replayed job and shape its per-year results.
+
+        Checkpoints are written in one batch once the order stream is done.
+        """
+        symbol = job['replay']['symbol']
+        if self.checkpoints:
+            orders, digest = job['orders'], job['digest']
+            pos = job['start']
+            for year, n, quantity, total_cost in replay['boundaries']:
+                self._hash_orders(digest, orders[pos:job['start'] + n])
+                pos = job['start'] + n
+                self._checkpoint_rows.append(
+                    (symbol, year, quantity, total_cost, digest.hexdigest()))
+            self._hash_orders(digest, orders[pos:])
+            self._checkpoint_rows.append(
+                (symbol, job['replay']['last_year'], *replay['final'], digest.hexdigest()))
+
+        year_end = replay['year_end']
+        return symbol, {
+            y: {
+                'transactions': bucket['transactions'],
+                'summary': {
+                    'symbol': symbol,
+                    'gains': bucket['gains'],
+                    'losses': bucket['losses'],
+                    'remaining_qty': year_end[y][0],
+                    'remaining_cost': year_end[y][1],
+                },
             }
+            for y, bucket in replay['buckets'].items()
         }
 
+    @staticmethod
+    def _gain(proceeds: float, cost: float, fixed: bool) -> float:
+        if fixed:
+            return from_fen(to_fen(proceeds) - to_fen(cost))
+        return proceeds - cost
+
+    @staticmethod
+    def _add_realized(bucket: Dict, tx: Dict):
+        bucket['transactions'].append(tx)
+        if tx['gain_loss'] > 0:
+            bucket['gains'] += tx['gain_loss']
+        else:
+            bucket['losses'] += abs(tx['gain_loss'])
+
+    def _restore_pool(self, symbol: str, year: int,
+                      orders: List[Dict]) -> Tuple[CostPool, int, object, int | None]:
+        """Restore the pool from the latest valid checkpoint before *year*.
+
+        Returns (pool, index of first order to replay, running order hash,
+        year the pool state corresponds to or None).
+        """
+        digest = self._new_digest()
+        ckpt = self.db.get_latest_pool_checkpoint(symbol, year) if self.checkpoints else None
+        if not ckpt:
+            return CostPool(symbol), 0, digest, None
+
+        _, bound = year_range(ckpt['year'])
+        i = 0
+        while i < len(orders) and orders[i]['executed_at'] < bound:
+            i += 1
+        self._hash_orders(digest, orders[:i])
+
+        if digest.hexdigest() == ckpt['orders_hash']:
+            pool = CostPool.restore(symbol, ckpt['quantity'], ckpt['total_cost'])
+            return pool, i, digest, ckpt['year']
+
+        # Earlier orders changed since the snapshot: rebuild from scratch.
+        self._stale_symbols.append(symbol)
+        return CostPool(symbol), 0, self._new_digest(), None
+
+    def _hash_orders(self, digest, orders: List[Dict]):
+        """Feed orders, each with the rate it settles at, into a checkpoint hash.
+
+        With the rate in the hash, any rewrite of a cached rate (fallback
+        cleanup, a snapshot, a retried lookup) invalidates the checkpoints
+        built on the old one.
+        """
+        for order in orders:
+            digest.update(_fingerprint(order, self.settlement.get_rate_for_order(order)))
+
+    def _new_digest(self):
+        """Start a checkpoint hash; the two pool modes never share checkpoints."""
+        return hashlib.sha256(b'fixed-point\x1e' if self.fixed_point else b'')
+
     def export_csv(self, results: Dict, output_dir: Path,
                    dividend_results: Dict | None = None) -> Path:
         """Export combined tax report to a single CSV file.
@@ -223,13 +469,14 @@ class TaxCalculator:
             'summary': {},
         }
 
-    def _build_tx(self, order: Dict, rate: float, proceeds_cny: float,
+    @classmethod
+    def _build_tx(cls, order: Dict, rate: float, proceeds_cny: float,
                   cost_basis_cny: float, gain_loss: float) -> Dict:
         fee_original = SettlementCalculator._extract_fees(order)
         return {
             'order_id': order['order_id'],
             'symbol': order['symbol'],
-            'date': self._parse_date(order['executed_at']),
+            'date': cls._parse_date(order['executed_at']),
             'quantity': order['quantity'],
             'price': order['price'],
             'currency': order['currency'],
@@ -241,10 +488,32 @@ class TaxCalculator:
         }
 
 
-    @staticmethod
-    def _in_year(order: Dict, year: int) -> bool:
-        return datetime.fromisoformat(order['executed_at']).year == year
-
     @staticmethod
     def _parse_date(executed_at: str) -> str:
         return datetime.fromisoformat(executed_at).strftime('%Y-%m-%d')
+
+
+class _FrozenRates:
+    """Read-only stand-in for ExchangeRateManager inside worker processes."""
+
+    def __init__(self, rates: Dict[Tuple[str, str], float]):
+        self.rates = rates
+
+    def get_rate(self, date: str, from_ccy: str, to_ccy: str = 'CNY') -> float:
+        return self.rates[(date, from_ccy)]
+
+
+def _replay_with_rates(payload: Tuple[Dict, Dict]) -> Dict:
+    """Process-pool entry point: replay one job against preloaded rates."""
+    job, rates = payload
+    return TaxCalculator._replay(job, SettlementCalculator(_FrozenRates(rates)))
+
+
+def _fingerprint(order: Dict, rate: float) -> bytes:
+    """Serialize what decides an order's settled amount: its fields and rate."""
+    fees = json.dumps(order.get('fees') or {}, sort_keys=True)
+    return '\x1f'.join((
+        order['order_id'], order['side'], repr(order['quantity']),
+        repr(order['price']), order['currency'], order['executed_at'], fees,
+        repr(rate),
+    )).encode() + b'\x1e'
@@ -3,15 +3,21 @@
 Extracts dividend payments and matches withholding tax entries by
 timestamp proximity. Keeps CLI thin and parsing logic testable.
 
+parse_dividends handles a complete list; DividendStream does the same
+work batch by batch, so a long history can be parsed and stored while
+later pages are still downloading.
+
 Real data pattern (from Long Bridge API):
   Cash Dividend  | +44.00 USD | desc="OXY.US Cash Dividend: 0.22 USD per Share, Held:200"
   CO Other FEE   | -4.40  USD | desc="OXY.US Cash Dividend: ... Withholding Tax/Dividend Fee"
 """
 
 import re
-from datetime import datetime, timedelta
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
 from collections import defaultdict
-from typing import Dict, List, Tuple
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 # Max time gap (seconds) between a dividend and its withholding entry.
 _WITHHOLDING_MATCH_WINDOW = timedelta(seconds=120)
@@ -33,11 +39,9 @@ def parse_dividends(entries: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
         Each dividend dict has: symbol, currency, amount, received_at,
         flow_name, description, withholding.
     """
-    raw_divs, raw_whs = _split_entries(entries)
-    _match_withholdings(raw_divs, raw_whs)
-
-    unmatched = [wh for wh in raw_whs if not wh.get('_matched')]
-    return raw_divs, unmatched
+    stream = DividendStream()
+    dividends = stream.feed(entries, final=True)
+    return dividends, stream.unmatched
 
 
 def summarize_by_symbol(dividends: List[Dict]) -> Dict[str, float]:
@@ -48,39 +52,133 @@ def summarize_by_symbol(dividends: List[Dict]) -> Dict[str, float]:
     return dict(by_sym)
 
 
-def _split_entries(entries: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
-    """Separate cash flow entries into dividends and withholding taxes."""
-    divs: List[Dict] = []
-    whs: List[Dict] = []
+class DividendStream:
+    """Incremental parse_dividends over batches of cash flow entries.
+
+    Feed batches that each cover a later time range than every batch before
+    (the client's chronological ~90-day windows); order within a batch
+    doesn't matter.  Everything at or after the latest timestamp seen may
+    still arrive, so:
 
-    for e in entries:
-        name = e['transaction_flow_name']
-        desc = e.get('description', '')
+      - a withholding is settled once no dividend within the match window
+        can still arrive (its time + window < horizon);
+      - a dividend is released once every withholding that could be
+        credited to it is settled (its time + 2 × window < horizon).
 
-        if name == 'Cash Dividend' and e['balance'] > 0:
-            symbol = _extract_symbol(e['symbol'], desc)
-            if not symbol:
+    Only entries near the horizon are held, so memory is bounded by one
+    batch.  Each withholding is credited to the nearest dividend in its
+    currency within the window; equally near dividends go to the one fed
+    first, and a dividend's withholdings are summed in feed order.  Buffered
+    dividends are bucketed by currency as sorted integer timestamps, so a
+    match costs two bisections.
+    """
+
+    def __init__(self):
+        self.unmatched: List[Dict] = []
+        self.flow_names: Set[str] = set()
+        self._seq = 0
+        self._horizon: Optional[int] = None
+        # currency -> (times, seqs) of buffered dividends, sorted by (time, seq)
+        self._buckets: Dict[str, Tuple[List[int], List[int]]] = {}
+        self._divs: Dict[int, Tuple[Dict, List[Tuple[int, float]]]] = {}
+        self._whs: List[Tuple[int, int, Dict]] = []
+
+    def feed(self, entries: Iterable[Dict], final: bool = False) -> List[Dict]:
+        """Add a batch; return the dividends that are now final, in feed order.
+
+        With final=True the batch is the last one and everything is released.
+        """
+        new: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        latest = self._horizon
+        for e in entries:
+            self.flow_names.add(e['transaction_flow_name'])
+            kind, record = _classify(e)
+            if kind is None:
                 continue
-            divs.append({
-                'symbol': symbol,
-                'currency': e['currency'],
-                'amount': e['balance'],
-                'received_at': e['business_time'],
-                'flow_name': name,
-                'description': desc,
-                'withholding': 0.0,
-            })
-
-        elif _is_withholding(desc):
-            whs.append({
-                'amount': abs(e['balance']),
-                'received_at': e['business_time'],
-                'currency': e['currency'],
-                'description': desc,
-                '_matched': False,
-            })
-
-    return divs, whs
+            t = _epoch_us(record['received_at'])
+            latest = t if latest is None else max(latest, t)
+            seq = self._seq
+            self._seq += 1
+            if kind == 'dividend':
+                self._divs[seq] = (record, [])
+                new[record['currency']].append((t, seq))
+            else:
+                self._whs.append((t, seq, record))
+
+        for currency, added in new.items():
+            times, seqs = self._buckets.setdefault(currency, ([], []))
+            merged = sorted(list(zip(times, seqs)) + added)
+            times[:] = [t for t, _ in merged]
+            seqs[:] = [q for _, q in merged]
+
+        self._horizon = latest
+        return self._flush(None if final else latest)
+
+    def close(self) -> List[Dict]:
+        """No more batches: release everything still buffered."""
+        return self._flush(None)
+
+    def _flush(self, horizon: Optional[int]) -> List[Dict]:
+        window = _WITHHOLDING_MATCH_WINDOW // _MICROSECOND
+
+        ready, waiting = [], []
+        for item in self._whs:
+            settled = horizon is None or item[0] + window < horizon
+            (ready if settled else waiting).append(item)
+        self._whs = waiting
+
+        for t, seq, wh in sorted(ready, key=itemgetter(1)):
+            bucket = self._buckets.get(wh['currency'])
+            best = _nearest(*bucket, t) if bucket else None
+            if best and best[0] <= window:
+                self._divs[best[1]][1].append((seq, wh['amount']))
+                wh['_matched'] = True
+            else:
+                self.unmatched.append(wh)
+
+        released = []
+        for times, seqs in self._buckets.values():
+            k = len(times) if horizon is None else bisect_left(times, horizon - 2 * window)
+            for seq in seqs[:k]:
+                div, credits = self._divs.pop(seq)
+                for _, amount in sorted(credits):
+                    div['withholding'] += amount
+                released.append((seq, div))
+            del times[:k], seqs[:k]
+
+        released.sort(key=itemgetter(0))
+        return [div for _, div in released]
+
+
+def _classify(e: Dict) -> Tuple[Optional[str], Optional[Dict]]:
+    """Turn one cash flow entry into ('dividend' | 'withholding', record) or (None, None)."""
+    name = e['transaction_flow_name']
+    desc = e.get('description', '')
+
+    if name == 'Cash Dividend' and e['balance'] > 0:
+        symbol = _extract_symbol(e['symbol'], desc)
+        if not symbol:
+            return None, None
+        return 'dividend', {
+            'symbol': symbol,
+            'currency': e['currency'],
+            'amount': e['balance'],
+            'received_at': e['business_time'],
+            'flow_name': name,
+            'description': desc,
+            'withholding': 0.0,
+        }
+
+    if _is_withholding(desc):
+        return 'withholding', {
+            'amount': abs(e['balance']),
+            'received_at': e['business_time'],
+            'currency': e['currency'],
+            'description': desc,
+            '_matched': False,
+        }
+
+    return None, None
 
 
 def _extract_symbol(raw_symbol: str | None, description: str) -> str | None:
@@ -108,26 +206,36 @@ def _is_withholding(description: str) -> bool:
     return 'withholding tax' in lower or 'dividend fee' in lower
 
 
-def _match_withholdings(divs: List[Dict], whs: List[Dict]):
-    """Match each withholding entry to the nearest dividend by timestamp.
+def _nearest(times: List[int], keys: List[int], t: int) -> Tuple[int, int]:
+    """(distance, key) of the entry nearest *t* in non-empty sorted *times*.
 
-    Mutates dividend dicts in-place (adds to 'withholding' field).
-    Mutates withholding dicts (sets '_matched' flag).
-    Only matches entries with the same currency within the time window.
+    *times*/*keys* are sorted by (time, key); among equally near entries
+    the smallest key wins.
     """
-    for wh in whs:
-        wh_time = datetime.fromisoformat(wh['received_at'])
-        best = None
-        best_delta = _WITHHOLDING_MATCH_WINDOW + timedelta(seconds=1)
+    pos = bisect_right(times, t)
+    best = None
+    if pos:
+        # First of the equal-time run at or before t.
+        j = bisect_left(times, times[pos - 1])
+        best = (t - times[j], keys[j])
+    if pos < len(times):
+        after = (times[pos] - t, keys[pos])
+        if best is None or after < best:
+            best = after
+    return best
 
-        for div in divs:
-            if div['currency'] != wh['currency']:
-                continue
-            delta = abs(wh_time - datetime.fromisoformat(div['received_at']))
-            if delta < best_delta:
-                best_delta = delta
-                best = div
-
-        if best and best_delta <= _WITHHOLDING_MATCH_WINDOW:
-            best['withholding'] += wh['amount']
-            wh['_matched'] = True
+
+_MICROSECOND = timedelta(microseconds=1)
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = _EPOCH.replace(tzinfo=timezone.utc)
+
+
+def _epoch_us(timestamp: str) -> int:
+    """Parse an ISO timestamp to integer microseconds since the epoch.
+
+    Naive timestamps are measured on their own wall clock, like naive
+    datetime subtraction, so differences match timedelta arithmetic exactly.
+    """
+    dt = datetime.fromisoformat(timestamp)
+    epoch = _EPOCH if dt.tzinfo is None else _EPOCH_UTC
+    return (dt - epoch) // _MICROSECOND
@@ -0,0 +1,63 @@
+"""Thread-safe circuit breaker for flaky external services.
+
+After `failure_threshold` consecutive failures the circuit opens and calls
+are refused at once (no timeout to wait out) for `reset_after` seconds.
+Then one trial call is let through (half-open): success closes the
+circuit, failure opens it again for another `reset_after`.
+"""
+
+import threading
+import time
+from typing import Callable, Optional
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class CircuitBreaker:
+    """Stop calling a service that keeps failing; retry it after a cool-down."""
+
+    def __init__(self, failure_threshold: int = 5, reset_after: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        if failure_threshold < 1:
+            raise ValueError(f"failure_threshold must be at least 1, got {failure_threshold}")
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return CLOSED
+            if self._trial or self._clock() - self._opened_at >= self.reset_after:
+                return HALF_OPEN
+            return OPEN
+
+    def allow(self) -> bool:
+        """True if a call may go ahead now."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial or self._clock() - self._opened_at < self.reset_after:
+                return False
+            self._trial = True   # only one trial call while half-open
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+                self._trial = False
@@ -2,11 +2,12 @@
 
 import os
 from pathlib import Path
-from dotenv import load_dotenv
 
-# Load .env from project root
+# Load .env from project root (python-dotenv is only imported when there is one)
 PROJECT_ROOT = Path(__file__).parent.parent
-load_dotenv(PROJECT_ROOT / '.env')
+if (PROJECT_ROOT / '.env').exists():
+    from dotenv import load_dotenv
+    load_dotenv(PROJECT_ROOT / '.env')
 
 class Config:
     # Project paths
@@ -18,9 +19,20 @@ class Config:
     LONGBRIDGE_APP_KEY = os.getenv('LONGBRIDGE_APP_KEY')
     LONGBRIDGE_APP_SECRET = os.getenv('LONGBRIDGE_APP_SECRET')
     LONGBRIDGE_ACCESS_TOKEN = os.getenv('LONGBRIDGE_ACCESS_TOKEN')
+
+    # Long Bridge request pacing: one quota shared by all fetch threads
+    LONGBRIDGE_REQUESTS_PER_SECOND = float(os.getenv('LONGBRIDGE_REQUESTS_PER_SECOND', '2'))
+    LONGBRIDGE_FETCH_WORKERS = int(os.getenv('LONGBRIDGE_FETCH_WORKERS', '4'))
     
-    # Database settings
-    DATABASE_PATH = DATA_DIR / 'tax_calculator.db'
+    # Exchange rates: a local snapshot (CSV or SQLite) is tried before the
+    # API; offline mode never calls the API at all
+    EXCHANGE_RATE_SNAPSHOT = os.getenv('EXCHANGE_RATE_SNAPSHOT')
+    EXCHANGE_RATE_OFFLINE = os.getenv('EXCHANGE_RATE_OFFLINE', '').lower() in ('1', 'true', 'yes')
+    # Dates no provider could serve are not asked for again for this many days
+    RATE_MISS_TTL_DAYS = float(os.getenv('RATE_MISS_TTL_DAYS', '7'))
+
+    # Database settings (TAX_CALCULATOR_DB points scripted runs at another file)
+    DATABASE_PATH = Path(os.getenv('TAX_CALCULATOR_DB', DATA_DIR / 'tax_calculator.db'))
     
     # Tax calculation settings
     CAPITAL_GAINS_TAX_RATE = 0.20  # 20% for Chinese residents
@@ -28,7 +40,11 @@ class Config:
     
     @classmethod
     def init_dirs(cls):
-        """Create necessary directories."""
+        """Create necessary directories.
+
+        Not needed before other commands: the database and CSV export
+        create their own directories on first write.
+        """
         cls.DATA_DIR.mkdir(exist_ok=True)
         cls.OUTPUT_DIR.mkdir(exist_ok=True)
     
@@ -4,13 +4,23 @@ Pure computation module with zero external dependencies.
 Accepts pre-settled amounts in reporting currency (CNY).
 
 Supports both long (buy-first) and short (sell-first) positions.
+
+History is stored column-wise in `array` buffers (no per-transaction
+objects) and can be switched off entirely with `record_history=False`.
+
+FixedCostPool has the same interface but keeps its state in integer fen
+and quantity units (see money.py), so it never drifts and needs no dust
+cleanup.
 """
 
+from array import array
+from collections.abc import Sequence
 from dataclasses import dataclass
-from typing import List
 
+from .money import from_fen, from_units, prorate, to_fen, to_units
 
-@dataclass
+
+@dataclass(slots=True)
 class PoolTransaction:
     """Record of a cost pool state change."""
     side: str           # BUY or SELL
@@ -21,6 +31,49 @@ class PoolTransaction:
     total_cost_after: float
 
 
+class PoolHistory(Sequence):
+    """Compact, append-only record of pool state changes.
+
+    Columns live in `array` buffers; a `PoolTransaction` is only built when
+    an entry is read.
+    """
+
+    __slots__ = ('_side', '_quantity', '_amount', '_avg_cost_after',
+                 '_quantity_after', '_total_cost_after')
+
+    def __init__(self):
+        self._side = array('b')            # +1 BUY, -1 SELL
+        self._quantity = array('d')
+        self._amount = array('d')
+        self._avg_cost_after = array('d')
+        self._quantity_after = array('d')
+        self._total_cost_after = array('d')
+
+    def append(self, side: str, qty: float, amount: float, avg_cost_after: float,
+               quantity_after: float, total_cost_after: float):
+        self._side.append(1 if side == 'BUY' else -1)
+        self._quantity.append(qty)
+        self._amount.append(amount)
+        self._avg_cost_after.append(avg_cost_after)
+        self._quantity_after.append(quantity_after)
+        self._total_cost_after.append(total_cost_after)
+
+    def __len__(self) -> int:
+        return len(self._side)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return PoolTransaction(
+            side='BUY' if self._side[i] > 0 else 'SELL',
+            quantity=self._quantity[i],
+            amount=self._amount[i],
+            avg_cost_after=self._avg_cost_after[i],
+            quantity_after=self._quantity_after[i],
+            total_cost_after=self._total_cost_after[i],
+        )
+
+
 class CostPool:
     """Weighted average cost pool for a single symbol.
 
@@ -33,13 +86,27 @@ class CostPool:
       - buy() on short pool closes at avg proceeds, returns cost_basis (the proceeds locked in)
 
     In both cases the caller computes gain/loss = proceeds - cost_basis.
+
+    Pass record_history=False when only the running state is needed (e.g.
+    replaying millions of fills); `history` is then always empty.
     """
 
-    def __init__(self, symbol: str):
+    __slots__ = ('symbol', '_quantity', '_total_cost', '_history')
+
+    def __init__(self, symbol: str, record_history: bool = True):
         self.symbol = symbol
         self._quantity: float = 0       # positive = long, negative = short
         self._total_cost: float = 0     # for long: total cost; for short: total proceeds received
-        self._history: List[PoolTransaction] = []
+        self._history: PoolHistory | None = PoolHistory() if record_history else None
+
+    @classmethod
+    def restore(cls, symbol: str, quantity: float, total_cost: float,
+                record_history: bool = True) -> 'CostPool':
+        """Rebuild a pool from a saved (quantity, total_cost) snapshot."""
+        pool = cls(symbol, record_history)
+        pool._quantity = quantity
+        pool._total_cost = total_cost
+        return pool
 
     @property
     def quantity(self) -> float:
@@ -57,8 +124,9 @@ class CostPool:
         return self._total_cost / abs(self._quantity)
 
     @property
-    def history(self) -> List[PoolTransaction]:
-        return list(self._history)
+    def history(self) -> Sequence[PoolTransaction]:
+        """Read-only view of recorded transactions (built lazily on access)."""
+        return self._history if self._history is not None else ()
 
     @property
     def is_short(self) -> bool:
@@ -158,11 +226,123 @@ class CostPool:
             self._total_cost = 0
 
     def _record(self, side: str, qty: float, amount: float):
-        self._history.append(PoolTransaction(
-            side=side,
-            quantity=qty,
-            amount=amount,
-            avg_cost_after=self.avg_cost,
-            quantity_after=self._quantity,
-            total_cost_after=self._total_cost,
-        ))
+        if self._history is not None:
+            self._history.append(side, qty, amount, self.avg_cost,
+                                 self._quantity, self._total_cost)
+
+
+class FixedCostPool:
+    """CostPool with exact integer state: quantity in units, cost in fen.
+
+    Same public API as CostPool — floats in, floats out.  Amounts are
+    rounded to the fen on entry; partial closes release cost by exact
+    integer prorating, so closing a position in any number of lots
+    releases exactly what it cost and leaves the pool at exactly zero.
+    """
+
+    __slots__ = ('symbol', '_units', '_fen', '_history')
+
+    def __init__(self, symbol: str, record_history: bool = True):
+        self.symbol = symbol
+        self._units: int = 0    # positive = long, negative = short
+        self._fen: int = 0      # for long: total cost; for short: total proceeds received
+        self._history: PoolHistory | None = PoolHistory() if record_history else None
+
+    @classmethod
+    def restore(cls, symbol: str, quantity: float, total_cost: float,
+                record_history: bool = True) -> 'FixedCostPool':
+        """Rebuild a pool from a saved (quantity, total_cost) snapshot."""
+        pool = cls(symbol, record_history)
+        pool._units = to_units(quantity)
+        pool._fen = to_fen(total_cost)
+        return pool
+
+    @property
+    def quantity(self) -> float:
+        return from_units(self._units)
+
+    @property
+    def total_cost(self) -> float:
+        return from_fen(self._fen)
+
+    @property
+    def avg_cost(self) -> float:
+        """Per-unit weighted average cost (or proceeds for short)."""
+        if not self._units:
+            return 0
+        return self.total_cost / abs(self.quantity)
+
+    @property
+    def history(self) -> Sequence[PoolTransaction]:
+        """Read-only view of recorded transactions (built lazily on access)."""
+        return self._history if self._history is not None else ()
+
+    @property
+    def is_short(self) -> bool:
+        return self._units < 0
+
+    @property
+    def is_long(self) -> bool:
+        return self._units > 0
+
+    def buy(self, qty: float, settled_amount: float) -> float:
+        """Process a buy; see CostPool.buy."""
+        if qty <= 0:
+            raise ValueError(f"Buy quantity must be positive, got {qty}")
+        if settled_amount < 0:
+            raise ValueError(f"Settled amount cannot be negative, got {settled_amount}")
+        units, fen = to_units(qty), to_fen(settled_amount)
+
+        if self._units < 0:
+            held = -self._units
+            close = min(units, held)
+            cost_basis = prorate(self._fen, close, held)
+            self._units += close
+            self._fen -= cost_basis
+            self._record('BUY', close, cost_basis)
+
+            remainder = units - close
+            if remainder:
+                remainder_cost = prorate(fen, remainder, units)
+                self._units += remainder
+                self._fen += remainder_cost
+                self._record('BUY', remainder, remainder_cost)
+
+            return from_fen(cost_basis)
+
+        self._units += units
+        self._fen += fen
+        self._record('BUY', units, fen)
+        return 0
+
+    def sell(self, qty: float, settled_amount: float = 0) -> float:
+        """Process a sell; see CostPool.sell."""
+        if qty <= 0:
+            raise ValueError(f"Sell quantity must be positive, got {qty}")
+        units = to_units(qty)
+
+        if self._units > 0:
+            if units > self._units:
+                raise ValueError(
+                    f"{self.symbol}: cannot sell {qty}, only holding {self.quantity}"
+                )
+            cost_basis = prorate(self._fen, units, self._units)
+            self._units -= units
+            self._fen -= cost_basis
+            self._record('SELL', units, cost_basis)
+            return from_fen(cost_basis)
+
+        if settled_amount <= 0:
+            raise ValueError(
+                f"{self.symbol}: sell-to-open requires settled_amount > 0"
+            )
+        fen = to_fen(settled_amount)
+        self._units -= units
+        self._fen += fen
+        self._record('SELL', units, fen)
+        return 0
+
+    def _record(self, side: str, units: int, fen: int):
+        if self._history is not None:
+            self._history.append(side, from_units(units), from_fen(fen), self.avg_cost,
+                                 self.quantity, self.total_cost)
@@ -1,21 +1,133 @@
 """Database operations for storing trading data and exchange rates."""
 
+import hashlib
 import sqlite3
 import json
-from typing import List, Dict, Optional
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Dict, Optional, Set, Tuple
 from pathlib import Path
 
 
+def year_range(year: int) -> Tuple[str, str]:
+    """Half-open ISO bounds [start, end) covering one calendar year.
+
+    Timestamps and dates are stored as ISO strings, so a plain range
+    comparison selects the same rows as `strftime('%Y', col) = year` but
+    can seek an index on the column instead of scanning the table.
+    """
+    return f"{year:04d}-01-01", f"{year + 1:04d}-01-01"
+
+
+def _cashflow_key(entry: Dict, occurrence: int = 0) -> str:
+    """Dedup key for a raw cash flow entry (the API provides no entry id).
+
+    Entries can be genuinely identical (two equal withholding lines in the
+    same second), so *occurrence* numbers the copies within one fetched
+    window; a re-fetch of the window yields the same keys.
+    """
+    fields = ('transaction_flow_name', 'direction', 'balance', 'currency',
+              'business_time', 'symbol', 'description')
+    raw = '\x1f'.join(repr(entry.get(f)) for f in fields)
+    if occurrence:
+        raw += f'\x1f#{occurrence}'
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
 class DatabaseManager:
+    """SQLite access layer.
+
+    Each thread gets one long-lived connection, opened lazily on first use
+    and reused by every call from that thread.  WAL journaling lets readers
+    run concurrently with a writer.  Writes go through `transaction()`,
+    which commits on success and rolls back on error.
+    """
+
+    # Applied once per connection.
+    _PRAGMAS = (
+        'PRAGMA journal_mode = WAL',
+        'PRAGMA synchronous = NORMAL',    # safe with WAL, far fewer fsyncs
+        'PRAGMA temp_store = MEMORY',
+        'PRAGMA cache_size = -16000',     # ~16 MB page cache
+        'PRAGMA busy_timeout = 5000',     # wait for a concurrent writer
+    )
+
     def __init__(self, db_path: Path):
         self.db_path = db_path
+        self._local = threading.local()
+        self._conns: List[sqlite3.Connection] = []
+        self._conns_lock = threading.Lock()
         self._init_database()
 
+    # -- connection management -----------------------------------------------
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """The calling thread's connection (opened on first use)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            for pragma in self._PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+            self._local.depth = 0
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Explicit write scope: commit on success, roll back on error.
+
+        Nested scopes join the outermost one, so helpers that open their
+        own transaction can be composed into a larger atomic unit.
+        """
+        conn = self.conn
+        if self._local.depth:
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+
+        self._local.depth = 1
+        try:
+            conn.execute('BEGIN')
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._local.depth = 0
+
+    def close(self):
+        """Close every connection opened by this manager."""
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                pass  # owned by another thread that has already exited
+        self._local = threading.local()
+
+    def __enter__(self) -> 'DatabaseManager':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -- schema ---------------------------------------------------------------
+
     def _init_database(self):
         """Initialize database tables."""
         self.db_path.parent.mkdir(exist_ok=True)
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self.transaction() as conn:
             conn.execute('''
                 CREATE TABLE IF NOT EXISTS orders (
                     order_id TEXT PRIMARY KEY,
@@ -54,6 +166,78 @@ class DatabaseManager:
                     UNIQUE(symbol, received_at, amount)
                 )
             ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS pool_checkpoints (
+                    symbol TEXT NOT NULL,
+                    year INTEGER NOT NULL,
+                    quantity REAL NOT NULL,
+                    total_cost REAL NOT NULL,
+                    orders_hash TEXT NOT NULL,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (symbol, year)
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cashflow_raw (
+                    entry_key TEXT PRIMARY KEY,
+                    transaction_flow_name TEXT NOT NULL,
+                    direction TEXT,
+                    balance REAL NOT NULL,
+                    currency TEXT NOT NULL,
+                    business_time TEXT NOT NULL,
+                    symbol TEXT,
+                    description TEXT,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    endpoint TEXT NOT NULL,
+                    account TEXT NOT NULL,
+                    synced_until TEXT NOT NULL,
+                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (endpoint, account)
+                )
+            ''')
+            # Negative cache: dates no rate provider could serve, so repeated
+            # runs skip them until the entry is older than the miss TTL.
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS rate_misses (
+                    date TEXT NOT NULL,
+                    from_currency TEXT NOT NULL,
+                    to_currency TEXT NOT NULL,
+                    tried_at TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 1,
+                    PRIMARY KEY (from_currency, to_currency, date)
+                )
+            ''')
+            # Secondary indexes: year filters are half-open ranges on the
+            # timestamp column, so each one can seek instead of scanning.
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_orders_symbol_executed
+                ON orders (symbol, executed_at, order_id)
+            ''')
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_orders_side_executed
+                ON orders (side, executed_at, symbol)
+            ''')
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_orders_executed
+                ON orders (executed_at)
+            ''')
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_dividends_received
+                ON dividends (received_at)
+            ''')
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_cashflow_raw_time
+                ON cashflow_raw (business_time)
+            ''')
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_rates_pair_date
+                ON exchange_rates (from_currency, to_currency, date, rate)
+            ''')
+
             # Migrate: add source column if missing (existing databases)
             cursor = conn.execute("PRAGMA table_info(exchange_rates)")
             columns = [row[1] for row in cursor.fetchall()]
@@ -67,12 +251,23 @@ class DatabaseManager:
                 conn.execute("ALTER TABLE dividends ADD COLUMN withholding REAL NOT NULL DEFAULT 0")
 
     def save_orders(self, orders: List[Dict]):
-        """Save trading orders to database (batch insert)."""
-        with sqlite3.connect(self.db_path) as conn:
+        """Save trading orders to database (batch upsert).
+
+        An order already stored is updated in place, but keeps its fees when
+        the incoming order has none: the order list API returns no fees, so
+        re-importing must not wipe what update-fees backfilled.
+        """
+        with self.transaction() as conn:
             conn.executemany('''
-                INSERT OR REPLACE INTO orders
+                INSERT INTO orders
                 (order_id, symbol, side, quantity, price, currency, executed_at, fees_json)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (order_id) DO UPDATE SET
+                    symbol = excluded.symbol, side = excluded.side,
+                    quantity = excluded.quantity, price = excluded.price,
+                    currency = excluded.currency, executed_at = excluded.executed_at,
+                    fees_json = CASE WHEN excluded.fees_json IN ('{}', 'null')
+                                     THEN orders.fees_json ELSE excluded.fees_json END
             ''', [
                 (o['order_id'], o['symbol'], o['side'], o['quantity'],
                  o['price'], o['currency'], o['executed_at'],
@@ -82,13 +277,12 @@ class DatabaseManager:
 
     def get_symbols_with_sells(self, year: int) -> List[str]:
         """Get symbols that have SELL orders in a specific year."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute('''
-                SELECT DISTINCT symbol FROM orders
-                WHERE strftime('%Y', executed_at) = ? AND side = 'SELL'
-                ORDER BY symbol
-            ''', (str(year),))
-            return [row[0] for row in cursor.fetchall()]
+        cursor = self.conn.execute('''
+            SELECT DISTINCT symbol FROM orders
+            WHERE side = 'SELL' AND executed_at >= ? AND executed_at < ?
+            ORDER BY symbol
+        ''', year_range(year))
+        return [row[0] for row in cursor.fetchall()]
 
     def get_orders_until(self, symbol: str, end_year: int) -> List[Dict]:
         """Get all orders for a symbol from earliest record up to end of end_year.
@@ -96,52 +290,206 @@ class DatabaseManager:
         Returns orders sorted by executed_at ascending.
         This is the data source for building a complete cost pool.
         """
-        end_date = f"{end_year}-12-31T23:59:59"
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute('''
-                SELECT * FROM orders
-                WHERE symbol = ? AND executed_at <= ?
-                ORDER BY executed_at
-            ''', (symbol, end_date))
+        _, end = year_range(end_year)
+        cursor = self.conn.execute('''
+            SELECT * FROM orders
+            WHERE symbol = ? AND executed_at < ?
+            ORDER BY executed_at, order_id
+        ''', (symbol, end))
+        return [self._row_to_order(row) for row in cursor.fetchall()]
 
-            return [self._row_to_order(row) for row in cursor.fetchall()]
+    def iter_orders_until(self, end_year: int,
+                          symbols: Optional[Iterable[str]] = None) -> Iterator[Dict]:
+        """Stream orders up to the end of end_year from a single cursor.
+
+        Ordered by (symbol, executed_at, order_id) — the order of
+        idx_orders_symbol_executed, so rows stream without a sort and can be
+        grouped per symbol with itertools.groupby.  *symbols* restricts the
+        scan to those symbols.
+        """
+        _, end = year_range(end_year)
+        query = "SELECT * FROM orders WHERE executed_at < ?"
+        params: list = [end]
+        if symbols is not None:
+            query += " AND symbol IN (SELECT value FROM json_each(?))"
+            params.append(json.dumps(list(symbols)))
+        query += " ORDER BY symbol, executed_at, order_id"
+
+        for row in self.conn.execute(query, params):
+            yield self._row_to_order(row)
 
     def save_exchange_rate(self, date: str, from_currency: str, to_currency: str,
                           rate: float, source: str = 'unknown'):
         """Save exchange rate to database."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.transaction() as conn:
             conn.execute('''
                 INSERT OR REPLACE INTO exchange_rates
                 (date, from_currency, to_currency, rate, source)
                 VALUES (?, ?, ?, ?, ?)
             ''', (date, from_currency, to_currency, rate, source))
 
+    def save_exchange_rates(self, rows: Iterable[Tuple[str, str, str, float, str]]):
+        """Save many (date, from, to, rate, source) rows in one transaction."""
+        with self.transaction() as conn:
+            conn.executemany('''
+                INSERT OR REPLACE INTO exchange_rates
+                (date, from_currency, to_currency, rate, source)
+                VALUES (?, ?, ?, ?, ?)
+            ''', rows)
+
     def get_exchange_rate(self, date: str, from_currency: str,
                           to_currency: str) -> Optional[Dict]:
         """Get exchange rate from database. Returns dict with 'rate' and 'source', or None."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute('''
-                SELECT rate, source FROM exchange_rates
-                WHERE date = ? AND from_currency = ? AND to_currency = ?
-            ''', (date, from_currency, to_currency))
-            result = cursor.fetchone()
-            return {'rate': result[0], 'source': result[1]} if result else None
+        cursor = self.conn.execute('''
+            SELECT rate, source FROM exchange_rates
+            WHERE date = ? AND from_currency = ? AND to_currency = ?
+        ''', (date, from_currency, to_currency))
+        result = cursor.fetchone()
+        return {'rate': result[0], 'source': result[1]} if result else None
+
+    def get_exchange_rates(self, from_currency: str,
+                           to_currency: str) -> List[Tuple[str, float]]:
+        """Get every cached (date, rate) for a currency pair, sorted by date."""
+        cursor = self.conn.execute('''
+            SELECT date, rate FROM exchange_rates
+            WHERE from_currency = ? AND to_currency = ?
+            ORDER BY date
+        ''', (from_currency, to_currency))
+        return [(row[0], row[1]) for row in cursor.fetchall()]
+
+    def iter_exchange_rates(self) -> Iterator[Tuple[str, str, str, float]]:
+        """Yield every non-fallback (date, from, to, rate), by pair then date."""
+        cursor = self.conn.execute('''
+            SELECT date, from_currency, to_currency, rate FROM exchange_rates
+            WHERE source != 'fallback'
+            ORDER BY from_currency, to_currency, date
+        ''')
+        for row in cursor:
+            yield tuple(row)
+
+    def get_cached_rate_dates(self, dates: Iterable[str], from_currency: str,
+                              to_currency: str) -> Set[str]:
+        """Return the subset of *dates* that already have a cached rate.
+
+        One range query over [min(dates), max(dates)] on the pair index,
+        intersected with the requested set.
+        """
+        wanted = set(dates)
+        if not wanted:
+            return set()
+        cursor = self.conn.execute('''
+            SELECT date FROM exchange_rates
+            WHERE from_currency = ? AND to_currency = ?
+              AND date >= ? AND date <= ?
+        ''', (from_currency, to_currency, min(wanted), max(wanted)))
+        return {row[0] for row in cursor if row[0] in wanted}
+
+    def save_rate_misses(self, rows: Iterable[Tuple[str, str, str]], tried_at: str):
+        """Record (date, from, to) rows no provider could serve, as tried at *tried_at*.
+
+        A date already recorded gets the new time and one more attempt.
+        """
+        with self.transaction() as conn:
+            conn.executemany('''
+                INSERT INTO rate_misses (date, from_currency, to_currency, tried_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (from_currency, to_currency, date)
+                DO UPDATE SET tried_at = excluded.tried_at, attempts = attempts + 1
+            ''', ((d, f, t, tried_at) for d, f, t in rows))
+
+    def get_rate_misses(self, from_currency: str, to_currency: str,
+                        since: str) -> Set[str]:
+        """Dates for a pair that no provider could serve when tried at or after *since*."""
+        cursor = self.conn.execute('''
+            SELECT date FROM rate_misses
+            WHERE from_currency = ? AND to_currency = ? AND tried_at >= ?
+        ''', (from_currency, to_currency, since))
+        return {row[0] for row in cursor}
+
+    def get_rate_gaps(self, year: int = None) -> List[Dict]:
+        """Dates that still need a real rate, by pair then date.
+
+        That is recorded misses with no rate since, plus dates covered only
+        by a fallback rate.  Each row has date, from_currency, to_currency,
+        kind ('missing' or 'fallback'), tried_at and attempts (None when
+        the date was never recorded as a miss).
+        """
+        start, end = year_range(year) if year else ('', '9999')
+        cursor = self.conn.execute('''
+            SELECT m.date, m.from_currency, m.to_currency, 'missing' AS kind,
+                   m.tried_at, m.attempts
+            FROM rate_misses m
+            LEFT JOIN exchange_rates r
+              ON r.date = m.date AND r.from_currency = m.from_currency
+             AND r.to_currency = m.to_currency
+            WHERE r.date IS NULL AND m.date >= ? AND m.date < ?
+            UNION ALL
+            SELECT r.date, r.from_currency, r.to_currency, 'fallback',
+                   m.tried_at, m.attempts
+            FROM exchange_rates r
+            LEFT JOIN rate_misses m
+              ON m.date = r.date AND m.from_currency = r.from_currency
+             AND m.to_currency = r.to_currency
+            WHERE r.source = 'fallback' AND r.date >= ? AND r.date < ?
+            ORDER BY 2, 3, 1
+        ''', (start, end, start, end))
+        return [dict(row) for row in cursor]
+
+    def clear_rate_misses(self, year: int = None) -> int:
+        """Forget recorded misses (all, or one year's) so providers are asked again."""
+        start, end = year_range(year) if year else ('', '9999')
+        with self.transaction() as conn:
+            return conn.execute("DELETE FROM rate_misses WHERE date >= ? AND date < ?",
+                                (start, end)).rowcount
+
+    def clear_fallback_rates(self, year: int = None) -> int:
+        """Delete hardcoded fallback rates (all, or one year's) so they are fetched again.
+
+        Cost pool checkpoints priced with them are dropped in the same
+        transaction: for each currency, every symbol traded in it loses its
+        checkpoints from the year of the earliest deleted rate on.
+        """
+        start, end = year_range(year) if year else ('', '9999')
+        with self.transaction() as conn:
+            earliest = conn.execute('''
+                SELECT from_currency, MIN(date) FROM exchange_rates
+                WHERE source = 'fallback' AND date >= ? AND date < ?
+                GROUP BY from_currency
+            ''', (start, end)).fetchall()
+            conn.executemany('''
+                DELETE FROM pool_checkpoints
+                WHERE year >= ? AND symbol IN (SELECT symbol FROM orders WHERE currency = ?)
+            ''', [(int(first[:4]), currency) for currency, first in earliest])
+            return conn.execute(
+                "DELETE FROM exchange_rates WHERE source = 'fallback' AND date >= ? AND date < ?",
+                (start, end)).rowcount
 
     def clear_year_data(self, year: int):
         """Clear all data for a specific year."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("DELETE FROM orders WHERE strftime('%Y', executed_at) = ?", (str(year),))
-            conn.execute("DELETE FROM exchange_rates WHERE strftime('%Y', date) = ?", (str(year),))
+        with self.transaction() as conn:
+            bounds = year_range(year)
+            conn.execute("DELETE FROM orders WHERE executed_at >= ? AND executed_at < ?", bounds)
+            conn.execute("DELETE FROM exchange_rates WHERE date >= ? AND date < ?", bounds)
+            conn.execute("DELETE FROM rate_misses WHERE date >= ? AND date < ?", bounds)
+            # Cost pools from this year on were built from the deleted data.
+            conn.execute("DELETE FROM pool_checkpoints WHERE year >= ?", (year,))
 
     def update_order_fees(self, order_id: str, fees: Dict):
         """Update only the fees_json field for an existing order."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.transaction() as conn:
             conn.execute(
                 "UPDATE orders SET fees_json = ? WHERE order_id = ?",
                 (json.dumps(fees), order_id)
             )
 
+    def update_orders_fees(self, rows: Iterable[Tuple[str, Dict]]):
+        """Update fees_json for many (order_id, fees) pairs in one transaction."""
+        with self.transaction() as conn:
+            conn.executemany(
+                "UPDATE orders SET fees_json = ? WHERE order_id = ?",
+                [(json.dumps(fees), order_id) for order_id, fees in rows]
+            )
+
     def get_orders_missing_fees(self, year: int = None) -> List[Dict]:
         """Get orders that have no fee data yet.
 
@@ -153,28 +501,25 @@ class DatabaseManager:
         '''
         params = []
         if year:
-            query += " AND strftime('%Y', executed_at) = ?"
-            params.append(str(year))
-        query += " ORDER BY executed_at"
+            query += " AND executed_at >= ? AND executed_at < ?"
+            params.extend(year_range(year))
+        query += " ORDER BY executed_at, order_id"
 
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            return [dict(row) for row in conn.execute(query, params).fetchall()]
+        return [dict(row) for row in self.conn.execute(query, params).fetchall()]
 
     def get_fallback_rate_count(self, year: int = None) -> int:
         """Count exchange rates that used fallback (hardcoded) source."""
         query = "SELECT COUNT(*) FROM exchange_rates WHERE source = 'fallback'"
         params = []
         if year:
-            query += " AND strftime('%Y', date) = ?"
-            params.append(str(year))
-        with sqlite3.connect(self.db_path) as conn:
-            return conn.execute(query, params).fetchone()[0]
+            query += " AND date >= ? AND date < ?"
+            params.extend(year_range(year))
+        return self.conn.execute(query, params).fetchone()[0]
 
 
     def save_dividends(self, dividends: List[Dict]):
         """Save dividend records (skip duplicates)."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.transaction() as conn:
             conn.executemany('''
                 INSERT OR IGNORE INTO dividends
                 (symbol, currency, amount, withholding, received_at, flow_name, description)
@@ -185,16 +530,112 @@ class DatabaseManager:
                 for d in dividends
             ])
 
+    def clear_dividends(self, archived_only: bool = False):
+        """Delete dividend records (before rebuilding them).
+
+        With *archived_only*, only dividends whose source entry is in the
+        raw cash flow archive go: a dividend's received_at is the
+        business_time of the entry it was parsed from, so rows imported
+        before the archive existed, or in windows it lacks, are kept.
+        """
+        with self.transaction() as conn:
+            if archived_only:
+                conn.execute('''
+                    DELETE FROM dividends
+                    WHERE received_at IN (SELECT business_time FROM cashflow_raw)
+                ''')
+            else:
+                conn.execute("DELETE FROM dividends")
+
+    def save_cashflow_raw(self, entries: Iterable[Dict]):
+        """Archive one fetched window of raw cash flow; entries already stored are skipped.
+
+        Identical entries within the window are each kept (see _cashflow_key).
+        """
+        seen = Counter()
+        rows = []
+        for e in entries:
+            key = _cashflow_key(e)
+            rows.append((_cashflow_key(e, seen[key]), e['transaction_flow_name'],
+                         e.get('direction'), e['balance'], e['currency'],
+                         e['business_time'], e.get('symbol'), e.get('description', '')))
+            seen[key] += 1
+        with self.transaction() as conn:
+            conn.executemany('''
+                INSERT OR IGNORE INTO cashflow_raw
+                (entry_key, transaction_flow_name, direction, balance, currency,
+                 business_time, symbol, description)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+
+    def get_cashflow_raw_span(self) -> Optional[Tuple[str, str]]:
+        """(earliest, latest) business_time in the raw archive, or None if empty."""
+        row = self.conn.execute(
+            "SELECT MIN(business_time), MAX(business_time) FROM cashflow_raw").fetchone()
+        return (row[0], row[1]) if row[0] is not None else None
+
+    def iter_cashflow_raw(self, batch_size: int = 5000) -> Iterator[List[Dict]]:
+        """Yield archived cash flow entries oldest first, *batch_size* at a time."""
+        cursor = self.conn.execute('''
+            SELECT transaction_flow_name, direction, balance, currency,
+                   business_time, symbol, description
+            FROM cashflow_raw ORDER BY business_time, rowid
+        ''')
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield [dict(row) for row in rows]
+
     def get_dividends(self, year: int) -> List[Dict]:
         """Get all dividend records for a year."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute('''
-                SELECT * FROM dividends
-                WHERE strftime('%Y', received_at) = ?
-                ORDER BY received_at
-            ''', (str(year),))
-            return [dict(row) for row in cursor.fetchall()]
+        cursor = self.conn.execute('''
+            SELECT * FROM dividends
+            WHERE received_at >= ? AND received_at < ?
+            ORDER BY received_at
+        ''', year_range(year))
+        return [dict(row) for row in cursor.fetchall()]
+
+    def get_latest_pool_checkpoint(self, symbol: str,
+                                   before_year: int) -> Optional[Dict]:
+        """Get the most recent year-end cost pool snapshot before *before_year*."""
+        row = self.conn.execute('''
+            SELECT year, quantity, total_cost, orders_hash FROM pool_checkpoints
+            WHERE symbol = ? AND year < ?
+            ORDER BY year DESC LIMIT 1
+        ''', (symbol, before_year)).fetchone()
+        return dict(row) if row else None
+
+    def save_pool_checkpoints(self, rows: Iterable[Tuple[str, int, float, float, str]],
+                              stale_symbols: Iterable[str] = ()):
+        """Save (symbol, year, quantity, total_cost, orders_hash) snapshots.
+
+        Snapshots of *stale_symbols* are dropped first, in the same
+        transaction.
+        """
+        with self.transaction() as conn:
+            conn.executemany("DELETE FROM pool_checkpoints WHERE symbol = ?",
+                             [(s,) for s in stale_symbols])
+            conn.executemany('''
+                INSERT OR REPLACE INTO pool_checkpoints
+                (symbol, year, quantity, total_cost, orders_hash)
+                VALUES (?, ?, ?, ?, ?)
+            ''', rows)
+
+    def get_sync_state(self, endpoint: str, account: str) -> Optional[str]:
+        """Get the high-water mark (ISO timestamp) of the last sync, if any."""
+        row = self.conn.execute(
+            "SELECT synced_until FROM sync_state WHERE endpoint = ? AND account = ?",
+            (endpoint, account)).fetchone()
+        return row['synced_until'] if row else None
+
+    def save_sync_state(self, endpoint: str, account: str, synced_until: str):
+        """Record that *endpoint* has been fetched up to *synced_until*."""
+        with self.transaction() as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO sync_state (endpoint, account, synced_until, updated_at)
+                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+            ''', (endpoint, account, synced_until))
 
     @staticmethod
     def _row_to_order(row: sqlite3.Row) -> Dict:
@@ -203,3 +644,4 @@ class DatabaseManager:
         order['fees'] = json.loads(order['fees_json'] or '{}')
         del order['fees_json']
         return order
+
@@ -12,6 +12,9 @@ Data source:
     - "Cash Dividend" entries → amount
     - "CO Other FEE" / Withholding Tax entries → withholding
   Gross = amount + withholding.
+
+With fixed_point=True, CNY amounts are rounded to whole fen per dividend
+and all totals are computed in integer fen (see money.py).
 """
 
 from datetime import datetime
@@ -19,6 +22,7 @@ from typing import Dict, List
 
 from .database import DatabaseManager
 from .exchange_rate import ExchangeRateManager
+from .money import from_fen, to_fen
 
 CHINA_DIVIDEND_TAX_RATE = 0.20
 
@@ -26,9 +30,11 @@ CHINA_DIVIDEND_TAX_RATE = 0.20
 class DividendCalculator:
     """Calculates dividend income tax with foreign tax credit."""
 
-    def __init__(self, db: DatabaseManager, exchange: ExchangeRateManager):
+    def __init__(self, db: DatabaseManager, exchange: ExchangeRateManager,
+                 fixed_point: bool = False):
         self.db = db
         self.exchange = exchange
+        self.fixed_point = fixed_point
 
     def calculate(self, year: int) -> Dict:
         """Calculate dividend tax for a year.
@@ -47,9 +53,20 @@ class DividendCalculator:
             total_gross_cny += detail['gross_cny']
             total_withheld_cny += detail['withheld_cny']
 
-        total_china_tax = total_gross_cny * CHINA_DIVIDEND_TAX_RATE
-        total_credit = min(total_withheld_cny, total_china_tax)
-        total_tax_owed = max(0, total_china_tax - total_credit)
+        if self.fixed_point:
+            gross_fen = sum(to_fen(d['gross_cny']) for d in details)
+            withheld_fen = sum(to_fen(d['withheld_cny']) for d in details)
+            china_tax_fen = round(gross_fen * CHINA_DIVIDEND_TAX_RATE)
+            credit_fen = min(withheld_fen, china_tax_fen)
+            total_gross_cny = from_fen(gross_fen)
+            total_withheld_cny = from_fen(withheld_fen)
+            total_china_tax = from_fen(china_tax_fen)
+            total_credit = from_fen(credit_fen)
+            total_tax_owed = from_fen(china_tax_fen - credit_fen)
+        else:
+            total_china_tax = total_gross_cny * CHINA_DIVIDEND_TAX_RATE
+            total_credit = min(total_withheld_cny, total_china_tax)
+            total_tax_owed = max(0, total_china_tax - total_credit)
 
         return {
             'year': year,
@@ -71,6 +88,10 @@ class DividendCalculator:
         gross = net_amount + withheld
 
         rate = self.exchange.get_rate(date, currency, 'CNY')
+        gross_cny, withheld_cny = gross * rate, withheld * rate
+        if self.fixed_point:
+            gross_cny = from_fen(to_fen(gross_cny))
+            withheld_cny = from_fen(to_fen(withheld_cny))
 
         return {
             'symbol': symbol,
@@ -80,6 +101,6 @@ class DividendCalculator:
             'gross_amount': gross,
             'withheld': withheld,
             'exchange_rate': rate,
-            'gross_cny': gross * rate,
-            'withheld_cny': withheld * rate,
+            'gross_cny': gross_cny,
+            'withheld_cny': withheld_cny,
         }
@@ -2,24 +2,56 @@
 
 Architecture:
   RateProvider  — knows how to fetch rates from one external source.
+  ProviderChain — several providers tried in order (e.g. local file, then API).
+  RateTable     — in-memory sorted rate series for one currency pair.
   ExchangeRateManager — orchestrates cache, providers, and fallback logic.
 """
 
+import csv
+import sqlite3
+import threading
+import time
 from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date as Date, datetime, timedelta, timezone
 from enum import StrEnum
-from typing import Dict, Optional
-
-import requests
+from itertools import groupby
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
+from .circuit_breaker import CircuitBreaker
 from .database import DatabaseManager
 
 
 class RateSource(StrEnum):
     """Where the rate data actually came from."""
     FRANKFURTER = 'frankfurter'
+    LOCAL = 'local'
     FALLBACK = 'fallback'
 
 
+# A provider early in a chain may carry a rate this far forward in a series;
+# past that, later providers are asked (a snapshot may be sparse or end).
+_MAX_CARRY = timedelta(days=5)
+
+# How long a date no provider could serve is skipped before asking again.
+DEFAULT_MISS_TTL = timedelta(days=7)
+
+
+class _NoRate(float):
+    """Falsy rate meaning "the source answered and has no rate for this date"."""
+
+    def __repr__(self) -> str:
+        return 'NO_RATE'
+
+
+# Returned by RateProvider.fetch for an authoritative miss; None instead
+# means the source could not be asked (error, timeout, open circuit).
+NO_RATE = _NoRate(0.0)
+
+
 # ---------------------------------------------------------------------------
 # Provider interface + implementations
 # ---------------------------------------------------------------------------
@@ -34,53 +66,320 @@ class RateProvider(ABC):
 
     @abstractmethod
     def fetch(self, date: str, from_ccy: str, to_ccy: str) -> Optional[float]:
-        """Return the rate for *date*, or None on miss."""
+        """Return the rate for *date*, NO_RATE if there is none, or None on failure."""
 
     @abstractmethod
     def fetch_series(self, start: str, end: str,
                      from_ccy: str, to_ccy: str) -> Optional[Dict[str, float]]:
-        """Return {date: rate} for the range, or None on failure."""
+        """Return {date: rate} for the range, or None on failure.
+
+        Dates left out of a returned series are authoritative misses.
+        """
+
+
+@dataclass
+class ProviderStats:
+    """Request counters for one provider (thread-safe)."""
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    short_circuited: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    @property
+    def mean_latency(self) -> float:
+        return self.total_latency / self.requests if self.requests else 0.0
+
+    def record(self, latency: float, ok: bool):
+        with self._lock:
+            self.requests += 1
+            self.errors += not ok
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+
+    def count(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
 
 
 class FrankfurterProvider(RateProvider):
-    """ECB rates via frankfurter.dev (free, no key required)."""
+    """ECB rates via frankfurter.dev (free, no key required).
+
+    Requests share one keep-alive `requests.Session`, so a burst of lookups
+    pays for one TLS handshake.  Connection errors, timeouts, 429 and 5xx
+    responses are retried up to `retries` times with exponential backoff.
+    After `failure_threshold` consecutive failed lookups the circuit breaker
+    opens, and lookups return None at once (callers fall back) until the
+    service is retried `reset_after` seconds later.  A 404 is an answer,
+    not a failure: NO_RATE, or an empty series.  `stats` counts
+    requests, errors, retries and latency.
+    """
 
     BASE_URL = 'https://api.frankfurter.dev/v1'
 
+    # Responses worth retrying; anything else (e.g. 404) is a plain miss.
+    _RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(self, session=None, retries: int = 2, backoff: float = 0.5,
+                 breaker: Optional[CircuitBreaker] = None,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker(failure_threshold=3, reset_after=60.0)
+        self.stats = ProviderStats()
+        self._session = session
+        self._session_lock = threading.Lock()
+        self._sleep = sleep
+
     @property
     def source(self) -> RateSource:
         return RateSource.FRANKFURTER
 
     def fetch(self, date: str, from_ccy: str, to_ccy: str) -> Optional[float]:
-        try:
-            resp = requests.get(
-                f"{self.BASE_URL}/{date}",
-                params={'from': from_ccy, 'to': to_ccy},
-                timeout=10,
-            )
-            if resp.status_code == 200:
-                return resp.json().get('rates', {}).get(to_ccy)
-        except Exception:
-            pass
+        body = self._get(f"{self.BASE_URL}/{date}",
+                         {'from': from_ccy, 'to': to_ccy}, timeout=10)
+        if body is None:
+            return None
+        return body.get('rates', {}).get(to_ccy) or NO_RATE
+
+    def fetch_series(self, start: str, end: str,
+                     from_ccy: str, to_ccy: str) -> Optional[Dict[str, float]]:
+        body = self._get(f"{self.BASE_URL}/{start}..{end}",
+                         {'from': from_ccy, 'to': to_ccy}, timeout=30)
+        if body is None:
+            return None
+        return {
+            d: day[to_ccy]
+            for d, day in body.get('rates', {}).items()
+            if to_ccy in day
+        }
+
+    @property
+    def session(self):
+        """The shared HTTP session, created on first use."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests  # deferred: slow to import, and cached rates never need it
+                    from requests.adapters import HTTPAdapter
+
+                    session = requests.Session()
+                    # Room for one keep-alive connection per concurrent fetch thread.
+                    session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16))
+                    self._session = session
+        return self._session
+
+    def _get(self, url: str, params: Dict, timeout: float) -> Optional[Dict]:
+        """GET *url* and return its JSON body, {} on a 404, or None on failure."""
+        if not self.breaker.allow():
+            self.stats.count('short_circuited')
+            return None
+
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.stats.count('retries')
+                self._sleep(self.backoff * 2 ** (attempt - 1))
+            started = time.monotonic()
+            try:
+                resp = self.session.get(url, params=params, timeout=timeout)
+            except Exception as e:  # connection errors, timeouts
+                self.stats.record(time.monotonic() - started, ok=False)
+                error = e
+                continue
+            retry = resp.status_code in self._RETRY_STATUS
+            self.stats.record(time.monotonic() - started, ok=not retry)
+            if retry:
+                error = f"HTTP {resp.status_code}"
+                continue
+            self.breaker.record_success()
+            if resp.status_code == 404:
+                return {}
+            if resp.status_code != 200:
+                print(f"  ⚠️  Rate request got HTTP {resp.status_code}: {url}")
+                return None
+            try:
+                return resp.json()
+            except ValueError as e:
+                print(f"  ⚠️  Bad response from {url}: {e}")
+                return None
+
+        self.breaker.record_failure()
+        print(f"  ⚠️  Rate request failed after {self.retries + 1} attempt(s): {error}")
         return None
 
+
+class LocalRateProvider(RateProvider):
+    """Rates from a local snapshot file: no network, no timeouts.
+
+    The snapshot is either a CSV file with a header row
+    `date,from_currency,to_currency,rate`, or a SQLite file with an
+    `exchange_rates` table (such as a copy of this tool's database, whose
+    fallback rates are ignored).  SQLite is opened read-only and
+    memory-mapped.  Each currency pair is loaded into a RateTable on first
+    use, so every later lookup is a dict hit or a bisect.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"Rate snapshot not found: {self.path}")
+        self._tables: Dict[Tuple[str, str], RateTable] = {}
+        self._csv_rows: Optional[Dict[Tuple[str, str], List[Tuple[str, float]]]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def source(self) -> RateSource:
+        return RateSource.LOCAL
+
+    def fetch(self, date: str, from_ccy: str, to_ccy: str) -> Optional[float]:
+        """The rate on *date*, else the latest one at most _MAX_CARRY before it.
+
+        Weekends and holidays have no fixing of their own; like
+        fetch_series consumers, they carry the preceding rate.
+        """
+        nearest = self._table(from_ccy, to_ccy).nearest_before(date)
+        if nearest and Date.fromisoformat(date) - Date.fromisoformat(nearest[0]) <= _MAX_CARRY:
+            return nearest[1]
+        return NO_RATE
+
     def fetch_series(self, start: str, end: str,
                      from_ccy: str, to_ccy: str) -> Optional[Dict[str, float]]:
+        """Rates in [start, end], plus the last one before *start* to carry in.
+
+        Empty if the snapshot has no rates at all for the pair.
+        """
+        table = self._table(from_ccy, to_ccy)
+        if not len(table):
+            return {}
+        lo = max(0, bisect_right(table.dates, start) - 1)
+        hi = bisect_right(table.dates, end)
+        return dict(zip(table.dates[lo:hi], table.rates[lo:hi]))
+
+    def _table(self, from_ccy: str, to_ccy: str) -> 'RateTable':
+        key = (from_ccy, to_ccy)
+        table = self._tables.get(key)
+        if table is None:
+            with self._lock:
+                table = self._tables.get(key)
+                if table is None:
+                    table = self._tables[key] = RateTable(self._load(from_ccy, to_ccy))
+        return table
+
+    def _load(self, from_ccy: str, to_ccy: str) -> List[Tuple[str, float]]:
+        if self.path.suffix.lower() == '.csv':
+            if self._csv_rows is None:
+                self._csv_rows = self._read_csv()
+            return self._csv_rows.get((from_ccy, to_ccy), [])
+
+        conn = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True)
         try:
-            resp = requests.get(
-                f"{self.BASE_URL}/{start}..{end}",
-                params={'from': from_ccy, 'to': to_ccy},
-                timeout=30,
-            )
-            if resp.status_code == 200:
-                return {
-                    d: day[to_ccy]
-                    for d, day in resp.json().get('rates', {}).items()
-                    if to_ccy in day
-                }
-        except Exception as e:
-            print(f"  Time series request failed: {e}")
-        return None
+            conn.execute("PRAGMA mmap_size = 268435456")
+            return conn.execute('''
+                SELECT date, rate FROM exchange_rates
+                WHERE from_currency = ? AND to_currency = ? AND source != ?
+            ''', (from_ccy, to_ccy, RateSource.FALLBACK.value)).fetchall()
+        finally:
+            conn.close()
+
+    def _read_csv(self) -> Dict[Tuple[str, str], List[Tuple[str, float]]]:
+        rows: Dict[Tuple[str, str], List[Tuple[str, float]]] = {}
+        with open(self.path, newline='') as f:
+            for row in csv.DictReader(f):
+                key = (row['from_currency'], row['to_currency'])
+                rows.setdefault(key, []).append((row['date'], float(row['rate'])))
+        return rows
+
+
+class ProviderChain(RateProvider):
+    """Several providers tried in order; the first one with an answer wins.
+
+    ExchangeRateManager walks the chain itself, so every rate it stores is
+    tagged with the source of the provider that actually supplied it.
+    Used on its own, `source` reports the first provider's.
+    """
+
+    def __init__(self, providers: Sequence[RateProvider]):
+        if not providers:
+            raise ValueError("ProviderChain needs at least one provider")
+        self.providers: Tuple[RateProvider, ...] = tuple(providers)
+
+    @property
+    def source(self) -> RateSource:
+        return self.providers[0].source
+
+    def fetch(self, date: str, from_ccy: str, to_ccy: str) -> Optional[float]:
+        failed = False
+        for provider in self.providers:
+            rate = provider.fetch(date, from_ccy, to_ccy)
+            if rate:
+                return rate
+            failed |= rate is not NO_RATE
+        return None if failed else NO_RATE
+
+    def fetch_series(self, start: str, end: str,
+                     from_ccy: str, to_ccy: str) -> Optional[Dict[str, float]]:
+        merged: Optional[Dict[str, float]] = None
+        for provider in self.providers:
+            series = provider.fetch_series(start, end, from_ccy, to_ccy)
+            if series is not None:
+                merged = {**series, **(merged or {})}
+        return merged
+
+
+# ---------------------------------------------------------------------------
+# In-memory rate table
+# ---------------------------------------------------------------------------
+
+class RateTable:
+    """Sorted rate series for one currency pair.
+
+    `dates` and `rates` are parallel arrays ordered by date; `_by_date`
+    indexes the same data for O(1) exact lookups.  `nearest_before` uses
+    bisect on `dates`.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[str, float]] = ()):
+        self.dates: List[str] = []
+        self.rates: List[float] = []
+        for d, r in sorted(rows):
+            self.dates.append(d)
+            self.rates.append(r)
+        self._by_date: Dict[str, float] = dict(zip(self.dates, self.rates))
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def get(self, date: str) -> Optional[float]:
+        """Exact-date lookup."""
+        return self._by_date.get(date)
+
+    def nearest_before(self, date: str) -> Optional[Tuple[str, float]]:
+        """Return (date, rate) for the latest entry on or before *date*."""
+        i = bisect_right(self.dates, date)
+        if i == 0:
+            return None
+        return self.dates[i - 1], self.rates[i - 1]
+
+    def put(self, date: str, rate: float):
+        """Insert or replace a single entry, keeping the arrays sorted."""
+        if date in self._by_date:
+            self.rates[bisect_left(self.dates, date)] = rate
+        else:
+            i = bisect_left(self.dates, date)
+            self.dates.insert(i, date)
+            self.rates.insert(i, rate)
+        self._by_date[date] = rate
+
+
+def _only_weekend_between(earlier: str, date: str) -> bool:
+    """True if every day in (earlier, date] falls on a Saturday or Sunday."""
+    d0, d1 = Date.fromisoformat(earlier), Date.fromisoformat(date)
+    gap = (d1 - d0).days
+    return 0 < gap <= 2 and all(
+        (d0 + timedelta(days=k)).weekday() >= 5 for k in range(1, gap + 1))
 
 
 # ---------------------------------------------------------------------------
@@ -88,7 +387,18 @@ class FrankfurterProvider(RateProvider):
 # ---------------------------------------------------------------------------
 
 class ExchangeRateManager:
-    """Resolves exchange rates: cache → provider → nearby → fallback."""
+    """Resolves exchange rates: cache → provider → nearby → fallback.
+
+    The DB cache is mirrored in memory: the first lookup for a currency
+    pair loads its whole series in one query, after which hits never touch
+    SQLite.  Rates written through this manager update both.
+
+    Dates every provider answered without a rate for are recorded in a
+    negative cache (rate_misses) and not asked for again until the entry
+    is older than *miss_ttl*; None or zero turns the skipping off.  A
+    provider that failed (error, timeout, open circuit) records nothing.  Dates within
+    _MAX_CARRY of today are never recorded: providers publish with a lag.
+    """
 
     # Last-resort hardcoded rates (rough 2024 averages).
     _FALLBACK_CNY = {
@@ -96,56 +406,166 @@ class ExchangeRateManager:
     }
 
     def __init__(self, db: DatabaseManager,
-                 provider: RateProvider | None = None):
+                 provider: RateProvider | None = None,
+                 miss_ttl: Optional[timedelta] = DEFAULT_MISS_TTL,
+                 clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc)):
         self.db = db
         self.provider = provider or FrankfurterProvider()
+        self.miss_ttl = miss_ttl
+        self._clock = clock
+        self._tables: Dict[Tuple[str, str], RateTable] = {}
+        self._misses: Dict[Tuple[str, str], Set[str]] = {}
+
+    @property
+    def providers(self) -> Tuple[RateProvider, ...]:
+        """The providers to try, in order."""
+        if isinstance(self.provider, ProviderChain):
+            return self.provider.providers
+        return (self.provider,)
+
+    def provider_stats(self) -> Dict[str, 'ProviderStats']:
+        """{source: stats} for the providers that keep request statistics."""
+        return {p.source.value: p.stats for p in self.providers
+                if isinstance(getattr(p, 'stats', None), ProviderStats)}
 
     # -- public API ----------------------------------------------------------
 
     def get_rate(self, date: str, from_ccy: str, to_ccy: str = 'CNY') -> float:
-        """Return the exchange rate, resolving from cache/provider/fallback."""
-        cached = self.db.get_exchange_rate(date, from_ccy, to_ccy)
+        """Return the exchange rate, resolving from cache/provider/fallback.
+
+        Exact cached dates resolve in O(1).  A weekend date whose preceding
+        rate is cached reuses that rate (no fixing is published on
+        weekends).  Anything else is a true miss and goes to the provider.
+        """
+        table = self.rate_table(from_ccy, to_ccy)
+        cached = table.get(date)
         if cached:
-            return cached['rate']
+            return cached
+
+        nearest = table.nearest_before(date)
+        if nearest and _only_weekend_between(nearest[0], date):
+            return nearest[1]
 
         rate, source = self._resolve(date, from_ccy, to_ccy)
         if rate:
-            self.db.save_exchange_rate(date, from_ccy, to_ccy, rate, source)
+            self._store(date, from_ccy, to_ccy, rate, source)
         return rate or 1.0
 
+    def rate_table(self, from_ccy: str, to_ccy: str = 'CNY') -> RateTable:
+        """Return the in-memory table for a pair, loading it on first use."""
+        key = (from_ccy, to_ccy)
+        table = self._tables.get(key)
+        if table is None:
+            table = RateTable(self.db.get_exchange_rates(from_ccy, to_ccy))
+            self._tables[key] = table
+        return table
+
     def batch_fetch(self, dates: list, from_ccy: str,
                     to_ccy: str = 'CNY'):
         """Fetch rates for multiple dates, preferring a single time-series call."""
         if not dates:
             return
 
-        uncached = [d for d in dates
-                    if not self.db.get_exchange_rate(d, from_ccy, to_ccy)]
+        cached = self.db.get_cached_rate_dates(dates, from_ccy, to_ccy)
+        uncached = sorted(set(dates) - cached)
         if not uncached:
             print(f"All {len(dates)} rates already cached ({from_ccy} → {to_ccy})")
             return
+        uncached = self._skip_known_misses(uncached, from_ccy, to_ccy)
+        if not uncached:
+            return
 
         print(f"Fetching {len(uncached)} exchange rates ({from_ccy} → {to_ccy})...")
 
-        series = self.provider.fetch_series(
-            min(uncached), max(uncached), from_ccy, to_ccy)
-
-        if series is not None:
-            self._save_series(uncached, series, from_ccy, to_ccy)
+        rows, missing, answered, failed = self._fetch_rows(uncached, from_ccy, to_ccy)
+        if answered:
+            for date in missing:
+                print(f"  ⚠️  No rate available for {date} — skipped")
+            with self.db.transaction():
+                self._save_rows(rows)
+                if not failed:
+                    self._record_misses((d, from_ccy, to_ccy) for d in missing)
+            print(f"  Done — saved {len(rows)}/{len(uncached)} rates")
         else:
             print("  Time series unavailable, fetching per-date...")
             for date in uncached:
                 self.get_rate(date, from_ccy, to_ccy)
             print("  Done.")
 
+    def batch_fetch_many(self, dates_by_currency: Dict[str, Iterable[str]],
+                         to_ccy: str = 'CNY', workers: int = 4):
+        """batch_fetch for several currencies at once.
+
+        Each currency's uncached dates are split into calendar-year segments,
+        and the segments download concurrently on a thread pool, so a long
+        multi-currency backfill takes about as long as its slowest segment.
+        All rows and misses are written in one transaction at the end.  Segments that
+        no provider can serve as a series fall back to per-date lookups, as
+        in batch_fetch.
+        """
+        segments: List[Tuple[str, List[str]]] = []
+        for from_ccy, dates in sorted(dates_by_currency.items()):
+            dates = set(dates)
+            if not dates or from_ccy == to_ccy:
+                continue
+            cached = self.db.get_cached_rate_dates(dates, from_ccy, to_ccy)
+            uncached = sorted(dates - cached)
+            if not uncached:
+                print(f"All {len(dates)} rates already cached ({from_ccy} → {to_ccy})")
+                continue
+            uncached = self._skip_known_misses(uncached, from_ccy, to_ccy)
+            if not uncached:
+                continue
+            print(f"Fetching {len(uncached)} exchange rates ({from_ccy} → {to_ccy})...")
+            for _, year in groupby(uncached, key=lambda d: d[:4]):
+                segments.append((from_ccy, list(year)))
+        if not segments:
+            return
+
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(segments)))) as pool:
+            results = list(pool.map(
+                lambda seg: self._fetch_rows(seg[1], seg[0], to_ccy), segments))
+
+        rows = []
+        misses = []
+        unanswered = []
+        for (from_ccy, dates), (found, missing, answered, failed) in zip(segments, results):
+            if not answered:
+                unanswered.append((from_ccy, dates))
+                continue
+            rows.extend(found)
+            for date in missing:
+                print(f"  ⚠️  No {from_ccy} rate available for {date} — skipped")
+                if not failed:
+                    misses.append((date, from_ccy, to_ccy))
+        with self.db.transaction():
+            self._save_rows(rows)
+            self._record_misses(misses)
+        print(f"  Done — saved {len(rows)} rates from {len(segments)} segment(s)")
+
+        for from_ccy, dates in unanswered:
+            print(f"  {from_ccy} {dates[0][:4]}: time series unavailable, fetching per-date...")
+            for date in dates:
+                self.get_rate(date, from_ccy, to_ccy)
+
     # -- internals -----------------------------------------------------------
 
     def _resolve(self, date: str, from_ccy: str,
                  to_ccy: str) -> tuple[Optional[float], str]:
-        """Try provider → hardcoded fallback."""
-        rate = self.provider.fetch(date, from_ccy, to_ccy)
-        if rate:
-            return rate, self.provider.source
+        """Try each provider in order → hardcoded fallback.
+
+        Providers are skipped for a date they recently could not serve.  A
+        miss is recorded only if every provider answered NO_RATE.
+        """
+        if date not in self._known_misses(from_ccy, to_ccy):
+            failed = False
+            for provider in self.providers:
+                rate = provider.fetch(date, from_ccy, to_ccy)
+                if rate:
+                    return rate, provider.source
+                failed |= rate is not NO_RATE
+            if not failed:
+                self._record_misses([(date, from_ccy, to_ccy)])
 
         rate = self._fallback(from_ccy, to_ccy)
         if rate:
@@ -155,30 +575,130 @@ class ExchangeRateManager:
 
         return None, RateSource.FALLBACK
 
+    def _store(self, date: str, from_ccy: str, to_ccy: str,
+               rate: float, source: str):
+        """Persist a rate and mirror it into the loaded table, if any."""
+        self.db.save_exchange_rate(date, from_ccy, to_ccy, rate, source)
+        table = self._tables.get((from_ccy, to_ccy))
+        if table is not None:
+            table.put(date, rate)
+
+    def _known_misses(self, from_ccy: str, to_ccy: str) -> Set[str]:
+        """Dates for a pair recorded as misses within the TTL (loaded once per pair)."""
+        if not self.miss_ttl:
+            return set()
+        key = (from_ccy, to_ccy)
+        misses = self._misses.get(key)
+        if misses is None:
+            since = _timestamp(self._clock() - self.miss_ttl)
+            misses = self.db.get_rate_misses(from_ccy, to_ccy, since)
+            self._misses[key] = misses
+        return misses
+
+    def _skip_known_misses(self, dates: list, from_ccy: str, to_ccy: str) -> list:
+        """Drop the dates recently recorded as misses, saying how many."""
+        misses = self._known_misses(from_ccy, to_ccy)
+        keep = [d for d in dates if d not in misses]
+        if len(keep) < len(dates):
+            print(f"Skipping {len(dates) - len(keep)} date(s) with no {from_ccy} → {to_ccy} "
+                  f"rate when last tried (see: python cli.py rates gaps)")
+        return keep
+
+    def _record_misses(self, rows: Iterable[Tuple[str, str, str]]):
+        """Record (date, from, to) misses, except dates too recent to be final."""
+        now = self._clock()
+        settled = (now.date() - _MAX_CARRY).isoformat()
+        rows = [r for r in rows if r[0] < settled]
+        if not rows:
+            return
+        self.db.save_rate_misses(rows, _timestamp(now))
+        for date, from_ccy, to_ccy in rows:
+            misses = self._misses.get((from_ccy, to_ccy))
+            if misses is not None:
+                misses.add(date)
+
     @classmethod
     def _fallback(cls, from_ccy: str, to_ccy: str) -> Optional[float]:
         if to_ccy == 'CNY':
             return cls._FALLBACK_CNY.get(from_ccy)
         return None
 
-    def _save_series(self, uncached: list, series: dict,
-                     from_ccy: str, to_ccy: str):
-        sorted_series_dates = sorted(series.keys())
-        saved = 0
-        for date in uncached:
-            rate = series.get(date) or self._nearest_before(date, sorted_series_dates, series)
-            if rate:
-                self.db.save_exchange_rate(
-                    date, from_ccy, to_ccy, rate, self.provider.source)
-                saved += 1
-            else:
-                print(f"  ⚠️  No rate available for {date} — skipped")
-        print(f"  Done — saved {saved}/{len(uncached)} rates")
-
     @staticmethod
-    def _nearest_before(date: str, sorted_dates: list, series: dict) -> Optional[float]:
-        """Find the most recent rate on or before *date* from the series."""
-        for d in reversed(sorted_dates):
-            if d <= date:
-                return series[d]
-        return None
+    def _series_rows(dates: list, series: dict, source: str,
+                     from_ccy: str, to_ccy: str, carry_limit: bool = False) -> list:
+        """Rows for the *dates* a series answers, weekends/holidays forward-filled.
+
+        With carry_limit, no rate is carried more than _MAX_CARRY past the
+        series date it came from, whether the gap is inside the series or
+        after its end; those dates are left to the next provider.
+        """
+        filled = _forward_fill(series, min(dates), max(dates),
+                               max_carry=_MAX_CARRY if carry_limit else None)
+        return [(date, from_ccy, to_ccy, filled[date], source)
+                for date in dates if filled.get(date)]
+
+    def _fetch_rows(self, dates: list, from_ccy: str,
+                    to_ccy: str) -> Tuple[list, list, bool, bool]:
+        """Ask each provider for a series covering the dates still missing.
+
+        Returns (rows, dates no provider covered, whether any provider
+        returned rates at all, whether any provider failed).  The missing
+        dates are authoritative misses only if none failed.  Makes no DB
+        writes, so it can run in any thread.
+        """
+        rows = []
+        missing = dates
+        answered = failed = False
+        providers = self.providers
+        for i, provider in enumerate(providers):
+            series = provider.fetch_series(min(missing), max(missing), from_ccy, to_ccy)
+            if series is None:
+                failed = True
+                continue
+            answered = answered or bool(series)
+            last = i == len(providers) - 1
+            found = self._series_rows(missing, series, provider.source,
+                                      from_ccy, to_ccy, carry_limit=not last)
+            rows.extend(found)
+            covered = {r[0] for r in found}
+            missing = [d for d in missing if d not in covered]
+            if not missing:
+                break
+        return rows, missing, answered, failed
+
+    def _save_rows(self, rows: list):
+        """Write rate rows in one transaction and mirror them into loaded tables."""
+        self.db.save_exchange_rates(rows)
+        for date, from_ccy, to_ccy, rate, _ in rows:
+            table = self._tables.get((from_ccy, to_ccy))
+            if table is not None:
+                table.put(date, rate)
+
+
+def _timestamp(moment: datetime) -> str:
+    """UTC ISO-8601 to the second; these compare correctly as strings."""
+    return moment.astimezone(timezone.utc).isoformat(timespec='seconds')
+
+
+def _forward_fill(series: Dict[str, float], start: str, end: str,
+                  max_carry: Optional[timedelta] = None) -> Dict[str, float]:
+    """Expand a sparse {date: rate} series to every calendar day in [start, end].
+
+    Days without a published rate (weekends, holidays) carry the most
+    recent earlier rate, but no further than *max_carry* past its date if
+    given.  Days before the first available rate are left out.  Runs in
+    one pass over the sorted series plus one over the calendar.
+    """
+    points = sorted(series.items())
+    filled: Dict[str, float] = {}
+    i, carry, carried_from = 0, None, None
+    day, last = Date.fromisoformat(start), Date.fromisoformat(end)
+    while day <= last:
+        key = day.isoformat()
+        while i < len(points) and points[i][0] <= key:
+            carry, carried_from = points[i][1], Date.fromisoformat(points[i][0])
+            i += 1
+        if carry is not None and (max_carry is None or day - carried_from <= max_carry):
+            filled[key] = carry
+        day += timedelta(days=1)
+    return filled
@@ -0,0 +1,79 @@
+"""Commission fee backfill — parallel order-detail fetches, batched writes.
+
+Order details are fetched by a thread pool; pacing is left to the client's
+rate limiter.  Results are consumed in input order and written with one
+`executemany` per batch, so after any interruption the committed orders
+form a prefix of the list.  Committed orders no longer count as missing
+fees, so the next run resumes right after the last committed one.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from .database import DatabaseManager
+
+
+@dataclass
+class BackfillProgress:
+    done: int
+    total: int
+    updated: int
+    elapsed: float
+
+    @property
+    def rate(self) -> float:
+        """Orders processed per second so far."""
+        return self.done / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Estimated seconds remaining, or None before the first result."""
+        if not self.rate:
+            return None
+        return (self.total - self.done) / self.rate
+
+
+def backfill_fees(client, db: DatabaseManager, orders: List[Dict],
+                  workers: int = 4, batch_size: int = 50,
+                  on_progress: Optional[Callable[[BackfillProgress], None]] = None) -> int:
+    """Fetch and store fees for *orders*; returns how many were updated.
+
+    A batch is committed every *batch_size* orders; on_progress (if given)
+    is called after each commit and once at the end.  Pending results are
+    flushed even if the loop is interrupted.
+    """
+    started = time.monotonic()
+    total = len(orders)
+    pending: List = []
+    updated = 0
+    done = 0
+
+    def fetch(order: Dict):
+        return order['order_id'], client.fetch_order_detail(order['order_id'])
+
+    def flush():
+        nonlocal pending, updated
+        if pending:
+            db.update_orders_fees(pending)
+            updated += len(pending)
+            pending = []
+
+    pool = ThreadPoolExecutor(max_workers=max(1, workers))
+    try:
+        for done, (order_id, fees) in enumerate(pool.map(fetch, orders), 1):
+            if fees:
+                pending.append((order_id, fees))
+            if done % batch_size == 0:
+                flush()
+                if on_progress:
+                    on_progress(BackfillProgress(done, total, updated,
+                                                 time.monotonic() - started))
+    finally:
+        pool.shutdown(cancel_futures=True)
+        flush()
+
+    if on_progress and done % batch_size:
+        on_progress(BackfillProgress(done, total, updated, time.monotonic() - started))
+    return updated
@@ -1,9 +1,19 @@
-"""Long Bridge API client for fetching trading data (READ-ONLY)."""
+"""Long Bridge API client for fetching trading data (READ-ONLY).
 
+Every API call takes a token from one shared TokenBucket, so requests are
+paced by the quota rather than by fixed sleeps.  Date ranges are split
+into ~90-day windows that a small thread pool fetches concurrently;
+results come back in chronological order, either all at once or streamed
+window by window (iter_cashflow).
+"""
+
+import hashlib
 import os
-import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Callable, Dict, List, Optional
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
 from longport.openapi import (
     BalanceType,
@@ -12,14 +22,22 @@ from longport.openapi import (
     TradeContext,
 )
 
+from .rate_limiter import TokenBucket
+
 # Long Bridge API enforces a ~90-day window per request.
 _CHUNK_DAYS = 89
 
+# Defaults for request pacing; override per client.
+DEFAULT_REQUESTS_PER_SECOND = 2.0
+DEFAULT_FETCH_WORKERS = 4
+
 
 class LongBridgeClient:
     """Client for Long Bridge OpenAPI (read-only operations)."""
 
-    def __init__(self, app_key: str, app_secret: str, access_token: str):
+    def __init__(self, app_key: str, app_secret: str, access_token: str,
+                 requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+                 workers: int = DEFAULT_FETCH_WORKERS):
         # Populate LONGPORT_* env vars so Config.from_env() picks them up,
         # along with LONGPORT_REGION if set (e.g. "cn" for China endpoint).
         os.environ.setdefault('LONGPORT_APP_KEY', app_key)
@@ -27,55 +45,110 @@ class LongBridgeClient:
         os.environ.setdefault('LONGPORT_ACCESS_TOKEN', access_token)
         self.config = LongportConfig.from_env()
         self.ctx = TradeContext(self.config)
+        # Stable, non-secret identifier for per-account bookkeeping (sync state).
+        self.account_key = hashlib.sha256(app_key.encode()).hexdigest()[:16]
+        self.limiter = TokenBucket(requests_per_second)
+        self.workers = workers
 
     # -- chunked fetch helper ------------------------------------------------
 
     @staticmethod
-    def _chunked_fetch(start: datetime, end: datetime,
+    def _chunk_windows(start: datetime, end: datetime) -> List[Tuple[datetime, datetime]]:
+        """Split [start, end] into consecutive ~90-day windows."""
+        windows = []
+        chunk_start = start
+        while chunk_start < end:
+            chunk_end = min(chunk_start + timedelta(days=_CHUNK_DAYS), end)
+            windows.append((chunk_start, chunk_end))
+            chunk_start = chunk_end + timedelta(days=1)
+        return windows
+
+    @classmethod
+    def _chunked_fetch(cls, start: datetime, end: datetime,
                        fetch_fn: Callable[[datetime, datetime], List],
                        label: str = 'items',
-                       delay: float = 0.5) -> List:
-        """Split a date range into 90-day chunks and collect results.
+                       workers: int = 1,
+                       strict: bool = False) -> List:
+        """Split a date range into 90-day chunks and collect all results.
+
+        See _iter_chunked; this just concatenates its chunks.
+        """
+        return [item for items in cls._iter_chunked(start, end, fetch_fn, label,
+                                                      workers, strict)
+                for item in items]
+
+    @classmethod
+    def _iter_chunked(cls, start: datetime, end: datetime,
+                      fetch_fn: Callable[[datetime, datetime], List],
+                      label: str = 'items',
+                      workers: int = 1,
+                      strict: bool = False) -> Iterator[List]:
+        """Yield each 90-day chunk's results, in chronological order.
+
+        Up to *workers* chunks are fetched ahead by a thread pool while the
+        caller processes the current one, so at most workers + 1 chunks are
+        held in memory; pacing is left to the rate limiter inside
+        *fetch_fn*.
 
         Args:
             fetch_fn: Called with (chunk_start, chunk_end), returns a list.
             label: Name shown in progress logs.
-            delay: Seconds to sleep between chunks.
+            workers: Maximum chunks in flight.
+            strict: Re-raise a failed chunk instead of logging and skipping
+                it, for callers that must not record a partial range as done.
         """
         print(f"Fetching {label} from {start.strftime('%Y-%m-%d')} "
               f"to {end.strftime('%Y-%m-%d')}...")
 
-        all_items: List = []
-        chunk_start = start
-        chunk_num = 1
-
-        while chunk_start < end:
-            chunk_end = min(chunk_start + timedelta(days=_CHUNK_DAYS), end)
-            print(f"  Chunk {chunk_num}: {chunk_start.strftime('%Y-%m-%d')} "
-                  f"to {chunk_end.strftime('%Y-%m-%d')}")
+        windows = iter(cls._chunk_windows(start, end))
+        workers = max(1, workers)
 
+        def fetch(window):
             try:
-                items = fetch_fn(chunk_start, chunk_end)
-                print(f"    Found {len(items)} {label}")
-                all_items.extend(items)
+                return fetch_fn(*window), None
             except Exception as e:
-                print(f"    Error: {e}")
+                return [], e
 
-            chunk_start = chunk_end + timedelta(days=1)
-            chunk_num += 1
-            time.sleep(delay)
+        total = 0
+        pool = ThreadPoolExecutor(max_workers=workers)
+        try:
+            in_flight = deque((w, pool.submit(fetch, w)) for w in islice(windows, workers))
+            num = 0
+            while in_flight:
+                (chunk_start, chunk_end), future = in_flight.popleft()
+                nxt = next(windows, None)
+                if nxt is not None:
+                    in_flight.append((nxt, pool.submit(fetch, nxt)))
 
-        print(f"Total: {len(all_items)} {label} fetched")
-        return all_items
+                items, error = future.result()
+                num += 1
+                print(f"  Chunk {num}: {chunk_start.strftime('%Y-%m-%d')} "
+                      f"to {chunk_end.strftime('%Y-%m-%d')}")
+                if error is not None:
+                    print(f"    Error: {error}")
+                    if strict:
+                        raise error
+                    continue
+                print(f"    Found {len(items)} {label}")
+                total += len(items)
+                yield items
+        finally:
+            # On a strict abort or early close, drop chunks not yet started.
+            pool.shutdown(cancel_futures=True)
+
+        print(f"Total: {total} {label} fetched")
 
     # -- orders --------------------------------------------------------------
 
-    def fetch_orders(self, start: datetime, end: datetime) -> List[Dict]:
+    def fetch_orders(self, start: datetime, end: datetime,
+                     strict: bool = False) -> List[Dict]:
         """Fetch historical filled orders, chunked into 90-day windows."""
         return self._chunked_fetch(
-            start, end, self._fetch_orders_chunk, label='orders')
+            start, end, self._fetch_orders_chunk, label='orders',
+            workers=self.workers, strict=strict)
 
     def _fetch_orders_chunk(self, start: datetime, end: datetime) -> List[Dict]:
+        self.limiter.acquire()
         result = self.ctx.history_orders(
             status=[OrderStatus.Filled],
             start_at=start,
@@ -156,6 +229,7 @@ class LongBridgeClient:
     def test_connection(self) -> bool:
         """Test API connection."""
         try:
+            self.limiter.acquire()
             self.ctx.account_balance()
             print("✓ Long Bridge API connection successful")
             return True
@@ -170,6 +244,7 @@ class LongBridgeClient:
             Dict with 'total_amount' and 'currency', or None on failure.
         """
         try:
+            self.limiter.acquire()
             detail = self.ctx.order_detail(order_id=order_id)
             charge = getattr(detail, 'charge_detail', None)
             if not charge:
@@ -199,13 +274,25 @@ class LongBridgeClient:
 
 
     def fetch_cashflow(self, start: datetime, end: datetime,
-                       business_type: Optional[BalanceType] = None) -> List[Dict]:
+                       business_type: Optional[BalanceType] = None,
+                       strict: bool = False) -> List[Dict]:
         """Fetch account cash flow entries, chunked into 90-day windows."""
-        return self._chunked_fetch(
+        return [entry for chunk in self.iter_cashflow(start, end, business_type, strict)
+                for entry in chunk]
+
+    def iter_cashflow(self, start: datetime, end: datetime,
+                      business_type: Optional[BalanceType] = None,
+                      strict: bool = False) -> Iterator[List[Dict]]:
+        """Yield cash flow entries one 90-day window at a time, oldest first.
+
+        Later windows download while the caller processes earlier ones.
+        """
+        return self._iter_chunked(
             start, end,
             lambda s, e: self._fetch_cashflow_chunk(s, e, business_type),
             label='cash flow entries',
-            delay=0.3,
+            workers=self.workers,
+            strict=strict,
         )
 
     def _fetch_cashflow_chunk(self, start: datetime, end: datetime,
@@ -214,6 +301,7 @@ class LongBridgeClient:
         entries: List[Dict] = []
         page = 1
         while True:
+            self.limiter.acquire()
             result = self.ctx.cash_flow(
                 start_at=start,
                 end_at=end,
@@ -230,7 +318,6 @@ class LongBridgeClient:
             if len(result) < 1000:
                 break
             page += 1
-            time.sleep(0.3)
         return entries
 
     @staticmethod
@@ -0,0 +1,43 @@
+"""Fixed-point money — integer fen (CNY cents) and scaled quantities.
+
+Floats are fine for a single trade, but a cost pool that adds and removes
+amounts over thousands of fills accumulates rounding error, and a position
+closed in several lots rarely lands exactly on zero.  Integers don't drift:
+
+  amounts     int fen         1 CNY = FEN fen
+  quantities  int units       1 share = QTY_SCALE units (fractional shares ok)
+
+Python ints never overflow; at these scales every value also fits an int64,
+so the same representation works in numpy columns.
+"""
+
+FEN = 100
+QTY_SCALE = 1_000_000
+
+
+def to_fen(amount: float) -> int:
+    """Round a CNY amount to whole fen (half-to-even, like numpy.rint)."""
+    return round(amount * FEN)
+
+
+def from_fen(fen: int) -> float:
+    return fen / FEN
+
+
+def to_units(qty: float) -> int:
+    """Scale a share/contract quantity to integer units."""
+    return round(qty * QTY_SCALE)
+
+
+def from_units(units: int) -> float:
+    return units / QTY_SCALE
+
+
+def prorate(total: int, part: int, whole: int) -> int:
+    """total * part / whole in exact integer arithmetic, rounded half up.
+
+    All arguments are non-negative and whole > 0.  Prorating the remainder
+    of a total, lot by lot, always sums back to the total.
+    """
+    q, r = divmod(total * part, whole)
+    return q + (2 * r >= whole)
@@ -0,0 +1,42 @@
+"""Thread-safe token-bucket rate limiter for API clients.
+
+Tokens refill continuously at `rate` per second up to `capacity`; each
+request takes one.  Any number of threads can share one bucket, so a
+pool of workers together never exceeds the quota, and no time is spent
+sleeping while the quota has room.
+"""
+
+import threading
+import time
+from typing import Callable, Optional
+
+
+class TokenBucket:
+    """Allow `rate` requests per second, with bursts of up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        if rate <= 0:
+            raise ValueError(f"Rate must be positive, got {rate}")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0):
+        """Block until *tokens* are available, then take them."""
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.capacity,
+                                   self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            self._sleep(wait)
@@ -0,0 +1,112 @@
+"""Incremental import — fetch only what is newer than the last sync.
+
+Each (endpoint, account) pair has a high-water mark in `sync_state`: the
+end of the last window that was fetched without error.  The next sync
+starts SYNC_OVERLAP before it, so fills and cash-flow entries the broker
+posts late are still picked up.  Re-fetched rows are de-duplicated by the
+tables' own keys: orders by order_id (updated in place, keeping fees that
+update-fees backfilled), dividends by their UNIQUE index.
+
+The mark only advances when every chunk of the window succeeded, so an
+interrupted sync simply repeats its window next time.  Orders are written
+in the same transaction as the mark.  Dividends are streamed: each batch
+is stored as soon as it is final, while later windows are still
+downloading (see store_dividends), and the raw entries are archived so
+reparse_dividends can rebuild dividends offline after a parser change.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .cashflow_parser import DividendStream
+from .database import DatabaseManager
+
+ORDERS = 'orders'
+CASHFLOW = 'cashflow'
+
+# Re-fetch this much before the previous high-water mark.
+SYNC_OVERLAP = timedelta(days=3)
+
+
+def sync_window(db: DatabaseManager, endpoint: str, account: str,
+                end: datetime, since: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    """Return the (start, end) window the next sync of *endpoint* should fetch.
+
+    *since* overrides the stored mark (first sync, or a deliberate backfill).
+    Raises ValueError when there is neither.
+    """
+    if since is not None:
+        return since, end
+    mark = db.get_sync_state(endpoint, account)
+    if mark is None:
+        raise ValueError(f"No previous {endpoint} sync for this account; "
+                         f"pass a start date for the first sync")
+    return min(datetime.fromisoformat(mark) - SYNC_OVERLAP, end), end
+
+
+def sync_orders(client, db: DatabaseManager, end: datetime,
+                since: Optional[datetime] = None) -> List[Dict]:
+    """Fetch and store orders newer than the last sync; returns them."""
+    start, end = sync_window(db, ORDERS, client.account_key, end, since)
+    orders = client.fetch_orders(start, end, strict=True)
+    with db.transaction():
+        if orders:
+            db.save_orders(orders)
+        db.save_sync_state(ORDERS, client.account_key, end.isoformat())
+    return orders
+
+
+def sync_cashflow(client, db: DatabaseManager, end: datetime,
+                  since: Optional[datetime] = None) -> Tuple[List[Dict], List[Dict]]:
+    """Fetch newer cash flow and store its dividends.
+
+    Returns (dividends, unmatched withholding entries) as parse_dividends.
+    """
+    start, end = sync_window(db, CASHFLOW, client.account_key, end, since)
+    stream = DividendStream()
+    batches = client.iter_cashflow(start, end, strict=True)
+    dividends = [d for saved in store_dividends(db, batches, stream) for d in saved]
+    db.save_sync_state(CASHFLOW, client.account_key, end.isoformat())
+    return dividends, stream.unmatched
+
+
+def store_dividends(db: DatabaseManager, batches: Iterable[List[Dict]],
+                    stream: Optional[DividendStream] = None,
+                    archive: bool = True) -> Iterator[List[Dict]]:
+    """Parse chronological cash flow batches and save dividends as they finalize.
+
+    Each raw batch is first archived in `cashflow_raw` (unless *archive* is
+    False) so dividends can later be re-derived without the API.  Yields
+    each saved batch of dividends.  Pass a DividendStream to inspect its
+    unmatched withholdings and flow names afterwards.
+    """
+    stream = stream if stream is not None else DividendStream()
+    for entries in batches:
+        if archive:
+            db.save_cashflow_raw(entries)
+        dividends = stream.feed(entries)
+        if dividends:
+            db.save_dividends(dividends)
+            yield dividends
+    dividends = stream.close()
+    if dividends:
+        db.save_dividends(dividends)
+        yield dividends
+
+
+def reparse_dividends(db: DatabaseManager) -> Tuple[int, DividendStream]:
+    """Rebuild the dividends the raw cash flow archive covers.
+
+    Only dividends parsed from archived entries are replaced; ones whose
+    entries were never archived (imported before the archive existed, or
+    in a window it lacks) are kept, and an empty archive changes nothing.
+    Runs in one transaction, so a failure leaves the old table intact.
+    Returns (dividends stored, the stream for unmatched/flow-name details).
+    """
+    stream = DividendStream()
+    count = 0
+    with db.transaction():
+        db.clear_dividends(archived_only=True)
+        for saved in store_dividends(db, db.iter_cashflow_raw(), stream, archive=False):
+            count += len(saved)
+    return count, stream
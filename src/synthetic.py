@@ -0,0 +1,304 @@
+"""Synthetic portfolios — seeded, reproducible data for load and regression tests.
+
+generate_portfolio builds an account history shaped like real Long Bridge
+data, entirely from one seed:
+
+  orders     US and HK stocks plus US options (symbols match the settlement
+             option pattern), long round trips, short sells covered later,
+             fees_json blobs in the order-detail format
+  cash flow  quarterly dividends on held stocks, USD and HKD, each with a
+             withholding entry a few seconds later, plus unrelated entries
+  rates      a daily USD/CNY and HKD/CNY series covering every calendar day
+
+Nothing depends on the clock or on global random state, so the same
+arguments always give the same portfolio.  write_portfolio stores it in a
+DatabaseManager the way the import commands would (cash flow goes through
+store_dividends, so it is archived and parsed).
+"""
+
+import random
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import date as Date, datetime, timedelta
+from string import ascii_uppercase
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .database import DatabaseManager
+from .settlement import get_multiplier
+from .sync import store_dividends
+
+SOURCE = 'synthetic'
+
+# Starting CNY rate and dividend withholding rate per trading currency.
+_CURRENCIES = {'USD': (7.1, 0.10), 'HKD': (0.91, 0.10)}
+
+# Price walk per calendar day (about +8% a year, 2% daily volatility).
+_DAILY_DRIFT = 0.0003
+_DAILY_VOLATILITY = 0.02
+
+_NOISE_FLOWS = ('Deposit', 'Interest', 'Buy Contract-Stocks', 'Sell Contract-Stocks')
+
+
+@dataclass
+class SyntheticPortfolio:
+    seed: int
+    symbols: List[str]
+    orders: List[Dict]
+    cashflow: List[Dict]
+    rates: List[Tuple[str, str, str, float, str]]
+    stats: Dict[str, int] = field(default_factory=dict)
+
+
+def generate_portfolio(symbols: int = 20, orders: int = 1000, seed: int = 0,
+                       first_year: int = 2020, last_year: int = 2024,
+                       option_ratio: float = 0.3, hk_ratio: float = 0.2,
+                       short_ratio: float = 0.15,
+                       missing_fee_ratio: float = 0.0,
+                       noise_ratio: float = 1.0) -> SyntheticPortfolio:
+    """Generate a portfolio of *orders* orders across *symbols* symbols.
+
+    option_ratio and hk_ratio are shares of the symbols; short_ratio is the
+    chance that a trade from a flat position opens a short;
+    missing_fee_ratio leaves that share of orders without fees; noise_ratio
+    is the number of non-dividend cash flow entries per dividend.
+    """
+    if symbols < 1 or orders < 1:
+        raise ValueError("Need at least one symbol and one order")
+    if first_year > last_year:
+        raise ValueError(f"{first_year} is after {last_year}")
+
+    rng = random.Random(seed)
+    start = datetime(first_year, 1, 1)
+    span = int((datetime(last_year + 1, 1, 1) - start).total_seconds())
+
+    names = _symbols(rng, symbols, option_ratio, hk_ratio, first_year, last_year)
+    # Skewed activity: a few symbols carry most of the trades, like real accounts.
+    weights = [rng.paretovariate(1.2) for _ in names]
+    counts = dict.fromkeys(names, 0)
+    for sym in rng.choices(names, weights, k=orders):
+        counts[sym] += 1
+
+    all_orders: List[Dict] = []
+    positions: Dict[str, List[Tuple[str, float]]] = {}
+    for sym in names:
+        times = sorted(rng.randrange(span) for _ in range(counts[sym]))
+        trades, held = _trade(rng, sym, [start + timedelta(seconds=s) for s in times],
+                              short_ratio, missing_fee_ratio)
+        all_orders.extend(trades)
+        positions[sym] = held
+    all_orders.sort(key=lambda o: (o['executed_at'], o['symbol']))
+    for i, o in enumerate(all_orders):
+        o['order_id'] = f"SYN{seed}-{i:09d}"
+
+    cashflow = _cashflow(rng, positions, first_year, last_year, noise_ratio)
+    rates = _rates(rng, start.date(), Date(last_year, 12, 31))
+
+    stats = {
+        'symbols': len(names),
+        'options': sum(_is_option(s) for s in names),
+        'orders': len(all_orders),
+        'short_opens': sum(o.pop('_short_open') for o in all_orders),
+        'dividends': sum(e['transaction_flow_name'] == 'Cash Dividend' for e in cashflow),
+        'cashflow': len(cashflow),
+        'rates': len(rates),
+    }
+    return SyntheticPortfolio(seed, names, all_orders, cashflow, rates, stats)
+
+
+def write_portfolio(db: DatabaseManager, portfolio: SyntheticPortfolio,
+                    batch_size: int = 10_000):
+    """Store orders, rates and cash flow (archived and parsed) in one transaction."""
+    with db.transaction():
+        for i in range(0, len(portfolio.orders), batch_size):
+            db.save_orders(portfolio.orders[i:i + batch_size])
+        db.save_exchange_rates(portfolio.rates)
+        for _ in store_dividends(db, _windows(portfolio.cashflow, batch_size)):
+            pass
+
+
+# ---------------------------------------------------------------------------
+# Pieces
+# ---------------------------------------------------------------------------
+
+def _symbols(rng: random.Random, n: int, option_ratio: float, hk_ratio: float,
+             first_year: int, last_year: int) -> List[str]:
+    n_options = min(n - 1, round(n * option_ratio)) if n > 1 else 0
+    n_stocks = n - n_options
+    n_hk = min(n_stocks - 1, round(n_stocks * hk_ratio)) if n_stocks > 1 else 0
+
+    tickers: List[str] = []
+    seen = set()
+    while len(tickers) < n_stocks - n_hk:
+        t = ''.join(rng.choices(ascii_uppercase, k=rng.randint(2, 4)))
+        if t not in seen:
+            seen.add(t)
+            tickers.append(f"{t}.US")
+    codes = rng.sample(range(1, 10000), n_hk)
+    hk = [f"{c:05d}.HK" for c in codes]
+
+    options = set()
+    while len(options) < n_options:
+        underlying = rng.choice(tickers)[:-3]
+        expiry = Date(rng.randint(first_year, last_year), rng.randint(1, 12), rng.randint(1, 28))
+        strike = rng.randint(5, 500) * 1000
+        options.add(f"{underlying}{expiry:%y%m%d}{rng.choice('CP')}{strike}.US")
+    return tickers + hk + sorted(options)
+
+
+def _is_option(symbol: str) -> bool:
+    return get_multiplier(symbol) == 100
+
+
+def _currency(symbol: str) -> str:
+    return 'HKD' if symbol.endswith('.HK') else 'USD'
+
+
+def _trade(rng: random.Random, symbol: str, times: List[datetime],
+           short_ratio: float, missing_fee_ratio: float):
+    """One symbol's orders, never selling more than a long position holds.
+
+    Returns (orders, [(executed_at, position after)]).
+    """
+    option = _is_option(symbol)
+    currency = _currency(symbol)
+    lot = 100 if currency == 'HKD' else 1
+    max_lots = 20 if option else 50
+    # Price bands keep every sale's gross above its fees (short opens need
+    # positive proceeds).
+    low, high = (0.05, 50.0) if option else (5.0, 2000.0)
+    price = rng.uniform(0.5, 30) if option else rng.uniform(5, 600)
+
+    position = 0
+    trades: List[Dict] = []
+    held: List[Tuple[str, float]] = []
+    previous = times[0] if times else None
+    for t in times:
+        # Geometric random walk in calendar time, so volatility doesn't
+        # depend on how often the symbol trades.
+        days = (t - previous).total_seconds() / 86400
+        previous = t
+        step = rng.lognormvariate(_DAILY_DRIFT * days, _DAILY_VOLATILITY * days ** 0.5)
+        price = min(high, max(low, price * step))
+        short_open = False
+        if position > 0:
+            side = 'BUY' if rng.random() < 0.4 else 'SELL'
+            qty = rng.randint(1, max_lots) * lot if side == 'BUY' else \
+                rng.randint(1, position // lot) * lot
+        elif position < 0:
+            side = 'SELL' if rng.random() < 0.3 else 'BUY'
+            qty = rng.randint(1, max_lots) * lot if side == 'SELL' else \
+                rng.randint(1, -position // lot) * lot
+            short_open = side == 'SELL'
+        else:
+            short_open = rng.random() < short_ratio
+            side = 'SELL' if short_open else 'BUY'
+            qty = rng.randint(1, max_lots) * lot
+        position += qty if side == 'BUY' else -qty
+
+        executed_at = t.isoformat()
+        trades.append({
+            'order_id': '',
+            'symbol': symbol,
+            'side': side,
+            'quantity': float(qty),
+            'price': round(price, 2 if price >= 1 else 3),
+            'currency': currency,
+            'executed_at': executed_at,
+            'fees': {} if rng.random() < missing_fee_ratio else _fees(rng, qty, option, currency),
+            '_short_open': short_open,
+        })
+        held.append((executed_at, position))
+    return trades, held
+
+
+def _fees(rng: random.Random, qty: int, option: bool, currency: str) -> Dict:
+    """A fee blob in the shape LongBridgeClient.fetch_order_detail returns."""
+    commission = round(max(0.99, qty * (0.65 if option else 0.005)), 2)
+    platform = round(rng.choice((1.0, 1.0, 0.5)), 2)
+    items = [
+        {'code': 'commission', 'name': 'Commission',
+         'amount': f"{commission:.2f}", 'currency': currency},
+        {'code': 'platform_fee', 'name': 'Platform Fee',
+         'amount': f"{platform:.2f}", 'currency': currency},
+    ]
+    return {'total_amount': f"{commission + platform:.2f}", 'currency': currency,
+            'items': items}
+
+
+def _position_at(times: List[str], held: List[Tuple[str, float]], when: str) -> float:
+    i = bisect_right(times, when)
+    return held[i - 1][1] if i else 0.0
+
+
+def _cashflow(rng: random.Random, positions: Dict[str, List[Tuple[str, float]]],
+              first_year: int, last_year: int, noise_ratio: float) -> List[Dict]:
+    """Quarterly dividends on long stock positions, each with its withholding."""
+    entries: List[Dict] = []
+    for sym, held in positions.items():
+        if _is_option(sym) or not held:
+            continue
+        currency = _currency(sym)
+        withholding_rate = _CURRENCIES[currency][1]
+        per_share = round(rng.uniform(0.05, 1.5), 4)
+        times = [executed_at for executed_at, _ in held]
+        for year in range(first_year, last_year + 1):
+            for month in (3, 6, 9, 12):
+                paid = datetime(year, month, rng.randint(1, 28), rng.randint(0, 23),
+                                rng.randint(0, 59), rng.randint(0, 59))
+                qty = _position_at(times, held, paid.isoformat())
+                if qty <= 0:
+                    continue
+                amount = round(per_share * qty, 2)
+                desc = (f"{sym} Cash Dividend: {per_share} {currency} per Share, "
+                        f"Held:{qty:.0f}")
+                entries.append(_entry('Cash Dividend', 'IN', amount, currency, paid, sym, desc))
+                withheld = round(amount * withholding_rate, 2)
+                if withheld:
+                    entries.append(_entry(
+                        'CO Other FEE', 'OUT', -withheld, currency,
+                        paid + timedelta(seconds=rng.randint(0, 60)), None,
+                        f"{desc} Withholding Tax/Dividend Fee"))
+
+    span = int((datetime(last_year + 1, 1, 1) - datetime(first_year, 1, 1)).total_seconds())
+    dividends = sum(e['transaction_flow_name'] == 'Cash Dividend' for e in entries)
+    for _ in range(round(dividends * noise_ratio)):
+        when = datetime(first_year, 1, 1) + timedelta(seconds=rng.randrange(span))
+        currency = rng.choice(tuple(_CURRENCIES))
+        amount = round(rng.uniform(-5000, 5000), 2)
+        entries.append(_entry(rng.choice(_NOISE_FLOWS), 'IN' if amount > 0 else 'OUT',
+                              amount, currency, when, None, ''))
+
+    entries.sort(key=lambda e: e['business_time'])
+    return entries
+
+
+def _entry(flow: str, direction: str, balance: float, currency: str,
+           when: datetime, symbol: Optional[str], description: str) -> Dict:
+    """A cash flow dict in the shape LongBridgeClient._parse_cashflow returns."""
+    return {
+        'transaction_flow_name': flow,
+        'direction': direction,
+        'balance': balance,
+        'currency': currency,
+        'business_time': when.isoformat(),
+        'symbol': symbol,
+        'description': description,
+    }
+
+
+def _rates(rng: random.Random, first: Date, last: Date) -> List[Tuple[str, str, str, float, str]]:
+    """Daily random-walk rates to CNY for every calendar day in [first, last]."""
+    rows = []
+    for currency, (rate, _) in _CURRENCIES.items():
+        day = first
+        while day <= last:
+            rate *= rng.lognormvariate(0, 0.002)
+            rows.append((day.isoformat(), currency, 'CNY', round(rate, 6), SOURCE))
+            day += timedelta(days=1)
+    return rows
+
+
+def _windows(entries: List[Dict], size: int) -> Iterable[List[Dict]]:
+    """Chronological batches, like the client's cash flow windows."""
+    for i in range(0, len(entries), size):
+        yield entries[i:i + size]
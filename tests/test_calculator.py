@@ -0,0 +1,226 @@
+"""Unit tests for TaxCalculator — replay, year-end cost pool checkpoints."""
+
+import pytest
+from unittest.mock import MagicMock
+from src.database import DatabaseManager
+from src.settlement import SettlementCalculator
+from src.calculator import TaxCalculator
+
+
+@pytest.fixture
+def db(tmp_path):
+    mgr = DatabaseManager(tmp_path / 'test.db')
+    yield mgr
+    mgr.close()
+
+
+@pytest.fixture
+def exchange():
+    ex = MagicMock()
+    ex.get_rate.return_value = 7.0
+    return ex
+
+
+@pytest.fixture
+def replayed(monkeypatch):
+    """Number of orders each serial replay ran through the cost pool."""
+    counts = []
+    original = TaxCalculator._replay
+    monkeypatch.setattr(TaxCalculator, '_replay', staticmethod(
+        lambda job, settlement: counts.append(len(job['orders'])) or original(job, settlement)))
+    return counts
+
+
+def _calc(db, exchange, **kw):
+    return TaxCalculator(db, SettlementCalculator(exchange), tax_rate=0.20, **kw)
+
+
+def _order(order_id, side, qty, price, executed_at, symbol='AAPL.US', fees=None):
+    return {
+        'order_id': order_id, 'symbol': symbol, 'side': side,
+        'quantity': qty, 'price': price, 'currency': 'USD',
+        'executed_at': executed_at, 'fees': fees or {},
+    }
+
+
+@pytest.fixture
+def history(db):
+    db.save_orders([
+        _order('1', 'BUY', 100, 10.0, '2021-03-01T10:00:00'),
+        _order('2', 'BUY', 100, 20.0, '2022-03-01T10:00:00'),
+        _order('3', 'SELL', 50, 30.0, '2023-06-01T10:00:00'),
+        _order('4', 'SELL', 50, 40.0, '2024-06-01T10:00:00'),
+    ])
+
+
+class TestReplay:
+    def test_gain_uses_weighted_average(self, db, exchange, history):
+        result = _calc(db, exchange).calculate(2024)
+        tx = result['details'][0]
+        assert tx['proceeds_cny'] == pytest.approx(50 * 40 * 7)
+        assert tx['cost_basis_cny'] == pytest.approx(50 * 15 * 7)
+        assert result['summary']['AAPL.US']['remaining_qty'] == 100
+
+
+class TestCheckpoints:
+    def test_second_run_replays_only_target_year(self, db, exchange, history, replayed):
+        first = _calc(db, exchange).calculate(2024)
+        assert replayed == [4]
+
+        replayed.clear()
+        second = _calc(db, exchange).calculate(2024)
+        assert replayed == [1]  # only the 2024 sell
+        assert second == first
+
+    def test_earlier_year_checkpoint_serves_later_year(self, db, exchange, history, replayed):
+        _calc(db, exchange).calculate(2023)
+        replayed.clear()
+        result = _calc(db, exchange).calculate(2024)
+        assert replayed == [1]
+        assert result['details'][0]['cost_basis_cny'] == pytest.approx(50 * 15 * 7)
+
+    def test_fee_change_invalidates(self, db, exchange, history, replayed):
+        _calc(db, exchange).calculate(2024)
+        db.update_order_fees('1', {'total_amount': '100'})
+
+        replayed.clear()
+        result = _calc(db, exchange).calculate(2024)
+        assert replayed == [4]  # full replay
+        expected = _calc(db, exchange, checkpoints=False).calculate(2024)
+        assert result == expected
+        # avg cost now (1000 + 100 + 2000) / 200 = 15.5 USD
+        assert result['details'][0]['cost_basis_cny'] == pytest.approx(50 * 15.5 * 7)
+
+    def test_rate_change_invalidates(self, db, exchange, history, replayed):
+        _calc(db, exchange).calculate(2024)
+        exchange.get_rate.side_effect = lambda date, f, t='CNY': 7.5 if date < '2022' else 7.0
+
+        replayed.clear()
+        result = _calc(db, exchange).calculate(2024)
+        assert replayed == [4]  # the 2021 buy now settles at another rate
+        assert result == _calc(db, exchange, checkpoints=False).calculate(2024)
+
+    def test_backfilled_order_invalidates(self, db, exchange, history):
+        _calc(db, exchange).calculate(2024)
+        db.save_orders([_order('0', 'BUY', 100, 5.0, '2020-01-02T10:00:00')])
+        result = _calc(db, exchange).calculate(2024)
+        expected = _calc(db, exchange, checkpoints=False).calculate(2024)
+        assert result == expected
+
+    def test_disabled_writes_nothing(self, db, exchange, history):
+        _calc(db, exchange, checkpoints=False).calculate(2024)
+        assert db.get_latest_pool_checkpoint('AAPL.US', 2025) is None
+
+    def test_clear_year_data_drops_checkpoints(self, db, exchange, history):
+        _calc(db, exchange).calculate(2024)
+        db.clear_year_data(2023)
+        assert db.get_latest_pool_checkpoint('AAPL.US', 2025)['year'] == 2022
+
+
+class TestCalculateRange:
+    def test_matches_per_year_calculate(self, db, exchange, history):
+        db.save_orders([
+            _order('5', 'BUY', 10, 100.0, '2022-05-01T10:00:00', symbol='NVDA.US'),
+            _order('6', 'SELL', 10, 120.0, '2024-05-01T10:00:00', symbol='NVDA.US'),
+        ])
+        ranged = _calc(db, exchange, checkpoints=False).calculate_range(2021, 2024)
+        for year in range(2021, 2025):
+            single = _calc(db, exchange, checkpoints=False).calculate(year)
+            assert ranged[year] == single
+
+    def test_replays_each_order_once(self, db, exchange, history):
+        _calc(db, exchange, checkpoints=False).calculate_range(2023, 2024)
+        assert exchange.get_rate.call_count == 4
+
+    def test_year_end_state_per_year(self, db, exchange, history):
+        ranged = _calc(db, exchange).calculate_range(2023, 2024)
+        assert ranged[2023]['summary']['AAPL.US']['remaining_qty'] == 150
+        assert ranged[2024]['summary']['AAPL.US']['remaining_qty'] == 100
+
+    def test_year_without_sells_is_empty(self, db, exchange, history):
+        ranged = _calc(db, exchange).calculate_range(2022, 2023)
+        assert ranged[2022]['details'] == []
+        assert ranged[2022]['summary'] == {}
+        assert ranged[2022]['total_tax'] == 0
+
+
+class TestParallel:
+    @pytest.fixture
+    def many_symbols(self, db, history):
+        db.save_orders([
+            _order('10', 'BUY', 10, 100.0, '2022-05-01T10:00:00', symbol='NVDA.US'),
+            _order('11', 'SELL', 4, 120.0, '2024-05-01T10:00:00', symbol='NVDA.US',
+                   fees={'total_amount': '1.5'}),
+            _order('12', 'SELL', 2, 3.5, '2023-02-01T10:00:00',
+                   symbol='SPY250402P535000.US'),
+            _order('13', 'BUY', 2, 1.25, '2024-03-01T10:00:00',
+                   symbol='SPY250402P535000.US'),
+            _order('14', 'BUY', 1, 5.0, '2024-01-02T10:00:00', symbol='TSLA.US'),
+            _order('15', 'SELL', 1, 6.0, '2024-01-03T10:00:00', symbol='TSLA.US'),
+        ])
+
+    def test_matches_serial(self, db, exchange, many_symbols):
+        serial = _calc(db, exchange, checkpoints=False).calculate_range(2022, 2024)
+        parallel = _calc(db, exchange, checkpoints=False, workers=2).calculate_range(2022, 2024)
+        assert parallel == serial
+
+    def test_saves_same_checkpoints(self, db, exchange, many_symbols, replayed):
+        _calc(db, exchange, workers=2).calculate(2024)
+        replayed.clear()
+        again = _calc(db, exchange).calculate(2024)
+        # Only 2024 orders of symbols selling in 2024 are replayed:
+        # AAPL sell, NVDA sell, TSLA buy + sell
+        assert sum(replayed) == 4
+        assert again == _calc(db, exchange, checkpoints=False).calculate(2024)
+
+
+class TestOrderStreaming:
+    def test_single_order_query(self, db, exchange, history, monkeypatch):
+        db.save_orders([
+            _order('5', 'BUY', 10, 100.0, '2022-05-01T10:00:00', symbol='NVDA.US'),
+            _order('6', 'SELL', 10, 120.0, '2024-05-01T10:00:00', symbol='NVDA.US'),
+        ])
+        calls = []
+        original = db.iter_orders_until
+        monkeypatch.setattr(db, 'iter_orders_until',
+                            lambda *a, **kw: calls.append(a) or original(*a, **kw))
+        monkeypatch.setattr(db, 'get_orders_until', MagicMock(
+            side_effect=AssertionError('per-symbol query')))
+        result = _calc(db, exchange).calculate(2024)
+        assert calls == [(2024,)]
+        assert list(result['summary']) == ['AAPL.US', 'NVDA.US']
+
+    def test_orders_after_last_active_year_ignored(self, db, exchange, history):
+        db.save_orders([_order('9', 'BUY', 100, 99.0, '2025-02-01T10:00:00')])
+        ranged = _calc(db, exchange).calculate_range(2023, 2025)
+        assert ranged[2024]['summary']['AAPL.US']['remaining_qty'] == 100
+        assert db.get_latest_pool_checkpoint('AAPL.US', 2026)['year'] == 2024
+
+
+class TestFixedPoint:
+    def test_matches_float_path(self, db, exchange, history):
+        flt = _calc(db, exchange, checkpoints=False).calculate(2024)
+        fixed = _calc(db, exchange, checkpoints=False, fixed_point=True).calculate(2024)
+        assert fixed['total_gains'] == pytest.approx(flt['total_gains'])
+        assert fixed['total_tax'] == pytest.approx(flt['total_tax'])
+
+    def test_totals_are_whole_fen(self, db, exchange):
+        exchange.get_rate.return_value = 7.1893
+        db.save_orders([_order('1', 'BUY', 3, 10.01, '2024-01-02T10:00:00')] + [
+            _order(str(i), 'SELL', 1, 10.37, f'2024-02-0{i}T10:00:00') for i in range(2, 5)
+        ])
+        result = _calc(db, exchange, fixed_point=True).calculate(2024)
+        for value in (result['total_gains'], result['net_gains'], result['total_tax']):
+            assert round(value * 100) / 100 == value
+        cost = sum(tx['cost_basis_cny'] for tx in result['details'])
+        assert round(cost * 100) == round(3 * 10.01 * 7.1893 * 100)
+        assert result['summary']['AAPL.US']['remaining_cost'] == 0
+
+    def test_does_not_share_checkpoints_with_float(self, db, exchange, history, replayed):
+        exchange.get_rate.return_value = 7.1893
+        fresh = _calc(db, exchange, fixed_point=True).calculate(2024)
+        _calc(db, exchange).calculate(2023)
+        replayed.clear()
+        after_float = _calc(db, exchange, fixed_point=True).calculate(2024)
+        assert replayed == [4]   # float checkpoint not restored
+        assert after_float == fresh
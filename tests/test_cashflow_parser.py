@@ -1,9 +1,14 @@
 """Tests for cashflow_parser — symbol extraction, withholding matching."""
 
+import random
+from datetime import datetime, timedelta
+
 import pytest
 from src.cashflow_parser import (
+    DividendStream,
     parse_dividends,
     summarize_by_symbol,
+    _WITHHOLDING_MATCH_WINDOW,
     _extract_symbol,
     _is_withholding,
 )
@@ -92,6 +97,161 @@ class TestParseDividends:
         assert len(divs) == 0
 
 
+def _brute_force_match(entries):
+    """Reference O(D×W) matcher: nearest same-currency dividend, first fed wins ties.
+
+    Returns (withholding per dividend, unmatched withholding entries), both in feed order.
+    """
+    divs = [e for e in entries if e['transaction_flow_name'] == 'Cash Dividend']
+    credited = [0.0] * len(divs)
+    unmatched = []
+    for wh in entries:
+        if not _is_withholding(wh['description']):
+            continue
+        wh_time = datetime.fromisoformat(wh['business_time'])
+        best, best_delta = None, _WITHHOLDING_MATCH_WINDOW + timedelta(seconds=1)
+        for i, div in enumerate(divs):
+            if div['currency'] != wh['currency']:
+                continue
+            delta = abs(wh_time - datetime.fromisoformat(div['business_time']))
+            if delta < best_delta:
+                best_delta, best = delta, i
+        if best is not None and best_delta <= _WITHHOLDING_MATCH_WINDOW:
+            credited[best] += abs(wh['balance'])
+        else:
+            unmatched.append(wh)
+    return credited, unmatched
+
+
+def _div(ts, currency='USD'):
+    return _entry('Cash Dividend', 10.0, currency, desc='OXY.US Cash Dividend',
+                  business_time=ts)
+
+
+def _wh(ts, amount=1.0, currency='USD'):
+    return _entry('CO Other FEE', -amount, currency, desc='OXY.US Withholding Tax',
+                  business_time=ts)
+
+
+class TestMatchWithholdings:
+    def test_equidistant_goes_to_first_listed(self):
+        divs, _ = parse_dividends([_div('2025-01-16T10:01:00'), _div('2025-01-16T09:59:00'),
+                                   _wh('2025-01-16T10:00:00')])
+        assert [d['withholding'] for d in divs] == [1.0, 0.0]
+
+    def test_same_timestamp_goes_to_first_listed(self):
+        divs, _ = parse_dividends([_div('2025-01-16T10:00:00'), _div('2025-01-16T10:00:00'),
+                                   _wh('2025-01-16T10:00:10')])
+        assert [d['withholding'] for d in divs] == [1.0, 0.0]
+
+    def test_window_boundary_inclusive(self):
+        divs, unmatched = parse_dividends([
+            _div('2025-01-16T10:00:00'),
+            _wh('2025-01-16T10:02:00', 2.0),
+            _wh('2025-01-16T09:57:59.999999', 3.0),
+        ])
+        assert divs[0]['withholding'] == 2.0
+        assert [w['amount'] for w in unmatched] == [3.0]
+
+    def test_currency_must_match(self):
+        divs, unmatched = parse_dividends([_div('2025-01-16T10:00:00', 'HKD'),
+                                           _wh('2025-01-16T10:00:00', currency='USD')])
+        assert divs[0]['withholding'] == 0.0 and len(unmatched) == 1
+
+    @pytest.mark.parametrize('seed', range(20))
+    def test_identical_to_brute_force(self, seed):
+        rng = random.Random(seed)
+        base = datetime(2025, 1, 1)
+
+        def ts():
+            # Coarse grid so exact ties and equal timestamps are common
+            return (base + timedelta(seconds=30 * rng.randint(0, 400))).isoformat()
+
+        currencies = ('USD', 'HKD', 'SGD')
+        entries = [_div(ts(), rng.choice(currencies)) for _ in range(rng.randint(0, 60))]
+        entries += [_wh(ts(), round(rng.uniform(0.01, 9), 2), rng.choice(currencies))
+                    for _ in range(rng.randint(0, 60))]
+        rng.shuffle(entries)
+
+        expected, expected_unmatched = _brute_force_match(entries)
+        divs, unmatched = parse_dividends(entries)
+        assert [d['withholding'] for d in divs] == expected
+        assert ([(w['received_at'], w['amount']) for w in unmatched]
+                == [(w['business_time'], abs(w['balance'])) for w in expected_unmatched])
+
+
+class TestDividendStream:
+    @staticmethod
+    def _history(seed):
+        """Cash flow entries in ~90-day batches, shuffled within each batch."""
+        rng = random.Random(seed)
+        base = datetime(2023, 1, 1)
+        entries = []
+        for _ in range(300):
+            t = base + timedelta(seconds=30 * rng.randint(0, 1_000_000))
+            ccy = rng.choice(('USD', 'HKD'))
+            sym = rng.choice(('OXY', 'KO', 'T'))
+            entries.append(_entry('Cash Dividend', round(rng.uniform(1, 99), 2), ccy,
+                                  desc=f'{sym}.US Cash Dividend', business_time=t.isoformat()))
+            for _ in range(rng.randint(0, 2)):
+                wt = t + timedelta(seconds=30 * rng.randint(-5, 5))
+                entries.append(_entry('CO Other FEE', -round(rng.uniform(0.1, 9), 2), ccy,
+                                      desc=f'{sym}.US Withholding Tax',
+                                      business_time=wt.isoformat()))
+        entries.sort(key=lambda e: e['business_time'])
+        batches, batch, edge = [], [], base
+        for e in entries:
+            while e['business_time'] >= (edge + timedelta(days=90)).isoformat():
+                edge += timedelta(days=90)
+                rng.shuffle(batch)
+                batches.append(batch)
+                batch = []
+            batch.append(e)
+        rng.shuffle(batch)
+        batches.append(batch)
+        return batches
+
+    @pytest.mark.parametrize('seed', range(5))
+    def test_identical_to_parse_dividends(self, seed):
+        batches = self._history(seed)
+        expected, expected_unmatched = parse_dividends(
+            [dict(e) for batch in batches for e in batch])
+
+        stream = DividendStream()
+        released = [d for batch in batches for d in stream.feed(batch)] + stream.close()
+
+        key = lambda d: (d['received_at'], d['currency'], d['amount'])
+        assert sorted(released, key=key) == sorted(expected, key=key)
+        assert sorted(stream.unmatched, key=key) == sorted(expected_unmatched, key=key)
+
+    def test_buffer_stays_bounded(self):
+        batches = self._history(0)
+        stream = DividendStream()
+        buffered = []
+        for batch in batches:
+            stream.feed(batch)
+            buffered.append(len(stream._divs))
+        # Only dividends near the latest batch's end are held back
+        assert max(buffered) <= 3
+
+    def test_holds_dividend_near_horizon(self):
+        stream = DividendStream()
+        first = stream.feed([_entry('Cash Dividend', 44.0, desc='OXY.US Cash Dividend',
+                                    business_time='2025-01-16T10:00:00')])
+        assert first == []  # a withholding in the next batch could still match
+        second = stream.feed([_entry('CO Other FEE', -4.4, desc='OXY.US Withholding Tax',
+                                     business_time='2025-01-16T10:01:00')])
+        assert second == []
+        third = stream.feed([_entry('Commission', -1.0, desc='fee',
+                                    business_time='2025-01-17T00:00:00'),
+                             _entry('Cash Dividend', 1.0, desc='KO.US Cash Dividend',
+                                    business_time='2025-01-17T00:00:00')])
+        assert [d['symbol'] for d in third] == ['OXY.US']
+        assert third[0]['withholding'] == pytest.approx(4.4)
+        assert [d['symbol'] for d in stream.close()] == ['KO.US']
+        assert stream.flow_names == {'Cash Dividend', 'CO Other FEE', 'Commission'}
+
+
 class TestSummarizeBySymbol:
     def test_aggregation(self):
         divs = [
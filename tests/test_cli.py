@@ -0,0 +1,31 @@
+"""Tests for CLI startup: offline commands must not load network/numeric stacks."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY = ('longport', 'requests', 'numpy')
+
+
+def _loaded_after(code: str, tmp_path) -> set:
+    """Run *code* in a fresh interpreter; return which HEAVY modules it loaded."""
+    probe = f"{code}\nimport sys\nprint(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    env = dict(os.environ, TAX_CALCULATOR_DB=str(tmp_path / 'cli.db'))
+    out = subprocess.run([sys.executable, '-c', probe], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return set(filter(None, out.strip().split(',')))
+
+
+class TestLazyImports:
+    def test_import_cli_is_light(self, tmp_path):
+        assert _loaded_after("import cli", tmp_path) == set()
+
+    def test_status_stays_offline(self, tmp_path):
+        code = ("import cli\n"
+                "from click.testing import CliRunner\n"
+                "assert CliRunner().invoke(cli.cli, ['status']).exit_code == 0")
+        assert _loaded_after(code, tmp_path) == set()
+        assert (tmp_path / 'cli.db').exists()
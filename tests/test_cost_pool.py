@@ -1,7 +1,7 @@
 """Unit tests for CostPool — supports both long and short positions."""
 
 import pytest
-from src.cost_pool import CostPool
+from src.cost_pool import CostPool, FixedCostPool
 
 
 class TestLongPosition:
@@ -123,9 +123,74 @@ class TestEdgeCases:
         assert pool.history[0].side == 'BUY'
         assert pool.history[1].side == 'SELL'
 
+    def test_history_entry_state(self):
+        pool = CostPool("TEST")
+        pool.buy(100, 1000)
+        pool.sell(40, settled_amount=600)
+        tx = pool.history[-1]
+        assert tx.quantity == 40
+        assert tx.amount == 400  # cost basis released
+        assert tx.quantity_after == 60
+        assert tx.total_cost_after == pytest.approx(600)
+        assert [t.side for t in pool.history[:1]] == ['BUY']
+
+    def test_history_disabled(self):
+        pool = CostPool("TEST", record_history=False)
+        pool.buy(100, 1000)
+        pool.sell(50, settled_amount=600)
+        assert len(pool.history) == 0
+        assert pool.quantity == 50
+
+    def test_slots_reject_new_attributes(self):
+        with pytest.raises(AttributeError):
+            CostPool("TEST").extra = 1
+
     def test_float_dust_cleanup(self):
         pool = CostPool("TEST")
         pool.buy(3, 10)
         pool.sell(3, settled_amount=12)
         assert pool.quantity == 0
         assert pool.total_cost == 0
+
+
+class TestFixedCostPool:
+    def test_matches_float_pool(self):
+        fixed, flt = FixedCostPool("TEST"), CostPool("TEST")
+        for pool in (fixed, flt):
+            pool.buy(100, 1000)
+            pool.buy(50, 800)
+        assert fixed.sell(60, settled_amount=900) == pytest.approx(flt.sell(60, settled_amount=900))
+        assert fixed.quantity == flt.quantity == 90
+        assert fixed.total_cost == pytest.approx(flt.total_cost)
+
+    def test_lots_release_exact_total(self):
+        pool = FixedCostPool("TEST")
+        pool.buy(3, 10)
+        released = [pool.sell(1) for _ in range(3)]
+        assert released == [3.33, 3.34, 3.33]
+        assert sum(map(round, (r * 100 for r in released))) == 1000
+        assert pool.quantity == 0 and pool.total_cost == 0
+
+    def test_no_drift_over_many_operations(self):
+        pool = FixedCostPool("TEST")
+        for _ in range(10_000):
+            pool.buy(0.1, 0.1)
+            pool.sell(0.1)
+        assert pool.quantity == 0 and pool.total_cost == 0
+
+    def test_short_round_trip(self):
+        pool = FixedCostPool("TEST")
+        pool.sell(2, settled_amount=700.01)
+        assert pool.is_short
+        assert pool.buy(3, 300) == 700.01
+        assert pool.quantity == 1 and pool.total_cost == 100
+
+    def test_oversell_raises(self):
+        pool = FixedCostPool("TEST")
+        pool.buy(10, 100)
+        with pytest.raises(ValueError, match="only holding"):
+            pool.sell(10.5)
+
+    def test_restore_round_trip(self):
+        pool = FixedCostPool.restore("TEST", 12.5, 1234.56)
+        assert (pool.quantity, pool.total_cost) == (12.5, 1234.56)
@@ -0,0 +1,235 @@
+"""Unit tests for DatabaseManager — connection reuse, transactions, year-range queries."""
+
+import threading
+
+import pytest
+from src.database import DatabaseManager, year_range
+
+
+@pytest.fixture
+def db(tmp_path):
+    mgr = DatabaseManager(tmp_path / 'test.db')
+    yield mgr
+    mgr.close()
+
+
+def _order(order_id, symbol='AAPL.US', side='BUY',
+           executed_at='2024-03-01T10:00:00'):
+    return {
+        'order_id': order_id, 'symbol': symbol, 'side': side,
+        'quantity': 10, 'price': 100.0, 'currency': 'USD',
+        'executed_at': executed_at, 'fees': {},
+    }
+
+
+class TestConnection:
+    def test_connection_reused_within_thread(self, db):
+        assert db.conn is db.conn
+
+    def test_wal_journaling_enabled(self, db):
+        mode = db.conn.execute('PRAGMA journal_mode').fetchone()[0]
+        assert mode == 'wal'
+
+    def test_each_thread_gets_own_connection(self, db):
+        seen = []
+        t = threading.Thread(target=lambda: seen.append(db.conn))
+        t.start()
+        t.join()
+        assert seen[0] is not db.conn
+
+    def test_concurrent_reader_sees_committed_writes(self, db):
+        db.save_orders([_order('1')])
+        counts = []
+
+        def read():
+            counts.append(db.conn.execute('SELECT COUNT(*) FROM orders').fetchone()[0])
+
+        t = threading.Thread(target=read)
+        t.start()
+        t.join()
+        assert counts == [1]
+
+    def test_close_then_reopen(self, db):
+        first = db.conn
+        db.close()
+        assert db.conn is not first
+        assert db.get_symbols_with_sells(2024) == []
+
+    def test_context_manager_closes(self, tmp_path):
+        with DatabaseManager(tmp_path / 'ctx.db') as mgr:
+            mgr.save_orders([_order('1')])
+        assert mgr._conns == []
+
+
+class TestTransaction:
+    def test_rollback_on_error(self, db):
+        with pytest.raises(RuntimeError):
+            with db.transaction() as conn:
+                conn.execute("INSERT INTO orders (order_id, symbol, side, quantity, "
+                             "price, currency, executed_at) VALUES "
+                             "('x', 'A.US', 'BUY', 1, 1, 'USD', '2024-01-01')")
+                raise RuntimeError('boom')
+        assert db.get_orders_until('A.US', 2024) == []
+
+    def test_nested_scope_joins_outer(self, db):
+        with pytest.raises(RuntimeError):
+            with db.transaction():
+                db.save_orders([_order('1')])  # opens its own (nested) scope
+                raise RuntimeError('boom')
+        assert db.get_orders_until('AAPL.US', 2024) == []
+
+    def test_commit_visible_after_scope(self, db):
+        with db.transaction():
+            db.save_orders([_order('1')])
+            db.save_orders([_order('2')])
+        assert len(db.get_orders_until('AAPL.US', 2024)) == 2
+
+
+class TestYearRange:
+    def test_bounds(self):
+        assert year_range(2024) == ('2024-01-01', '2025-01-01')
+
+    def test_year_boundaries(self, db):
+        db.save_orders([
+            _order('1', side='SELL', executed_at='2023-12-31T23:59:59.900000'),
+            _order('2', side='SELL', executed_at='2024-01-01T00:00:00'),
+            _order('3', side='SELL', symbol='MSFT.US',
+                   executed_at='2024-12-31T23:59:59.500000'),
+            _order('4', side='SELL', symbol='TSLA.US',
+                   executed_at='2025-01-01T00:00:00'),
+        ])
+        assert db.get_symbols_with_sells(2024) == ['AAPL.US', 'MSFT.US']
+        assert [o['order_id'] for o in db.get_orders_until('MSFT.US', 2024)] == ['3']
+        assert db.get_orders_until('TSLA.US', 2024) == []
+
+    def test_clear_year_data(self, db):
+        db.save_orders([_order('1', executed_at='2023-06-01T10:00:00'),
+                        _order('2', executed_at='2024-06-01T10:00:00')])
+        db.save_exchange_rate('2024-06-01', 'USD', 'CNY', 7.1)
+        db.clear_year_data(2024)
+        assert [o['order_id'] for o in db.get_orders_until('AAPL.US', 2024)] == ['1']
+        assert db.get_exchange_rate('2024-06-01', 'USD', 'CNY') is None
+
+
+class TestQueryPlans:
+    """Year-filtered queries must seek an index rather than scan the table.
+
+    Each test plans the statements the method actually sends, captured
+    with a trace callback, so the check follows any change to the SQL.
+    """
+
+    @staticmethod
+    def _plan(db, call):
+        statements = []
+        db.conn.set_trace_callback(statements.append)
+        try:
+            call()
+        finally:
+            db.conn.set_trace_callback(None)
+        selects = [sql for sql in statements if sql.lstrip().upper().startswith('SELECT')]
+        assert selects, 'the method ran no SELECT'
+        return ' '.join(r['detail'] for sql in selects
+                        for r in db.conn.execute(f'EXPLAIN QUERY PLAN {sql}'))
+
+    def test_symbols_with_sells_uses_index(self, db):
+        plan = self._plan(db, lambda: db.get_symbols_with_sells(2024))
+        assert 'USING COVERING INDEX idx_orders_side_executed' in plan
+
+    def test_orders_until_uses_index(self, db):
+        plan = self._plan(db, lambda: db.get_orders_until('AAPL.US', 2024))
+        assert 'USING INDEX idx_orders_symbol_executed' in plan
+        assert 'TEMP B-TREE' not in plan
+
+    def test_iter_orders_until_streams_in_index_order(self, db):
+        for symbols in (None, ['AAPL.US', 'NVDA.US']):
+            plan = self._plan(db, lambda: list(db.iter_orders_until(2024, symbols=symbols)))
+            assert 'idx_orders_symbol_executed' in plan
+            assert 'TEMP B-TREE' not in plan
+
+    def test_dividends_use_index(self, db):
+        plan = self._plan(db, lambda: db.get_dividends(2024))
+        assert 'idx_dividends_received' in plan
+
+
+class TestCachedRateDates:
+    def test_returns_only_requested_cached_dates(self, db):
+        db.save_exchange_rates([
+            ('2024-01-02', 'USD', 'CNY', 7.10, 'frankfurter'),
+            ('2024-01-03', 'USD', 'CNY', 7.11, 'frankfurter'),
+            ('2024-01-05', 'USD', 'CNY', 7.12, 'frankfurter'),
+            ('2024-01-03', 'HKD', 'CNY', 0.91, 'frankfurter'),
+        ])
+        cached = db.get_cached_rate_dates(
+            ['2024-01-03', '2024-01-04', '2024-01-05'], 'USD', 'CNY')
+        assert cached == {'2024-01-03', '2024-01-05'}
+
+    def test_empty_input(self, db):
+        assert db.get_cached_rate_dates([], 'USD', 'CNY') == set()
+
+
+class TestRateMisses:
+    def test_upsert_counts_attempts(self, db):
+        db.save_rate_misses([('2024-01-01', 'USD', 'CNY')], '2026-01-01T00:00:00+00:00')
+        db.save_rate_misses([('2024-01-01', 'USD', 'CNY')], '2026-02-01T00:00:00+00:00')
+        row = db.conn.execute("SELECT tried_at, attempts FROM rate_misses").fetchone()
+        assert tuple(row) == ('2026-02-01T00:00:00+00:00', 2)
+
+    def test_since_filters_old_misses(self, db):
+        db.save_rate_misses([('2024-01-01', 'USD', 'CNY')], '2026-01-01T00:00:00+00:00')
+        db.save_rate_misses([('2024-01-02', 'USD', 'CNY'), ('2024-01-02', 'HKD', 'CNY')],
+                            '2026-02-01T00:00:00+00:00')
+        assert db.get_rate_misses('USD', 'CNY', '2026-01-15') == {'2024-01-02'}
+
+    def test_gaps_list_misses_and_fallbacks(self, db):
+        db.save_rate_misses([('2024-01-01', 'USD', 'CNY'), ('2024-01-02', 'USD', 'CNY'),
+                             ('2023-12-31', 'USD', 'CNY')], '2026-01-01T00:00:00+00:00')
+        db.save_exchange_rates([
+            ('2024-01-02', 'USD', 'CNY', 7.1, 'frankfurter'),   # backfilled since
+            ('2024-03-01', 'USD', 'CNY', 7.2, 'fallback'),
+        ])
+        gaps = [(g['date'], g['kind']) for g in db.get_rate_gaps(2024)]
+        assert gaps == [('2024-01-01', 'missing'), ('2024-03-01', 'fallback')]
+        assert len(db.get_rate_gaps()) == 3
+
+    def test_clear_fallback_rates_drops_dependent_checkpoints(self, db):
+        db.save_orders([_order('1', 'AAPL.US'), {**_order('2', '700.HK'), 'currency': 'HKD'}])
+        db.save_exchange_rates([('2023-05-02', 'USD', 'CNY', 7.2, 'fallback'),
+                                ('2023-05-02', 'HKD', 'CNY', 0.9, 'frankfurter')])
+        db.save_pool_checkpoints([(sym, y, 1.0, 1.0, 'h')
+                                  for sym in ('AAPL.US', '700.HK') for y in (2022, 2023)])
+        assert db.clear_fallback_rates() == 1
+        kept = db.conn.execute("SELECT symbol, year FROM pool_checkpoints ORDER BY 1, 2")
+        assert [tuple(r) for r in kept] == [('700.HK', 2022), ('700.HK', 2023),
+                                            ('AAPL.US', 2022)]
+
+    def test_clear_year_data_forgets_misses(self, db):
+        db.save_rate_misses([('2024-01-01', 'USD', 'CNY'), ('2023-01-01', 'USD', 'CNY')],
+                            '2026-01-01T00:00:00+00:00')
+        db.clear_year_data(2024)
+        assert db.get_rate_misses('USD', 'CNY', '') == {'2023-01-01'}
+
+
+class TestIterOrdersUntil:
+    @pytest.fixture
+    def orders(self, db):
+        db.save_orders([
+            _order('1', symbol='MSFT.US', executed_at='2024-02-01T10:00:00'),
+            _order('2', symbol='AAPL.US', executed_at='2024-03-01T10:00:00'),
+            _order('3', symbol='AAPL.US', executed_at='2023-03-01T10:00:00'),
+            _order('4', symbol='TSLA.US', executed_at='2024-01-01T10:00:00'),
+            _order('5', symbol='AAPL.US', executed_at='2025-01-01T10:00:00'),
+        ])
+
+    def test_ordered_by_symbol_then_time(self, db, orders):
+        rows = [(o['symbol'], o['order_id']) for o in db.iter_orders_until(2024)]
+        assert rows == [('AAPL.US', '3'), ('AAPL.US', '2'),
+                        ('MSFT.US', '1'), ('TSLA.US', '4')]
+
+    def test_symbol_filter(self, db, orders):
+        ids = [o['order_id'] for o in db.iter_orders_until(2024, symbols=['AAPL.US', 'TSLA.US'])]
+        assert ids == ['3', '2', '4']
+
+    def test_returns_order_dicts(self, db, orders):
+        first = next(db.iter_orders_until(2024))
+        assert first['fees'] == {}
+        assert 'fees_json' not in first
@@ -138,3 +138,17 @@ class TestDividendCalculation:
         result = calc.calculate(2025)
         assert result['total_credit'] <= result['total_china_tax']
         assert result['total_tax_owed'] == 0.0  # fully covered by credit
+
+    def test_fixed_point_totals_in_fen(self, db):
+        _seed_rate(db, '2025-01-16', 'USD', 7.1893)
+        db.save_dividends([
+            {'symbol': f'S{i}.US', 'currency': 'USD', 'amount': 0.37, 'withholding': 0.04,
+             'received_at': '2025-01-16T00:00:00', 'flow_name': 'Cash Dividend'}
+            for i in range(3)
+        ])
+        calc = DividendCalculator(db, ExchangeRateManager(db, provider=None), fixed_point=True)
+        result = calc.calculate(2025)
+        assert result['details'][0]['gross_cny'] == 2.95      # 0.41 * 7.1893 = 2.9476
+        assert result['total_gross_cny'] == 8.85
+        assert result['total_china_tax'] == 1.77
+        assert result['total_tax_owed'] == pytest.approx(1.77 - 3 * 0.29)
@@ -1,10 +1,16 @@
 """Unit tests for ExchangeRateManager — source tracking, caching, batch fetch."""
 
+import threading
+from datetime import datetime, timedelta, timezone
+
 import pytest
+import requests
 from unittest.mock import MagicMock
+from src.circuit_breaker import CircuitBreaker
 from src.database import DatabaseManager
 from src.exchange_rate import (
-    ExchangeRateManager, FrankfurterProvider, RateSource,
+    NO_RATE, ExchangeRateManager, FrankfurterProvider, LocalRateProvider, ProviderChain,
+    RateSource, RateTable, _forward_fill,
 )
 
 
@@ -51,6 +57,64 @@ class TestSourceTracking:
         provider.fetch.assert_not_called()
 
 
+# --- In-memory rate table ---
+
+class TestRateTable:
+    def test_exact_lookup(self):
+        table = RateTable([('2024-01-03', 7.12), ('2024-01-02', 7.10)])
+        assert table.dates == ['2024-01-02', '2024-01-03']
+        assert table.get('2024-01-03') == 7.12
+        assert table.get('2024-01-04') is None
+
+    def test_nearest_before(self):
+        table = RateTable([('2024-01-02', 7.10), ('2024-01-05', 7.15)])
+        assert table.nearest_before('2024-01-04') == ('2024-01-02', 7.10)
+        assert table.nearest_before('2024-01-05') == ('2024-01-05', 7.15)
+        assert table.nearest_before('2024-01-01') is None
+
+    def test_put_keeps_order(self):
+        table = RateTable([('2024-01-02', 7.10), ('2024-01-05', 7.15)])
+        table.put('2024-01-03', 7.11)
+        table.put('2024-01-05', 7.16)
+        assert table.dates == ['2024-01-02', '2024-01-03', '2024-01-05']
+        assert table.rates == [7.10, 7.11, 7.16]
+        assert table.get('2024-01-05') == 7.16
+
+
+class TestInMemoryLookup:
+    def test_pair_loaded_in_one_query(self, db, manager, provider, monkeypatch):
+        for d in ('2024-01-02', '2024-01-03', '2024-01-04'):
+            db.save_exchange_rate(d, 'USD', 'CNY', 7.1, RateSource.FRANKFURTER)
+        calls = []
+        original = db.get_exchange_rates
+        monkeypatch.setattr(db, 'get_exchange_rates',
+                            lambda *a: calls.append(a) or original(*a))
+        for _ in range(100):
+            for d in ('2024-01-02', '2024-01-03', '2024-01-04'):
+                assert manager.get_rate(d, 'USD', 'CNY') == 7.1
+        assert calls == [('USD', 'CNY')]
+        provider.fetch.assert_not_called()
+
+    def test_weekend_reuses_friday_rate(self, db, manager, provider):
+        db.save_exchange_rate('2025-04-25', 'HKD', 'CNY', 0.92, RateSource.FRANKFURTER)
+        assert manager.get_rate('2025-04-26', 'HKD', 'CNY') == 0.92  # Saturday
+        assert manager.get_rate('2025-04-27', 'HKD', 'CNY') == 0.92  # Sunday
+        provider.fetch.assert_not_called()
+
+    def test_weekday_gap_is_a_true_miss(self, db, manager, provider):
+        db.save_exchange_rate('2025-04-25', 'HKD', 'CNY', 0.92, RateSource.FRANKFURTER)
+        provider.fetch.return_value = 0.93
+        assert manager.get_rate('2025-04-28', 'HKD', 'CNY') == 0.93  # Monday
+        provider.fetch.assert_called_once()
+
+    def test_resolved_rate_cached_in_memory(self, db, manager, provider):
+        provider.fetch.return_value = 7.25
+        manager.get_rate('2024-06-14', 'USD', 'CNY')
+        manager.get_rate('2024-06-14', 'USD', 'CNY')
+        provider.fetch.assert_called_once()
+        assert manager.rate_table('USD', 'CNY').get('2024-06-14') == 7.25
+
+
 # --- Fallback behavior ---
 
 class TestFallback:
@@ -87,6 +151,15 @@ class TestBatchFetch:
         manager.batch_fetch(['2024-01-02', '2024-01-03'], 'USD', 'CNY')
         assert db.get_exchange_rate('2024-01-02', 'USD', 'CNY')['rate'] == 7.10
 
+    def test_cache_probe_is_one_query(self, db, manager, provider, monkeypatch):
+        db.save_exchange_rate('2024-01-02', 'USD', 'CNY', 7.10, RateSource.FRANKFURTER)
+        monkeypatch.setattr(db, 'get_exchange_rate', MagicMock(
+            side_effect=AssertionError('per-date probe')))
+        provider.fetch_series.return_value = {'2024-01-03': 7.12}
+        manager.batch_fetch(['2024-01-02', '2024-01-03'], 'USD', 'CNY')
+        provider.fetch_series.assert_called_once_with(
+            '2024-01-03', '2024-01-03', 'USD', 'CNY')
+
     def test_falls_back_per_date_when_series_fails(self, db, manager):
         manager.batch_fetch(['2024-01-02'], 'USD', 'CNY')
         assert db.get_exchange_rate('2024-01-02', 'USD', 'CNY')['source'] == 'fallback'
@@ -106,6 +179,362 @@ class TestBatchFetch:
     def test_empty_dates_is_noop(self, manager):
         manager.batch_fetch([], 'USD', 'CNY')
 
+    def test_series_saved_in_one_write(self, db, manager, provider, monkeypatch):
+        provider.fetch_series.return_value = {'2024-01-02': 7.10, '2024-01-05': 7.15}
+        writes = []
+        original = db.save_exchange_rates
+        monkeypatch.setattr(db, 'save_exchange_rates',
+                            lambda rows: writes.append(list(rows)) or original(writes[-1]))
+        dates = ['2024-01-02', '2024-01-03', '2024-01-04', '2024-01-05']
+        manager.batch_fetch(dates, 'USD', 'CNY')
+        assert len(writes) == 1
+        assert [r[0] for r in writes[0]] == dates
+        assert db.get_exchange_rate('2024-01-04', 'USD', 'CNY')['rate'] == 7.10
+
+
+class TestBatchFetchMany:
+    def test_one_series_call_per_currency_year(self, db, manager, provider):
+        provider.fetch_series.side_effect = lambda start, end, f, t: {start: 1.0, end: 1.0}
+        manager.batch_fetch_many({
+            'USD': ['2023-12-29', '2024-01-02', '2024-06-03'],
+            'HKD': ['2024-03-01'],
+            'CNY': ['2024-03-01'],
+        })
+        calls = {c.args for c in provider.fetch_series.call_args_list}
+        assert calls == {
+            ('2023-12-29', '2023-12-29', 'USD', 'CNY'),
+            ('2024-01-02', '2024-06-03', 'USD', 'CNY'),
+            ('2024-03-01', '2024-03-01', 'HKD', 'CNY'),
+        }
+        assert db.get_exchange_rate('2024-03-01', 'HKD', 'CNY')['rate'] == 1.0
+
+    def test_segments_download_concurrently(self, manager, provider):
+        barrier = threading.Barrier(4, timeout=5)
+
+        def slow_series(start, end, f, t):
+            barrier.wait()   # raises BrokenBarrierError unless all 4 run at once
+            return {start: 1.0}
+
+        provider.fetch_series.side_effect = slow_series
+        manager.batch_fetch_many({'USD': ['2021-06-01', '2022-06-01'],
+                                  'HKD': ['2021-06-01', '2022-06-01']}, workers=4)
+        assert provider.fetch_series.call_count == 4
+
+    def test_all_rows_saved_in_one_write(self, db, manager, provider, monkeypatch):
+        provider.fetch_series.side_effect = lambda start, end, f, t: {start: 2.0}
+        writes = []
+        original = db.save_exchange_rates
+        monkeypatch.setattr(db, 'save_exchange_rates',
+                            lambda rows: writes.append(list(rows)) or original(writes[-1]))
+        manager.batch_fetch_many({'USD': ['2021-06-01', '2022-06-01'], 'HKD': ['2023-06-01']})
+        assert len(writes) == 1 and len(writes[0]) == 3
+
+    def test_skips_cached_and_updates_memory_table(self, db, manager, provider):
+        db.save_exchange_rate('2024-01-02', 'USD', 'CNY', 7.10, RateSource.FRANKFURTER)
+        table = manager.rate_table('USD')
+        provider.fetch_series.return_value = {'2024-01-03': 7.12}
+        manager.batch_fetch_many({'USD': ['2024-01-02', '2024-01-03']})
+        provider.fetch_series.assert_called_once_with('2024-01-03', '2024-01-03', 'USD', 'CNY')
+        assert table.get('2024-01-03') == 7.12
+
+    def test_unanswered_segment_falls_back_per_date(self, db, manager, provider):
+        provider.fetch_series.side_effect = lambda start, end, f, t: (
+            {start: 7.0} if start.startswith('2023') else None)
+        manager.batch_fetch_many({'USD': ['2023-06-01', '2024-06-03']})
+        assert db.get_exchange_rate('2023-06-01', 'USD', 'CNY')['source'] == 'frankfurter'
+        assert db.get_exchange_rate('2024-06-03', 'USD', 'CNY')['source'] == 'fallback'
+
+
+class TestNegativeCache:
+    NOW = datetime(2026, 3, 1, 12, tzinfo=timezone.utc)
+
+    def _manager(self, db, provider, now=NOW, ttl=timedelta(days=7)):
+        return ExchangeRateManager(db, provider, miss_ttl=ttl, clock=lambda: now)
+
+    def test_series_miss_skipped_on_next_run(self, db, provider):
+        provider.fetch_series.return_value = {'2024-01-03': 7.12}
+        self._manager(db, provider).batch_fetch(['2024-01-01', '2024-01-03'], 'USD')
+        assert db.get_rate_misses('USD', 'CNY', '') == {'2024-01-01'}
+
+        provider.fetch_series.reset_mock()
+        self._manager(db, provider).batch_fetch(['2024-01-01', '2024-01-03'], 'USD')
+        provider.fetch_series.assert_not_called()
+
+    def test_miss_asked_again_after_ttl(self, db, provider):
+        provider.fetch_series.return_value = {'2024-01-03': 7.12}
+        self._manager(db, provider).batch_fetch(['2024-01-01', '2024-01-03'], 'USD')
+        later = self.NOW + timedelta(days=8)
+        self._manager(db, provider, now=later).batch_fetch(['2024-01-01'], 'USD')
+        provider.fetch_series.assert_called_with('2024-01-01', '2024-01-01', 'USD', 'CNY')
+        row = db.conn.execute("SELECT attempts FROM rate_misses").fetchone()
+        assert row[0] == 2
+
+    def test_zero_ttl_always_asks(self, db, provider):
+        provider.fetch_series.return_value = {'2024-01-03': 7.12}
+        for _ in range(2):
+            self._manager(db, provider, ttl=timedelta(0)).batch_fetch(['2024-01-01'], 'USD')
+        assert provider.fetch_series.call_count == 2
+
+    def test_get_rate_skips_provider_for_known_miss(self, db, provider):
+        provider.fetch.return_value = NO_RATE
+        manager = self._manager(db, provider)
+        assert manager.get_rate('2024-06-15', 'XYZ', 'ABC') == 1.0
+        assert manager.get_rate('2024-06-15', 'XYZ', 'ABC') == 1.0
+        assert self._manager(db, provider).get_rate('2024-06-15', 'XYZ', 'ABC') == 1.0
+        provider.fetch.assert_called_once()
+
+    def test_failed_lookup_not_recorded(self, db, provider):
+        manager = self._manager(db, provider)   # fetch returns None: outage
+        assert manager.get_rate('2024-06-15', 'XYZ', 'ABC') == 1.0
+        manager.batch_fetch(['2024-06-17'], 'USD')
+        assert db.get_rate_misses('XYZ', 'ABC', '') == set()
+        assert db.get_rate_misses('USD', 'CNY', '') == set()
+
+    def test_open_circuit_not_recorded(self, db, snapshot):
+        session = FakeSession(*[requests.ConnectionError('down')] * 3)
+        api, _ = _frankfurter(session, retries=0,
+                              breaker=CircuitBreaker(failure_threshold=1, reset_after=60))
+        manager = self._manager(db, ProviderChain([snapshot, api]))
+        manager.batch_fetch(['2024-01-02', '2024-03-01'], 'USD')
+        for day in ('2024-03-04', '2024-03-05'):
+            manager.get_rate(day, 'USD')
+        assert api.stats.short_circuited == 2
+        assert db.get_rate_misses('USD', 'CNY', '') == set()
+
+    def test_snapshot_gap_recorded_once_api_answers(self, db, snapshot, provider):
+        provider.fetch_series.return_value = {'2024-03-01': 7.3}
+        manager = self._manager(db, ProviderChain([snapshot, provider]))
+        manager.batch_fetch(['2024-01-02', '2024-02-26', '2024-03-01'], 'USD')
+        assert db.get_rate_misses('USD', 'CNY', '') == {'2024-02-26'}
+
+    def test_recent_dates_not_recorded(self, db, provider):
+        provider.fetch_series.return_value = {'2026-02-20': 7.0}
+        self._manager(db, provider).batch_fetch(['2026-02-20', '2026-02-27'], 'USD')
+        assert db.get_rate_misses('USD', 'CNY', '') == set()
+
+    def test_batch_fetch_many_records_and_skips(self, db, provider):
+        provider.fetch_series.side_effect = lambda start, end, f, t: {end: 1.0}
+        wanted = {'USD': ['2023-01-01', '2023-01-05'], 'HKD': ['2023-02-01']}
+        self._manager(db, provider).batch_fetch_many(wanted)
+        assert db.get_rate_misses('USD', 'CNY', '') == {'2023-01-01'}
+
+        provider.fetch_series.reset_mock()
+        self._manager(db, provider).batch_fetch_many(wanted)
+        provider.fetch_series.assert_not_called()
+
+
+class TestForwardFill:
+    def test_fills_weekends_and_holidays(self):
+        series = {'2025-04-17': 0.91, '2025-04-22': 0.93}  # Good Friday + Easter Monday gap
+        filled = _forward_fill(series, '2025-04-17', '2025-04-22')
+        assert filled == {
+            '2025-04-17': 0.91, '2025-04-18': 0.91, '2025-04-19': 0.91,
+            '2025-04-20': 0.91, '2025-04-21': 0.91, '2025-04-22': 0.93,
+        }
+
+    def test_carries_rate_from_before_start(self):
+        filled = _forward_fill({'2025-04-25': 0.92}, '2025-04-26', '2025-04-27')
+        assert filled == {'2025-04-26': 0.92, '2025-04-27': 0.92}
+
+    def test_days_before_first_rate_left_out(self):
+        filled = _forward_fill({'2025-01-02': 0.92}, '2025-01-01', '2025-01-02')
+        assert filled == {'2025-01-02': 0.92}
+
+    def test_max_carry_limits_every_gap(self):
+        series = {'2025-01-01': 1.0, '2025-01-10': 2.0}
+        filled = _forward_fill(series, '2025-01-01', '2025-01-12', max_carry=timedelta(days=2))
+        assert sorted(filled) == ['2025-01-01', '2025-01-02', '2025-01-03',
+                                  '2025-01-10', '2025-01-11', '2025-01-12']
+
+    def test_unsorted_series(self):
+        filled = _forward_fill({'2025-01-03': 2.0, '2025-01-01': 1.0},
+                               '2025-01-01', '2025-01-03')
+        assert filled == {'2025-01-01': 1.0, '2025-01-02': 1.0, '2025-01-03': 2.0}
+
+
+# --- Frankfurter HTTP behaviour ---
+
+class FakeResponse:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self._body = body
+
+    def json(self):
+        return self._body
+
+
+class FakeSession:
+    """Replays scripted responses (or raises scripted exceptions)."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = []
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append(url)
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def _frankfurter(session, **kw):
+    sleeps = []
+    provider = FrankfurterProvider(session=session, sleep=sleeps.append, **kw)
+    return provider, sleeps
+
+
+class TestFrankfurterProvider:
+    def test_reuses_one_session(self):
+        session = FakeSession(FakeResponse(200, {'rates': {'CNY': 7.1}}),
+                              FakeResponse(200, {'rates': {'CNY': 7.2}}))
+        provider, _ = _frankfurter(session)
+        assert provider.fetch('2024-01-02', 'USD', 'CNY') == 7.1
+        assert provider.fetch('2024-01-03', 'USD', 'CNY') == 7.2
+        assert provider.stats.requests == 2 and provider.stats.errors == 0
+
+    def test_retries_with_exponential_backoff(self):
+        session = FakeSession(requests.ConnectionError('down'), FakeResponse(503),
+                              FakeResponse(200, {'rates': {'CNY': 7.1}}))
+        provider, sleeps = _frankfurter(session, retries=2, backoff=0.5)
+        assert provider.fetch('2024-01-02', 'USD', 'CNY') == 7.1
+        assert sleeps == [0.5, 1.0]
+        assert provider.stats.retries == 2 and provider.stats.errors == 2
+
+    def test_gives_up_after_bounded_retries(self, capsys):
+        session = FakeSession(*[requests.Timeout('slow')] * 3)
+        provider, sleeps = _frankfurter(session, retries=2)
+        assert provider.fetch_series('2024-01-01', '2024-01-31', 'USD', 'CNY') is None
+        assert len(session.calls) == 3 and len(sleeps) == 2
+        assert 'failed after 3 attempt(s)' in capsys.readouterr().out
+
+    def test_not_found_is_a_miss_not_a_failure(self):
+        breaker = CircuitBreaker(failure_threshold=1)
+        provider, sleeps = _frankfurter(FakeSession(FakeResponse(404)), breaker=breaker)
+        assert provider.fetch('1990-01-01', 'USD', 'CNY') is NO_RATE
+        assert sleeps == [] and breaker.allow()
+
+    def test_not_found_series_is_empty(self):
+        provider, _ = _frankfurter(FakeSession(FakeResponse(404)))
+        assert provider.fetch_series('1990-01-01', '1990-01-31', 'XYZ', 'CNY') == {}
+
+    def test_open_circuit_skips_the_network(self):
+        session = FakeSession(*[requests.ConnectionError('down')] * 2)
+        breaker = CircuitBreaker(failure_threshold=2, reset_after=60)
+        provider, _ = _frankfurter(session, retries=0, breaker=breaker)
+        for _ in range(5):
+            assert provider.fetch('2024-01-02', 'USD', 'CNY') is None
+        assert len(session.calls) == 2
+        assert provider.stats.short_circuited == 3
+
+    def test_manager_reports_stats_by_source(self, db):
+        provider, _ = _frankfurter(FakeSession(FakeResponse(200, {'rates': {'CNY': 7.1}})))
+        manager = ExchangeRateManager(db, provider)
+        manager.get_rate('2024-01-02', 'USD')
+        assert manager.provider_stats()['frankfurter'].requests == 1
+
+
+# --- Local snapshot + provider chain ---
+
+@pytest.fixture
+def snapshot(tmp_path):
+    path = tmp_path / 'rates.csv'
+    path.write_text(
+        "date,from_currency,to_currency,rate\n"
+        "2024-01-02,USD,CNY,7.10\n"
+        "2024-01-03,USD,CNY,7.12\n"
+        "2024-01-05,USD,CNY,7.15\n"
+        "2024-01-02,HKD,CNY,0.91\n"
+    )
+    return LocalRateProvider(path)
+
+
+class TestLocalRateProvider:
+    def test_exact_fetch(self, snapshot):
+        assert snapshot.fetch('2024-01-03', 'USD', 'CNY') == 7.12
+        assert snapshot.fetch('2024-01-02', 'HKD', 'CNY') == 0.91
+
+    def test_fetch_carries_preceding_rate_up_to_limit(self, snapshot):
+        assert snapshot.fetch('2024-01-04', 'USD', 'CNY') == 7.12
+        assert snapshot.fetch('2024-01-10', 'USD', 'CNY') == 7.15   # 5 days on
+        assert snapshot.fetch('2024-01-11', 'USD', 'CNY') is NO_RATE
+        assert snapshot.fetch('2024-01-01', 'USD', 'CNY') is NO_RATE
+
+    def test_offline_holiday_and_weekend_use_snapshot(self, db, tmp_path):
+        path = tmp_path / 'xmas.csv'
+        path.write_text("date,from_currency,to_currency,rate\n"
+                        "2024-12-23,USD,CNY,7.29\n2024-12-24,USD,CNY,7.30\n"
+                        "2024-12-27,USD,CNY,7.31\n")
+        manager = ExchangeRateManager(db, ProviderChain([LocalRateProvider(path)]))
+        assert manager.get_rate('2024-12-26', 'USD') == 7.30   # ECB holiday
+        assert manager.get_rate('2024-12-28', 'USD') == 7.31   # Saturday
+        assert db.get_exchange_rate('2024-12-26', 'USD', 'CNY')['source'] == 'local'
+        assert db.get_fallback_rate_count() == 0
+        assert db.get_rate_misses('USD', 'CNY', '') == set()
+
+    def test_series_includes_rate_to_carry_in(self, snapshot):
+        assert snapshot.fetch_series('2024-01-04', '2024-01-06', 'USD', 'CNY') == {
+            '2024-01-03': 7.12, '2024-01-05': 7.15}
+
+    def test_unknown_pair_is_empty(self, snapshot):
+        assert snapshot.fetch_series('2024-01-01', '2024-01-31', 'EUR', 'CNY') == {}
+
+    def test_sqlite_snapshot_skips_fallback_rates(self, db, tmp_path):
+        db.save_exchange_rate('2024-01-02', 'USD', 'CNY', 7.10, RateSource.FRANKFURTER)
+        db.save_exchange_rate('2024-01-03', 'USD', 'CNY', 7.2, RateSource.FALLBACK)
+        local = LocalRateProvider(tmp_path / 'test.db')
+        assert local.fetch('2024-01-02', 'USD', 'CNY') == 7.10
+        assert local.fetch('2024-01-03', 'USD', 'CNY') == 7.10   # not the fallback 7.2
+
+    def test_missing_file(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            LocalRateProvider(tmp_path / 'nope.csv')
+
+
+class TestProviderChain:
+    def test_snapshot_answers_without_api(self, db, snapshot, provider):
+        manager = ExchangeRateManager(db, ProviderChain([snapshot, provider]))
+        assert manager.get_rate('2024-01-03', 'USD') == 7.12
+        manager.batch_fetch(['2024-01-02', '2024-01-04'], 'USD')
+        provider.fetch.assert_not_called()
+        provider.fetch_series.assert_not_called()
+        assert db.get_exchange_rate('2024-01-04', 'USD', 'CNY') == {
+            'rate': 7.12, 'source': 'local'}
+
+    def test_api_fills_past_end_of_snapshot(self, db, snapshot, provider):
+        provider.fetch_series.return_value = {'2024-02-01': 7.30}
+        manager = ExchangeRateManager(db, ProviderChain([snapshot, provider]))
+        manager.batch_fetch(['2024-01-05', '2024-01-08', '2024-02-01'], 'USD')
+        provider.fetch_series.assert_called_once_with('2024-02-01', '2024-02-01', 'USD', 'CNY')
+        assert db.get_exchange_rate('2024-01-08', 'USD', 'CNY')['source'] == 'local'
+        assert db.get_exchange_rate('2024-02-01', 'USD', 'CNY') == {
+            'rate': 7.30, 'source': 'frankfurter'}
+
+    def test_api_fills_gaps_inside_sparse_snapshot(self, db, tmp_path, provider):
+        path = tmp_path / 'sparse.csv'
+        path.write_text("date,from_currency,to_currency,rate\n"
+                        "2024-01-02,USD,CNY,7.10\n2024-03-01,USD,CNY,7.20\n")
+        provider.fetch_series.return_value = {'2024-02-15': 7.15}
+        manager = ExchangeRateManager(db, ProviderChain([LocalRateProvider(path), provider]))
+        manager.batch_fetch(['2024-01-04', '2024-02-15', '2024-03-01'], 'USD')
+        provider.fetch_series.assert_called_once_with('2024-02-15', '2024-02-15', 'USD', 'CNY')
+        assert db.get_exchange_rate('2024-01-04', 'USD', 'CNY')['source'] == 'local'
+        assert db.get_exchange_rate('2024-02-15', 'USD', 'CNY') == {
+            'rate': 7.15, 'source': 'frankfurter'}
+
+    def test_per_date_miss_falls_through_with_source(self, db, snapshot, provider):
+        provider.fetch.return_value = 7.13
+        manager = ExchangeRateManager(db, ProviderChain([snapshot, provider]))
+        assert manager.get_rate('2024-01-15', 'USD') == 7.13
+        assert db.get_exchange_rate('2024-01-15', 'USD', 'CNY')['source'] == 'frankfurter'
+
+    def test_standalone_chain_merges_first_wins(self, snapshot, provider):
+        provider.fetch_series.return_value = {'2024-01-03': 9.0, '2024-01-08': 7.2}
+        chain = ProviderChain([snapshot, provider])
+        series = chain.fetch_series('2024-01-02', '2024-01-08', 'USD', 'CNY')
+        assert series['2024-01-03'] == 7.12
+        assert series['2024-01-08'] == 7.2
+
 
 # --- DB source field ---
 
@@ -125,3 +554,8 @@ class TestDatabaseSourceField:
     def test_default_source_is_unknown(self, db):
         db.save_exchange_rate('2024-01-01', 'USD', 'CNY', 7.2)
         assert db.get_exchange_rate('2024-01-01', 'USD', 'CNY')['source'] == 'unknown'
+
+    def test_iter_exchange_rates_skips_fallback(self, db):
+        db.save_exchange_rate('2024-01-02', 'USD', 'CNY', 7.10, 'frankfurter')
+        db.save_exchange_rate('2024-01-03', 'USD', 'CNY', 7.2, 'fallback')
+        assert list(db.iter_exchange_rates()) == [('2024-01-02', 'USD', 'CNY', 7.10)]
@@ -0,0 +1,83 @@
+"""Unit tests for the fee backfill — batching, resume, progress."""
+
+import pytest
+from unittest.mock import MagicMock
+from src.database import DatabaseManager
+from src.fee_backfill import BackfillProgress, backfill_fees
+
+
+@pytest.fixture
+def db(tmp_path):
+    mgr = DatabaseManager(tmp_path / 'test.db')
+    mgr.save_orders([{
+        'order_id': f'{i:03d}', 'symbol': 'AAPL.US', 'side': 'BUY',
+        'quantity': 1, 'price': 100.0, 'currency': 'USD',
+        'executed_at': f'2024-01-01T10:{i // 60:02d}:{i % 60:02d}', 'fees': {},
+    } for i in range(25)])
+    yield mgr
+    mgr.close()
+
+
+@pytest.fixture
+def client():
+    c = MagicMock()
+    c.fetch_order_detail.side_effect = lambda oid: {'total_amount': str(int(oid) / 10)}
+    return c
+
+
+class TestBackfillFees:
+    def test_updates_all(self, db, client):
+        updated = backfill_fees(client, db, db.get_orders_missing_fees(), workers=4,
+                                batch_size=10)
+        assert updated == 25
+        assert db.get_orders_missing_fees() == []
+        order = db.get_orders_until('AAPL.US', 2024)[7]
+        assert order['fees'] == {'total_amount': '0.7'}
+
+    def test_batched_writes(self, db, client, monkeypatch):
+        calls = []
+        original = db.update_orders_fees
+        monkeypatch.setattr(db, 'update_orders_fees',
+                            lambda rows: calls.append(len(rows)) or original(rows))
+        backfill_fees(client, db, db.get_orders_missing_fees(), batch_size=10)
+        assert calls == [10, 10, 5]
+
+    def test_orders_without_detail_stay_missing(self, db, client):
+        client.fetch_order_detail.side_effect = (
+            lambda oid: None if oid == '003' else {'total_amount': '1'})
+        assert backfill_fees(client, db, db.get_orders_missing_fees()) == 24
+        assert [o['order_id'] for o in db.get_orders_missing_fees()] == ['003']
+
+    def test_interrupt_keeps_committed_prefix_and_resumes(self, db, client):
+        def detail(oid):
+            if oid == '017':
+                raise KeyboardInterrupt
+            return {'total_amount': '1'}
+
+        client.fetch_order_detail.side_effect = detail
+        with pytest.raises(KeyboardInterrupt):
+            backfill_fees(client, db, db.get_orders_missing_fees(), workers=1, batch_size=5)
+        remaining = [o['order_id'] for o in db.get_orders_missing_fees()]
+        assert remaining == [f'{i:03d}' for i in range(17, 25)]
+
+        client.fetch_order_detail.side_effect = lambda oid: {'total_amount': '1'}
+        client.fetch_order_detail.reset_mock()
+        backfill_fees(client, db, db.get_orders_missing_fees())
+        assert client.fetch_order_detail.call_count == 8
+
+    def test_progress_reports(self, db, client):
+        seen = []
+        backfill_fees(client, db, db.get_orders_missing_fees(), batch_size=10,
+                      on_progress=seen.append)
+        assert [(p.done, p.updated) for p in seen] == [(10, 10), (20, 20), (25, 25)]
+        assert all(p.total == 25 for p in seen)
+
+
+class TestBackfillProgress:
+    def test_rate_and_eta(self):
+        p = BackfillProgress(done=50, total=200, updated=48, elapsed=10.0)
+        assert p.rate == 5.0
+        assert p.eta == 30.0
+
+    def test_eta_unknown_before_first_result(self):
+        assert BackfillProgress(done=0, total=10, updated=0, elapsed=0.0).eta is None
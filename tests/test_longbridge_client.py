@@ -0,0 +1,49 @@
+"""Unit tests for LongBridgeClient chunked fetching (no API calls)."""
+
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from src.longbridge_client import LongBridgeClient
+
+
+START = datetime(2016, 1, 1)
+END = datetime(2025, 12, 31)
+
+
+class TestChunkedFetch:
+    def test_windows_cover_range(self):
+        windows = LongBridgeClient._chunk_windows(START, END)
+        assert windows[0][0] == START
+        assert windows[-1][1] == END
+        for (_, prev_end), (next_start, _) in zip(windows, windows[1:]):
+            assert next_start == prev_end + timedelta(days=1)
+        assert all(e - s <= timedelta(days=89) for s, e in windows)
+
+    def test_results_in_chronological_order(self):
+        def fetch(s, e):
+            # Later windows finish first
+            time.sleep(0.001 * (END - s).days / 365)
+            return [s]
+
+        items = LongBridgeClient._chunked_fetch(START, END, fetch, workers=8)
+        assert items == [s for s, _ in LongBridgeClient._chunk_windows(START, END)]
+
+    def test_failed_chunk_skipped(self):
+        def fetch(s, e):
+            if s.year == 2020:
+                raise RuntimeError('quota')
+            return [s]
+
+        items = LongBridgeClient._chunked_fetch(START, END, fetch, workers=4)
+        assert items and all(s.year != 2020 for s in items)
+
+    def test_strict_reraises(self):
+        def fetch(s, e):
+            raise RuntimeError('quota')
+
+        with pytest.raises(RuntimeError, match='quota'):
+            LongBridgeClient._chunked_fetch(START, END, fetch, workers=4, strict=True)
+
+    def test_empty_range(self):
+        assert LongBridgeClient._chunked_fetch(END, END, lambda s, e: [s]) == []
@@ -0,0 +1,69 @@
+"""Unit tests for TokenBucket — refill, bursts, blocking, thread sharing."""
+
+import threading
+
+import pytest
+from src.rate_limiter import TokenBucket
+
+
+class FakeClock:
+    """Monotonic clock that only moves when something sleeps."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class TestTokenBucket:
+    def test_burst_up_to_capacity_without_waiting(self, clock):
+        bucket = TokenBucket(5, clock=clock, sleep=clock.sleep)
+        for _ in range(5):
+            bucket.acquire()
+        assert clock.sleeps == []
+
+    def test_blocks_until_refilled(self, clock):
+        bucket = TokenBucket(2, clock=clock, sleep=clock.sleep)
+        for _ in range(4):
+            bucket.acquire()
+        assert clock.now == pytest.approx(1.0)   # 2 burst + 2 more at 2/s
+
+    def test_idle_time_refills_only_to_capacity(self, clock):
+        bucket = TokenBucket(1, capacity=2, clock=clock, sleep=clock.sleep)
+        clock.now = 100.0
+        for _ in range(3):
+            bucket.acquire()
+        assert clock.now == pytest.approx(101.0)
+
+    def test_rejects_non_positive_rate(self):
+        with pytest.raises(ValueError, match="positive"):
+            TokenBucket(0)
+
+    def test_shared_across_threads(self):
+        bucket = TokenBucket(1000, capacity=10)
+        taken = []
+        lock = threading.Lock()
+
+        def worker():
+            for _ in range(50):
+                bucket.acquire()
+                with lock:
+                    taken.append(1)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(taken) == 200
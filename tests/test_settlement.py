@@ -121,3 +121,56 @@ class TestFeeExtraction:
 
     def test_invalid_amount(self, settlement):
         assert settlement._extract_fees({'fees': {'total_amount': 'N/A'}}) == 0
+
+
+class TestSettleBatch:
+    @staticmethod
+    def _orders():
+        rows = [
+            ('BUY', 'SPY.US', 30, 580.13, 'USD', '2024-12-01T10:00:00', {'total_amount': '5.01'}),
+            ('SELL', 'SPY.US', 30, 601.7, 'USD', '2024-12-19T10:00:00', {}),
+            ('BUY', 'AMD250718C130000.US', 4, 5.38, 'USD', '2025-02-05T10:00:00',
+             {'total_amount': '2.60'}),
+            ('SELL', 'AMD250718C130000.US', 3, 6.41, 'USD', '2025-02-06T10:00:00',
+             {'total_amount': 'N/A'}),
+            ('SELL', '1378.HK', 1000, 13.37, 'HKD', '2024-08-01T09:30:00',
+             {'total_amount': 17.33}),
+            ('BUY', '1378.HK', 500, 0.1, 'HKD', '2024-08-01T15:00:00', None),
+        ]
+        return [
+            {'side': side, 'symbol': sym, 'quantity': q, 'price': p, 'currency': c,
+             'executed_at': ts, 'fees': fees}
+            for side, sym, q, p, c, ts, fees in rows
+        ]
+
+    @pytest.fixture
+    def mixed_rates(self):
+        exchange = MagicMock()
+        exchange.get_rate.side_effect = lambda d, ccy, to: {'USD': 7.1893, 'HKD': 0.91937}[ccy]
+        return SettlementCalculator(exchange)
+
+    def test_matches_scalar_exactly(self, mixed_rates):
+        orders = self._orders()
+        amounts, rates = mixed_rates.settle_batch(orders)
+        for order, amount, rate in zip(orders, amounts.tolist(), rates.tolist()):
+            if order['side'] == 'BUY':
+                assert amount == mixed_rates.settle_buy(order)
+                assert rate == mixed_rates.get_rate_for_order(order)
+            else:
+                assert (amount, rate) == mixed_rates.settle_sell_with_rate(order)
+
+    def test_one_rate_lookup_per_date_and_currency(self, mixed_rates):
+        mixed_rates.settle_batch(self._orders())
+        # The two HK orders share a date
+        assert mixed_rates.exchange.get_rate.call_count == 5
+
+    def test_empty(self, settlement):
+        amounts, rates = settlement.settle_batch([])
+        assert len(amounts) == 0 and len(rates) == 0
+
+    def test_fen_rounds_batch_amounts(self, mixed_rates):
+        orders = self._orders()
+        fen, rates = mixed_rates.settle_batch_fen(orders)
+        amounts, _ = mixed_rates.settle_batch(orders)
+        assert fen.dtype.kind == 'i'
+        assert fen.tolist() == [round(a * 100) for a in amounts.tolist()]
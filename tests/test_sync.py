@@ -0,0 +1,207 @@
+"""Unit tests for incremental sync — high-water marks, overlap, failure handling."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from unittest.mock import MagicMock
+from src.database import DatabaseManager
+from src.sync import (CASHFLOW, ORDERS, SYNC_OVERLAP, reparse_dividends, store_dividends,
+                      sync_cashflow, sync_orders, sync_window)
+
+
+@pytest.fixture
+def db(tmp_path):
+    mgr = DatabaseManager(tmp_path / 'test.db')
+    yield mgr
+    mgr.close()
+
+
+@pytest.fixture
+def client():
+    c = MagicMock()
+    c.account_key = 'acct-1'
+    c.fetch_orders.return_value = [{
+        'order_id': '1', 'symbol': 'AAPL.US', 'side': 'BUY', 'quantity': 10,
+        'price': 100.0, 'currency': 'USD', 'executed_at': '2025-03-01T10:00:00',
+        'fees': {},
+    }]
+    c.iter_cashflow.return_value = [[{
+        'transaction_flow_name': 'Cash Dividend', 'direction': 'IN',
+        'balance': 44.0, 'currency': 'USD', 'business_time': '2025-03-02T00:00:00',
+        'symbol': 'OXY.US', 'description': 'OXY.US Cash Dividend: 0.22 USD per Share',
+    }]]
+    return c
+
+
+NOW = datetime(2025, 3, 10, 12, 0, 0)
+
+
+class TestSyncWindow:
+    def test_first_sync_needs_start(self, db):
+        with pytest.raises(ValueError, match="first sync"):
+            sync_window(db, ORDERS, 'acct-1', NOW)
+
+    def test_resumes_with_overlap(self, db):
+        db.save_sync_state(ORDERS, 'acct-1', '2025-03-01T00:00:00')
+        start, end = sync_window(db, ORDERS, 'acct-1', NOW)
+        assert start == datetime(2025, 3, 1) - SYNC_OVERLAP
+        assert end == NOW
+
+    def test_since_overrides_mark(self, db):
+        db.save_sync_state(ORDERS, 'acct-1', '2025-03-01T00:00:00')
+        start, _ = sync_window(db, ORDERS, 'acct-1', NOW, since=datetime(2020, 1, 1))
+        assert start == datetime(2020, 1, 1)
+
+    def test_marks_are_per_endpoint_and_account(self, db):
+        db.save_sync_state(ORDERS, 'acct-1', '2025-03-01T00:00:00')
+        with pytest.raises(ValueError):
+            sync_window(db, CASHFLOW, 'acct-1', NOW)
+        with pytest.raises(ValueError):
+            sync_window(db, ORDERS, 'acct-2', NOW)
+
+
+class TestSyncOrders:
+    def test_saves_orders_and_advances_mark(self, db, client):
+        orders = sync_orders(client, db, NOW, since=datetime(2020, 1, 1))
+        assert len(orders) == 1
+        assert len(db.get_orders_until('AAPL.US', 2025)) == 1
+        assert db.get_sync_state(ORDERS, 'acct-1') == NOW.isoformat()
+        client.fetch_orders.assert_called_once_with(datetime(2020, 1, 1), NOW, strict=True)
+
+    def test_next_sync_fetches_only_new_window(self, db, client):
+        sync_orders(client, db, NOW, since=datetime(2020, 1, 1))
+        later = datetime(2025, 3, 11, 12, 0, 0)
+        sync_orders(client, db, later)
+        start, end = client.fetch_orders.call_args.args
+        assert (start, end) == (NOW - SYNC_OVERLAP, later)
+        # Overlapping re-fetch doesn't duplicate rows
+        assert len(db.get_orders_until('AAPL.US', 2025)) == 1
+
+    def test_overlap_keeps_backfilled_fees(self, db, client):
+        sync_orders(client, db, NOW, since=datetime(2020, 1, 1))
+        db.update_order_fees('1', {'total_amount': '1.99'})
+        sync_orders(client, db, datetime(2025, 3, 11, 12, 0, 0))
+        assert db.get_orders_until('AAPL.US', 2025)[0]['fees'] == {'total_amount': '1.99'}
+        assert db.get_orders_missing_fees() == []
+
+    def test_failure_keeps_mark(self, db, client):
+        db.save_sync_state(ORDERS, 'acct-1', '2025-03-01T00:00:00')
+        client.fetch_orders.side_effect = RuntimeError('rate limited')
+        with pytest.raises(RuntimeError):
+            sync_orders(client, db, NOW)
+        assert db.get_sync_state(ORDERS, 'acct-1') == '2025-03-01T00:00:00'
+
+
+class TestSyncCashflow:
+    def test_saves_dividends_and_advances_mark(self, db, client):
+        dividends, unmatched = sync_cashflow(client, db, NOW, since=datetime(2025, 1, 1))
+        assert [d['symbol'] for d in dividends] == ['OXY.US']
+        assert unmatched == []
+        assert len(db.get_dividends(2025)) == 1
+        assert db.get_sync_state(CASHFLOW, 'acct-1') == NOW.isoformat()
+        assert db.get_sync_state(ORDERS, 'acct-1') is None
+
+
+def _cash(name, balance, ts, desc, symbol=None):
+    return {'transaction_flow_name': name, 'direction': 'IN', 'balance': balance,
+            'currency': 'USD', 'business_time': ts, 'symbol': symbol, 'description': desc}
+
+
+class TestStoreDividends:
+    def test_saves_each_batch_as_it_finalizes(self, db):
+        batches = [
+            [_cash('Cash Dividend', 44.0, '2024-01-10T00:00:00', 'OXY.US Cash Dividend')],
+            [_cash('Cash Dividend', 10.0, '2024-04-10T00:00:00', 'KO.US Cash Dividend'),
+             _cash('CO Other FEE', -1.0, '2024-04-10T00:01:00', 'KO.US Withholding Tax')],
+        ]
+        saved_counts = []
+
+        def stream():
+            for batch in batches:
+                yield batch
+                # Everything final so far is already in the DB
+                saved_counts.append(len(db.get_dividends(2024)))
+
+        saved = list(store_dividends(db, stream()))
+        assert saved_counts == [0, 1]
+        assert [[d['symbol'] for d in batch] for batch in saved] == [['OXY.US'], ['KO.US']]
+        assert saved[1][0]['withholding'] == 1.0
+
+
+class TestReparseDividends:
+    @pytest.fixture
+    def archived(self, db):
+        batches = [[
+            _cash('Cash Dividend', 44.0, '2024-01-10T00:00:00', 'OXY.US Cash Dividend'),
+            _cash('CO Other FEE', -4.4, '2024-01-10T00:05:00', 'OXY.US Withholding Tax'),
+            _cash('Cash Dividend', 10.0, '2024-04-10T00:00:00', 'KO.US Cash Dividend'),
+        ]]
+        list(store_dividends(db, batches))
+
+    def test_store_archives_raw_entries_once(self, db, archived):
+        list(store_dividends(db, [next(db.iter_cashflow_raw())]))
+        rows = [e for batch in db.iter_cashflow_raw() for e in batch]
+        assert len(rows) == 3
+        assert [e['business_time'] for e in rows] == sorted(e['business_time'] for e in rows)
+
+    def test_rebuilds_from_archive(self, db, archived, monkeypatch):
+        # 5 minutes is outside the match window at import time...
+        assert db.get_dividends(2024)[0]['withholding'] == 0.0
+        # ...but a wider window applied offline picks it up.
+        monkeypatch.setattr('src.cashflow_parser._WITHHOLDING_MATCH_WINDOW',
+                            timedelta(minutes=10))
+        count, stream = reparse_dividends(db)
+        assert count == 2
+        assert stream.unmatched == []
+        by_symbol = {d['symbol']: d['withholding'] for d in db.get_dividends(2024)}
+        assert by_symbol == {'OXY.US': 4.4, 'KO.US': 0.0}
+
+    def test_failure_keeps_old_dividends(self, db, archived, monkeypatch):
+        monkeypatch.setattr(db, 'iter_cashflow_raw',
+                            MagicMock(side_effect=RuntimeError('corrupt')))
+        with pytest.raises(RuntimeError):
+            reparse_dividends(db)
+        assert len(db.get_dividends(2024)) == 2
+
+    def test_keeps_dividends_outside_archive_span(self, db, archived):
+        db.save_dividends([{'symbol': 'KO.US', 'currency': 'USD', 'amount': 5.0,
+                            'withholding': 0.5, 'received_at': '2019-04-01T00:00:00',
+                            'flow_name': 'Cash Dividend'}])
+        count, _ = reparse_dividends(db)
+        assert count == 2
+        assert len(db.get_dividends(2019)) == 1
+
+    def test_empty_archive_changes_nothing(self, db):
+        db.save_dividends([{'symbol': 'KO.US', 'currency': 'USD', 'amount': 5.0,
+                            'withholding': 0.5, 'received_at': '2019-04-01T00:00:00',
+                            'flow_name': 'Cash Dividend'}])
+        count, _ = reparse_dividends(db)
+        assert count == 0
+        assert len(db.get_dividends(2019)) == 1
+
+    def test_identical_entries_are_each_archived(self, db):
+        dividend = _cash('Cash Dividend', 22.0, '2024-06-10T00:00:00', 'KO.US Cash Dividend')
+        tax = _cash('CO Other FEE', -1.1, '2024-06-10T00:00:30', 'KO.US Withholding Tax')
+        window = [dividend, tax, dict(tax)]
+        live = [d for batch in store_dividends(db, [window]) for d in batch]
+        list(store_dividends(db, [window]))   # re-fetch of the same window
+        assert sum(len(b) for b in db.iter_cashflow_raw()) == 3
+
+        reparse_dividends(db)
+        assert db.get_dividends(2024)[0]['withholding'] == live[0]['withholding'] == 2.2
+
+    def test_keeps_dividends_in_archive_gap(self, db):
+        def dividend(symbol, ts):
+            return {'symbol': symbol, 'currency': 'USD', 'amount': 10.0, 'withholding': 1.0,
+                    'received_at': ts, 'flow_name': 'Cash Dividend'}
+        db.save_dividends([dividend('KO.US', '2023-04-01T00:00:00'),
+                           dividend('KO.US', '2024-04-01T00:00:00'),
+                           dividend('KO.US', '2025-04-01T00:00:00')])
+        db.save_cashflow_raw([_cash('Cash Dividend', 10.0, '2023-04-01T00:00:00',
+                                    'KO.US Cash Dividend')])
+        db.save_cashflow_raw([_cash('Cash Dividend', 10.0, '2025-04-01T00:00:00',
+                                    'KO.US Cash Dividend')])
+        count, _ = reparse_dividends(db)
+        assert count == 2
+        assert [d['withholding'] for d in db.get_dividends(2024)] == [1.0]   # not archived
+        assert [d['withholding'] for d in db.get_dividends(2025)] == [0.0]   # rebuilt
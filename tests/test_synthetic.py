@@ -0,0 +1,94 @@
+"""Tests for the synthetic portfolio generator — reproducibility and realism."""
+
+import json
+
+import pytest
+from unittest.mock import MagicMock
+
+from src.calculator import TaxCalculator
+from src.cashflow_parser import parse_dividends
+from src.database import DatabaseManager
+from src.dividend import DividendCalculator
+from src.exchange_rate import ExchangeRateManager
+from src.settlement import SettlementCalculator, get_multiplier
+from src.synthetic import generate_portfolio, write_portfolio
+
+
+@pytest.fixture(scope='module')
+def portfolio():
+    return generate_portfolio(symbols=12, orders=3000, seed=42,
+                              first_year=2021, last_year=2023)
+
+
+@pytest.fixture
+def db(tmp_path):
+    mgr = DatabaseManager(tmp_path / 'synthetic.db')
+    yield mgr
+    mgr.close()
+
+
+class TestReproducible:
+    def test_same_seed_same_portfolio(self, portfolio):
+        again = generate_portfolio(symbols=12, orders=3000, seed=42,
+                                   first_year=2021, last_year=2023)
+        assert again.orders == portfolio.orders
+        assert again.cashflow == portfolio.cashflow
+        assert again.rates == portfolio.rates
+
+    def test_other_seed_differs(self, portfolio):
+        other = generate_portfolio(symbols=12, orders=3000, seed=43,
+                                   first_year=2021, last_year=2023)
+        assert other.orders != portfolio.orders
+
+
+class TestShape:
+    def test_counts_and_ids(self, portfolio):
+        assert len(portfolio.orders) == 3000
+        assert len({o['order_id'] for o in portfolio.orders}) == 3000
+        assert len(portfolio.symbols) == 12
+
+    def test_options_match_multiplier_pattern(self, portfolio):
+        options = [s for s in portfolio.symbols if get_multiplier(s) == 100]
+        assert len(options) == portfolio.stats['options'] > 0
+
+    def test_has_shorts_and_hk(self, portfolio):
+        assert portfolio.stats['short_opens'] > 0
+        assert {o['currency'] for o in portfolio.orders} == {'USD', 'HKD'}
+
+    def test_fee_blobs(self, portfolio):
+        fees = portfolio.orders[0]['fees']
+        assert float(fees['total_amount']) == pytest.approx(
+            sum(float(i['amount']) for i in fees['items']))
+
+    def test_missing_fee_ratio(self):
+        p = generate_portfolio(symbols=3, orders=200, seed=1, missing_fee_ratio=1.0)
+        assert all(o['fees'] == {} for o in p.orders)
+
+    def test_every_withholding_matches(self, portfolio):
+        dividends, unmatched = parse_dividends(portfolio.cashflow)
+        assert len(dividends) == portfolio.stats['dividends'] > 0
+        assert not unmatched
+        assert {d['currency'] for d in dividends} == {'USD', 'HKD'}
+        assert all(d['withholding'] > 0 for d in dividends)
+
+    def test_rates_cover_every_day(self, portfolio):
+        usd = [r for r in portfolio.rates if r[1] == 'USD']
+        assert len(usd) == 365 * 3
+        assert usd[0][0] == '2021-01-01' and usd[-1][0] == '2023-12-31'
+
+
+class TestEndToEnd:
+    def test_calculate_from_written_db(self, db, portfolio):
+        write_portfolio(db, portfolio)
+        provider = MagicMock()
+        exchange = ExchangeRateManager(db, provider=provider)
+        calc = TaxCalculator(db, SettlementCalculator(exchange), tax_rate=0.20)
+
+        results = calc.calculate_range(2021, 2023)
+        divs = DividendCalculator(db, exchange).calculate(2022)
+
+        assert all(results[y]['details'] for y in (2021, 2022, 2023))
+        assert divs['total_withheld_cny'] > 0
+        assert not provider.method_calls  # every rate came from the generated series
+        row = db.conn.execute("SELECT fees_json FROM orders LIMIT 1").fetchone()
+        assert json.loads(row[0])['items']